@@ -3,9 +3,14 @@
 Analyze sentiment data spread and fix if too narrow
 """
 
-import pandas as pd
+import sys
+from pathlib import Path
+
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).parent / 'scripts'))
+from csv_cache import read_csv_cached
+
 # Read demo data if it exists
 data_paths = [
     'data/data-foundation/sentiment_demo.csv',
@@ -15,7 +20,7 @@ data_paths = [
 
 for path in data_paths:
     try:
-        df = pd.read_csv(path)
+        df = read_csv_cached(path)
         print(f"\n✓ Found: {path}")
         print(f"Rows: {len(df)}")
         print(f"Columns: {list(df.columns)[:10]}...")
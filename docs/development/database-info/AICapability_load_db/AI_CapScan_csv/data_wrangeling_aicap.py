@@ -5,9 +5,14 @@ Created on Thu Oct  9 15:01:26 2025
 @author: baroc
 """
 
+import sys
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
-import uuid
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from surrogate_keys import assign_keys
 
 # =====================================================
 # CONFIGURATION
@@ -75,17 +80,12 @@ print(f"Combined dataset: {df_full.shape[0]} rows, {df_full.shape[1]} columns")
 # =====================================================
 dim_tables = {}
 
-# Create dimension tables from categorical columns
-for col in categorical_cols:
-    dim_df = pd.DataFrame({col: df_full[col].unique()})
-    dim_df[f"{col}_id"] = [uuid.uuid4().hex[:8] for _ in range(len(dim_df))]
-    dim_tables[col] = dim_df
-
-# Replace categorical values with IDs in the main dataset
+# Create dimension tables from categorical columns and replace the values with
+# their IDs in the main dataset (hashed: stable across runs, so loads can upsert)
 df_norm = df_full.copy()
-for col, dim_df in dim_tables.items():
-    df_norm = df_norm.merge(dim_df, on=col, how='left')
-    df_norm.drop(columns=[col], inplace=True)
+for col in categorical_cols:
+    dim_tables[col], df_norm[f"{col}_id"] = assign_keys(df_norm[col], f"{col}_id", width=8, namespace=col)
+df_norm.drop(columns=categorical_cols, inplace=True)
 
 # Build fact table
 fact_cols = [f"{col}_id" for col in categorical_cols] + numeric_cols + ["RecordID", "is_synthetic"]
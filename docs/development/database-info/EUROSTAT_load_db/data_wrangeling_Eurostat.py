@@ -4,63 +4,197 @@ Created on Thu Oct  9 11:16:51 2025
 
 @author: baroc
 """
+import os
+import sys
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from pandas.io.parsers import TextParser
 from pathlib import Path
 import re
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from build_cache import lookup, store
+from surrogate_keys import KeyRegistry
+
 pd.options.mode.chained_assignment = None
 
+# Sheets (of all workbooks) are parsed by this many worker processes
+WORKERS = os.cpu_count() or 1
+
+# The TIME/GEO header band is searched for in the first 40 rows
+HEADER_SCAN_ROWS = 40
+
+PARSER = "eurostat_workbook"
+PARSER_VERSION = 1  # Bump when the parsed output changes (see build_cache.py)
+
+# Natural keys of the 3NF dimensions
+COUNTRY_KEY = ["country_name"]
+INDICATOR_KEY = ["information_society_indicator", "unit_of_measure", "nace_rev2", "size_class", "time_frequency"]
+
+# country_id/indicator_id persist here across runs (natural key -> id), so
+# new data (e.g. another year) only appends ids and never renumbers
+KEY_REGISTRY_DIR = Path("key_registry")
+
 
 # ---------------------------------------------------------
 # Helper: Extract metadata robustly
 # ---------------------------------------------------------
+# Metadata column -> label (case-insensitive substring) in the top-of-sheet band
+METADATA_LABELS = {
+    "dataset": "Dataset",
+    "last_updated": "Last updated",
+    "time_frequency": "Time frequency",
+    "size_class": "Size classes in number of persons employed",
+    "nace_rev2": "Statistical classification of economic activities",
+    "information_society_indicator": "Information society indicator",
+    "unit_of_measure": "Unit of measure",
+}
+
+# Extra metadata columns for other Eurostat datasets, e.g. {"geo_level": "Geopolitical entity"}
+EXTRA_METADATA_LABELS = {}
+
+# Metadata labels are looked up in the first 20 rows
+META_SCAN_ROWS = 20
+
+
+class MetadataIndex:
+    """
+    The top-of-sheet band normalized once: every non-empty cell's stripped
+    text, and an index from lower-cased text to its (row, col) positions.
+    Labels then resolve against the (few) distinct texts instead of
+    re-scanning the band cell by cell per label.
+    """
+
+    def __init__(self, raw):
+        self.cells = []   # per row: [(col, stripped text)] of non-empty cells
+        self.index = {}   # lower-cased text -> [(row, col)] in sheet order
+        for i, row in enumerate(raw.iloc[:META_SCAN_ROWS].to_numpy(dtype=object)):
+            row_cells = []
+            for j, v in enumerate(row):
+                if pd.isna(v):
+                    continue
+                text = str(v).strip()
+                self.index.setdefault(text.lower(), []).append((i, j))
+                if text:
+                    row_cells.append((j, text))
+            self.cells.append(row_cells)
+
+    def value(self, label_substring):
+        """The value next to the first cell containing the label (e.g. 'Time frequency')."""
+        target = label_substring.lower()
+        hits = sorted(pos for text, positions in self.index.items() if target in text for pos in positions)
+        seen_rows = set()
+        for i, j0 in hits:
+            if i in seen_rows:
+                continue  # only the first hit in a row counts
+            seen_rows.add(i)
+            row_cells = self.cells[i]
+            after = [text for j, text in row_cells if j > j0]
+            if after:
+                return after[0]
+            others = [text for j, text in row_cells if j != j0]
+            if others:
+                return others[0]
+        return pd.NA
+
+
 def _meta_value(raw, label_substring):
     """Find the value next to a metadata label (e.g. 'Time frequency')."""
-    target = label_substring.lower()
-    for i in range(0, min(20, raw.shape[0])):
-        row = raw.iloc[i]
-        hit_cols = [j for j, v in enumerate(row) if pd.notna(v) and target in str(v).strip().lower()]
-        if hit_cols:
-            j0 = hit_cols[0]
-            for k in range(j0 + 1, raw.shape[1]):
-                v = row.iloc[k]
-                if pd.notna(v) and str(v).strip():
-                    return str(v).strip()
-            for k in range(0, raw.shape[1]):
-                v = row.iloc[k]
-                if k != j0 and pd.notna(v) and str(v).strip():
-                    return str(v).strip()
-    return pd.NA
+    return MetadataIndex(raw).value(label_substring)
 
 
 def _extract_metadata(raw):
     """Extract metadata rows consistently from the top of the sheet."""
-    return {
+    index = MetadataIndex(raw)
+    meta = {
         "data_extracted_on": (
             str(raw.iloc[0, 0]).replace("Data extracted on ", "").strip()
             if raw.shape[0] > 0 and pd.notna(raw.iloc[0, 0]) else pd.NA
         ),
-        "dataset": _meta_value(raw, "Dataset"),
-        "last_updated": _meta_value(raw, "Last updated"),
-        "time_frequency": _meta_value(raw, "Time frequency"),
-        "size_class": _meta_value(raw, "Size classes in number of persons employed"),
-        "nace_rev2": _meta_value(raw, "Statistical classification of economic activities"),
-        "information_society_indicator": _meta_value(raw, "Information society indicator"),
-        "unit_of_measure": _meta_value(raw, "Unit of measure"),
     }
+    for column, label in {**METADATA_LABELS, **EXTRA_METADATA_LABELS}.items():
+        meta[column] = index.value(label)
+    return meta
+
+
+# ---------------------------------------------------------
+# Read a sheet's cells once (read-only, streaming xlsx reader)
+# ---------------------------------------------------------
+# _cell_value, _sheet_grid and _parse_grid mirror pandas 3.0's read_excel
+# internals: OpenpyxlReader._convert_cell and get_sheet_data, and the
+# fill_mi_header + TextParser steps of BaseExcelReader._parse_sheet.
+# scripts/tests/test_eurostat_grid.py compares them with pd.read_excel;
+# re-check them when upgrading pandas.
+def _cell_value(cell):
+    """Cell value as pandas' openpyxl reader returns it."""
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return float("nan")
+    if cell.data_type == TYPE_NUMERIC:
+        as_int = int(cell.value)
+        return as_int if as_int == cell.value else float(cell.value)
+    return cell.value
+
+
+def _sheet_grid(workbook, sheet_name):
+    """All rows of a sheet as lists of values, trimmed and padded like pd.read_excel."""
+    sheet = workbook[sheet_name]
+    sheet.reset_dimensions()
+    grid = []
+    last_row_with_data = -1
+    for row_number, row in enumerate(sheet.rows):
+        values = [_cell_value(cell) for cell in row]
+        while values and values[-1] == "":
+            values.pop()
+        if values:
+            last_row_with_data = row_number
+        grid.append(values)
+    grid = grid[:last_row_with_data + 1]
+    width = max((len(values) for values in grid), default=0)
+    return [values + [""] * (width - len(values)) for values in grid]
+
+
+def _parse_grid(grid, header):
+    """pd.read_excel(..., header=header, dtype=str) on an in-memory grid (copied, the header is filled in place)."""
+    rows = [list(values) for values in grid]
+    if isinstance(header, list):
+        # Forward-fill blank header cells within their parent (as pd.read_excel does)
+        control_row = [True] * len(rows[0])
+        for r in header:
+            last = rows[r][0]
+            for i in range(1, len(rows[r])):
+                if not control_row[i]:
+                    last = rows[r][i]
+                if rows[r][i] == "" or rows[r][i] is None:
+                    rows[r][i] = last
+                else:
+                    control_row[i] = False
+                    last = rows[r][i]
+    return TextParser(rows, header=header, dtype=str, skip_blank_lines=False).read()
 
 
 # ---------------------------------------------------------
 # Detect and read one sheet with two-row header (TIME + GEO)
 # ---------------------------------------------------------
-def _read_sheet_tidy(xls, sheet_name):
-    """Reads one Eurostat sheet correctly, replacing all missing values with pd.NA."""
-    raw = pd.read_excel(xls, sheet_name=sheet_name, header=None, dtype=str)
+def _read_sheet_tidy(workbook, sheet_name):
+    """
+    Reads one Eurostat sheet correctly, replacing all missing values with pd.NA.
+
+    The sheet is read once; the header band is sniffed from the top of that
+    grid and the two-row-header frame is parsed from the same grid.
+    """
+    grid = _sheet_grid(workbook, sheet_name)
+    if not grid:
+        return pd.DataFrame(), f"No TIME/GEO header pattern found in {sheet_name}"
+    raw = _parse_grid(grid[:HEADER_SCAN_ROWS + 1], header=None)
     raw = raw.replace({r"^\s*$": pd.NA}, regex=True)
 
     # --- Find the header start (TIME row + GEO row) ---
     time_row = None
-    for i in range(0, min(40, raw.shape[0] - 1)):
+    for i in range(0, min(HEADER_SCAN_ROWS, raw.shape[0] - 1)):
         row_i = [str(v).strip().upper() if pd.notna(v) else "" for v in raw.iloc[i].tolist()]
         row_ip1 = [str(v).strip().upper() if pd.notna(v) else "" for v in raw.iloc[i + 1].tolist()]
         if "TIME" in row_i and any("GEO (LABELS)" in c for c in row_ip1):
@@ -70,9 +204,8 @@ def _read_sheet_tidy(xls, sheet_name):
     if time_row is None:
         return pd.DataFrame(), f"No TIME/GEO header pattern found in {sheet_name}"
 
-    # --- Read with the two header rows ---
-    df = pd.read_excel(xls, sheet_name=sheet_name, header=[time_row, time_row + 1], dtype=str)
-    df = df.replace({":": pd.NA, "": pd.NA, " ": pd.NA, "<N.A>": pd.NA})
+    # --- Parse with the two header rows ---
+    df = _parse_grid(grid, header=[time_row, time_row + 1])
 
     # --- Identify key columns ---
     country_col = None
@@ -103,9 +236,8 @@ def _read_sheet_tidy(xls, sheet_name):
     if not year_cols:
         return pd.DataFrame(), f"No year columns found in {sheet_name}"
 
-    # --- Build simplified wide DataFrame ---
-    wide = pd.DataFrame()
-    wide["country_name"] = df[country_col]
+    # --- Build simplified wide DataFrame (only its columns need cleaning) ---
+    wide = {"country_name": df[country_col]}
     for yc in year_cols:
         top = str(yc[0]).strip() if isinstance(yc, tuple) else str(yc).strip()
         try:
@@ -113,6 +245,7 @@ def _read_sheet_tidy(xls, sheet_name):
         except Exception:
             year = top
         wide[year] = df[yc]
+    wide = pd.DataFrame(wide).replace({":": pd.NA, "": pd.NA, " ": pd.NA, "<N.A>": pd.NA})
 
     # --- Melt to tidy long format ---
     value_cols = [c for c in wide.columns if re.fullmatch(r"\d{4}", str(c))]
@@ -134,16 +267,79 @@ def _read_sheet_tidy(xls, sheet_name):
 
 
 # ---------------------------------------------------------
-# Process a workbook (multiple sheets)
+# Process workbooks (multiple sheets), sheets in parallel
 # ---------------------------------------------------------
-def process_workbook(file_path):
-    print(f"\nProcessing: {file_path}")
-    xls = pd.ExcelFile(file_path)
-    data_sheets = [s for s in xls.sheet_names if not s.lower().startswith(("summary", "structure", "flags"))]
+def _open_workbook(file_path):
+    return load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+
+
+def _data_sheets(file_path):
+    workbook = _open_workbook(file_path)
+    try:
+        return [s for s in workbook.sheetnames if not s.lower().startswith(("summary", "structure", "flags"))]
+    finally:
+        workbook.close()
+
+
+# Workbooks opened by this worker process, reused across its sheet tasks
+_open_workbooks = {}
 
+
+def _ingest_sheet(task):
+    """(tidy, error) for one (file_path, sheet_name) task."""
+    file_path, sheet_name = task
+    if file_path not in _open_workbooks:
+        _open_workbooks[file_path] = _open_workbook(file_path)
+    return _read_sheet_tidy(_open_workbooks[file_path], sheet_name)
+
+
+def _parser_options():
+    """Settings that shape the tidy output, part of each workbook's cache key."""
+    return {
+        "header_scan_rows": HEADER_SCAN_ROWS,
+        "meta_scan_rows": META_SCAN_ROWS,
+        "metadata_labels": {**METADATA_LABELS, **EXTRA_METADATA_LABELS},
+    }
+
+
+def ingest_workbooks(files, workers=WORKERS):
+    """
+    Tidy-combine every workbook in files, fanning the data sheets of all
+    changed workbooks out over a process pool. Unchanged workbooks come from
+    the build cache. Returns the combined frames in files order.
+    """
+    options = _parser_options()
+    combined = {f: lookup(f, PARSER, PARSER_VERSION, options) for f in files}
+
+    tasks = [(f, s) for f in files if combined[f] is None for s in _data_sheets(f)]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(_ingest_sheet, tasks))
+    else:
+        results = [_ingest_sheet(task) for task in tasks]
+        for workbook in _open_workbooks.values():
+            workbook.close()
+        _open_workbooks.clear()
+
+    for f in files:
+        if combined[f] is None:
+            combined[f] = _combine_workbook(f, [(s, res) for (tf, s), res in zip(tasks, results) if tf == f])
+            store(f, PARSER, PARSER_VERSION, combined[f], options)
+        else:
+            print(f"\nUnchanged: {f} (cached)")
+        _save_workbook(f, combined[f])
+    return [combined[f] for f in files]
+
+
+def process_workbook(file_path, workers=1):
+    return ingest_workbooks([file_path], workers)[0]
+
+
+def _combine_workbook(file_path, sheet_results):
+    """Report the sheets of one workbook and combine them."""
+    print(f"\nProcessing: {file_path}")
     frames = []
-    for s in data_sheets:
-        df, err = _read_sheet_tidy(xls, s)
+    for s, (df, err) in sheet_results:
         if err:
             print(f"  Skipped {s}: {err}")
             continue
@@ -154,53 +350,40 @@ def process_workbook(file_path):
         raise ValueError(f"No usable sheets found in {file_path}")
 
     combined = pd.concat(frames, ignore_index=True).convert_dtypes()
-    combined = combined.replace({None: pd.NA, "": pd.NA, " ": pd.NA, "<N.A>": pd.NA})
+    return combined.replace({None: pd.NA, "": pd.NA, " ": pd.NA, "<N.A>": pd.NA})
 
+
+def _save_workbook(file_path, combined):
     out_csv = Path(file_path).stem + "_combined.csv"
     combined.to_csv(out_csv, index=False, na_rep="")
     print(f"Saved → {out_csv}  ({combined.shape[0]} rows, {combined.shape[1]} cols)")
-    return combined
 
 
 # ---------------------------------------------------------
 # Normalize to 3NF
 # ---------------------------------------------------------
-def normalize_to_3nf(df):
+def normalize_to_3nf(df, registry_dir=KEY_REGISTRY_DIR):
     df = df.convert_dtypes().replace({None: pd.NA, "": pd.NA, " ": pd.NA, "<N.A>": pd.NA})
 
-    countries = (
-        df[["country_name"]]
-        .drop_duplicates()
-        .reset_index(drop=True)
-        .convert_dtypes()
-    )
-    countries["country_id"] = countries.index + 1
-
-    indicators = (
-        df[["information_society_indicator", "unit_of_measure", "nace_rev2", "size_class", "time_frequency"]]
-        .drop_duplicates()
-        .reset_index(drop=True)
-        .convert_dtypes()
-    )
-    indicators["indicator_id"] = indicators.index + 1
-
-    observations = (
-        df.merge(countries, on="country_name", how="left")
-          .merge(
-              indicators,
-              on=["information_society_indicator", "unit_of_measure", "nace_rev2", "size_class", "time_frequency"],
-              how="left"
-          )[[
-              "country_id", "indicator_id", "year", "value",
-              "dataset", "last_updated", "data_extracted_on", "sheet_name"
-          ]]
-          .convert_dtypes()
-    )
+    country_registry = KeyRegistry(registry_dir / "countries.csv", COUNTRY_KEY, "country_id")
+    indicator_registry = KeyRegistry(registry_dir / "indicators.csv", INDICATOR_KEY, "indicator_id")
+
+    countries, country_ids = country_registry.assign(df[COUNTRY_KEY])
+    indicators, indicator_ids = indicator_registry.assign(df[INDICATOR_KEY])
+
+    observations = df[[
+        "year", "value", "dataset", "last_updated", "data_extracted_on", "sheet_name"
+    ]].reset_index(drop=True)
+    observations.insert(0, "country_id", country_ids)
+    observations.insert(1, "indicator_id", indicator_ids)
+    observations = observations.convert_dtypes()
 
     # --- Save to CSVs ---
     countries.to_csv("countries.csv", index=False, na_rep="")
     indicators.to_csv("indicators.csv", index=False, na_rep="")
     observations.to_csv("observations.csv", index=False, na_rep="")
+    country_registry.save()
+    indicator_registry.save()
 
     print("\n3NF tables saved:")
     print("  countries.csv")
@@ -219,10 +402,7 @@ if __name__ == "__main__":
         "isoc_eb_ai$defaultview_spreadsheet.xlsx",
     ]
 
-    all_frames = []
-    for f in files:
-        df = process_workbook(f)
-        all_frames.append(df)
+    all_frames = ingest_workbooks(files)
 
     combined_all = pd.concat(all_frames, ignore_index=True).convert_dtypes()
     combined_all = combined_all.replace({None: pd.NA, "": pd.NA, " ": pd.NA, "<N.A>": pd.NA})
@@ -5,46 +5,49 @@ Created on Thu Oct  9 16:47:14 2025
 @author: baroc
 """
 
+import sys
+from pathlib import Path
+
 import pandas as pd
-import uuid
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from build_cache import cached
+from surrogate_keys import assign_keys, row_ids
 
 # =====================================================
 # CONFIGURATION
 # =====================================================
 INPUT_FILE = "Enterprise_GenAI_Adoption_Impact.csv"
 OUTPUT_PREFIX = "GenAI_3NF_"
+PARSER_VERSION = 1  # Bump when the parsed output changes (see build_cache.py)
 # =====================================================
 
 # 1️⃣ LOAD DATA
-df = pd.read_csv(INPUT_FILE)
-df.columns = [c.strip() for c in df.columns]
+def load_input(path):
+    df = pd.read_csv(path)
+    df.columns = [c.strip() for c in df.columns]
+    return df
+
+df = cached(INPUT_FILE, load_input, "genai_adoption", PARSER_VERSION)
 
 # Show structure
 print(f"Loaded dataset: {df.shape[0]} rows, {df.shape[1]} columns")
 
-# 2️⃣ CREATE DIMENSION TABLES (KEEP MISSING VALUES)
-def make_dim(df, col):
-    dim_df = pd.DataFrame({col: df[col].drop_duplicates(keep='first')})
-    dim_df[f"{col}_id"] = [uuid.uuid4().hex[:8] for _ in range(len(dim_df))]
-    return dim_df
-
-dim_company = make_dim(df, "Company Name")
-dim_industry = make_dim(df, "Industry")
-dim_country = make_dim(df, "Country")
-dim_tool = make_dim(df, "GenAI Tool")
-
-# 3️⃣ REPLACE VALUES WITH FOREIGN KEYS (PRESERVE NULLS)
+# 2️⃣ CREATE DIMENSION TABLES + FOREIGN KEYS (KEEP MISSING VALUES)
+# Hashed ids: the same value gets the same id on every run, so loads can upsert
 df_norm = df.copy()
 
-for dim_df, col in [
-    (dim_company, "Company Name"),
-    (dim_industry, "Industry"),
-    (dim_country, "Country"),
-    (dim_tool, "GenAI Tool")
-]:
-    df_norm = df_norm.merge(dim_df, on=col, how="left")
+def make_dim(df_norm, col, width=8):
+    dim_df, df_norm[f"{col}_id"] = assign_keys(df_norm[col], f"{col}_id", width=width, namespace=col)
+    return dim_df
+
+# Company names are near-unique per row (100k+), so they get the full 16-digit hash
+dim_company = make_dim(df_norm, "Company Name", width=16)
+dim_industry = make_dim(df_norm, "Industry")
+dim_country = make_dim(df_norm, "Country")
+dim_tool = make_dim(df_norm, "GenAI Tool")
 
-# 4️⃣ FACT TABLE (KEEPING MISSING DATA)
+# 3️⃣ FACT TABLE (KEEPING MISSING DATA)
 fact_cols = [
     "Company Name_id", "Industry_id", "Country_id", "GenAI Tool_id",
     "Adoption Year", "Number of Employees Impacted",
@@ -53,9 +56,10 @@ fact_cols = [
 ]
 
 fact_table = df_norm[fact_cols].copy()
-fact_table["RecordID"] = [uuid.uuid4().hex[:10] for _ in range(len(fact_table))]
+# Full 16-digit (64-bit) hash: shorter ids collide at millions of fact rows
+fact_table["RecordID"] = row_ids(df, width=16, namespace="fact_genai_impact", name="RecordID")
 
-# 5️⃣ EXPORT TO CSV
+# 4️⃣ EXPORT TO CSV
 dim_company.to_csv(f"{OUTPUT_PREFIX}dim_company.csv", index=False)
 dim_industry.to_csv(f"{OUTPUT_PREFIX}dim_industry.csv", index=False)
 dim_country.to_csv(f"{OUTPUT_PREFIX}dim_country.csv", index=False)
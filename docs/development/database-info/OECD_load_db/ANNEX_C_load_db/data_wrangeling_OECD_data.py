@@ -5,28 +5,20 @@ Created on Thu Oct 16 10:13:57 2025
 @author: baroc
 """
 
+import sys
+from pathlib import Path
+
 import pandas as pd
 import re
 
-def parse_oecd_csv_3nf(input_path: str, output_dir: str = None):
-    """
-    Parses a raw OECD survey CSV (from Tabula or OCR) into a structured,
-    relational 3NF format: Section, Question, and Option tables.
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from build_cache import cached
 
-    Parameters
-    ----------
-    input_path : str
-        Path to the raw CSV file.
-    output_dir : str, optional
-        Directory where output CSVs will be saved (section.csv, question.csv, option.csv).
-        If not provided, files are not written to disk.
+PARSER_VERSION = 1  # Bump when the parsed output changes (see build_cache.py)
 
-    Returns
-    -------
-    tuple of pd.DataFrame
-        (df_section, df_question, df_option)
-    """
 
+def _screening_records(input_path):
+    """Steps 1-4 of parse_oecd_csv_3nf: the flat (SC_ID, Section, QuestionText, OptionText) table."""
     # Step 1. Load all raw lines
     with open(input_path, "r", encoding="utf-8", errors="ignore") as f:
         lines = [line.strip().strip(',') for line in f.readlines() if line.strip()]
@@ -58,7 +50,30 @@ def parse_oecd_csv_3nf(input_path: str, output_dir: str = None):
             records.append([current_q, current_section, question_text, option_text])
 
     # Step 4. Build flat table
-    df_clean = pd.DataFrame(records, columns=["SC_ID", "Section", "QuestionText", "OptionText"])
+    return pd.DataFrame(records, columns=["SC_ID", "Section", "QuestionText", "OptionText"])
+
+
+def parse_oecd_csv_3nf(input_path: str, output_dir: str = None):
+    """
+    Parses a raw OECD survey CSV (from Tabula or OCR) into a structured,
+    relational 3NF format: Section, Question, and Option tables.
+
+    Parameters
+    ----------
+    input_path : str
+        Path to the raw CSV file.
+    output_dir : str, optional
+        Directory where output CSVs will be saved (section.csv, question.csv, option.csv).
+        If not provided, files are not written to disk.
+
+    Returns
+    -------
+    tuple of pd.DataFrame
+        (df_section, df_question, df_option)
+    """
+
+    # Steps 1-4. Flat table
+    df_clean = cached(input_path, _screening_records, "oecd_annex_c_screening", PARSER_VERSION)
 
     # Step 5. 3NF normalization
 
@@ -98,7 +113,8 @@ df_option.to_csv("option.csv", index=False)
 import pandas as pd
 import re
 
-def parse_oecd_survey_csv_3nf(input_path):
+def _survey_records(input_path):
+    """Steps 1-3 of parse_oecd_survey_csv_3nf: the clean (QuestionID, QuestionText, OptionText, ResponseType) table."""
     # Step 1. Load all columns (Tabula sometimes splits cells)
     df = pd.read_csv(input_path, header=None, engine="python", on_bad_lines="skip")
 
@@ -160,7 +176,12 @@ def parse_oecd_survey_csv_3nf(input_path):
     # Step 3. Build the clean DataFrame
     df_clean = pd.DataFrame(records, columns=["QuestionID", "QuestionText", "OptionText", "ResponseType"])
     df_clean["QuestionID"] = df_clean["QuestionID"].str.replace("Question", "Q").str.strip()
-    df_clean = df_clean.drop_duplicates().reset_index(drop=True)
+    return df_clean.drop_duplicates().reset_index(drop=True)
+
+
+def parse_oecd_survey_csv_3nf(input_path):
+    # Steps 1-3. Clean table
+    df_clean = cached(input_path, _survey_records, "oecd_annex_c_survey", PARSER_VERSION)
 
     # Step 4. Export
     df_clean.to_csv("OECD_survey_cleaned.csv", index=False)
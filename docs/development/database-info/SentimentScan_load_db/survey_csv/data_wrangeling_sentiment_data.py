@@ -5,10 +5,17 @@ Created on Thu Oct  9 14:07:37 2025
 @author: baroc
 """
 
+import os
+import sys
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from surrogate_keys import assign_keys
 
 # =====================================================
 # CONFIGURATION
@@ -16,46 +23,26 @@ import uuid
 SCALE_FACTOR = 300   # Increase for more synthetic data (e.g., 1000 = ~93k rows)
 OUTPUT_FILE_BASE = "Sentiments_3NF_"
 INPUT_FILE = "Sentiments_data - Sheet1.csv"
-# =====================================================
-
-# 1️⃣ LOAD BASE DATA
-df = pd.read_csv(INPUT_FILE)
-df['StartDate'] = pd.to_datetime(df['StartDate'], format='%m/%d/%y %H:%M', errors='coerce')
-df['is_synthetic'] = 0
-
-# Replace missing demographics
-df = df.assign(
-    Afdeling=df['Afdeling'].fillna('Onbekend'),
-    Dienstverband=df['Dienstverband'].fillna('Onbekend'),
-    Leeftijd=df['Leeftijd'].fillna('Onbekend')
-)
 
+# Chunked mode: synthetic respondents are generated, normalized and written in
+# blocks of CHUNK_SIZE, so peak memory no longer grows with SCALE_FACTOR.
+# Responses go to one CSV part per block in {OUTPUT_FILE_BASE}Response/.
+CHUNKED = False
+CHUNK_SIZE = 50_000  # synthetic respondents per block
+
+# Synthetic scores are drawn by SYNTH_WORKERS processes, SYNTH_TASK_ROWS rows of
+# one dimension per task. SYNTH_SEED = None draws fresh scores on every run.
+SYNTH_WORKERS = os.cpu_count() or 1
+SYNTH_TASK_ROWS = 10_000
+SYNTH_SEED = None
 # =====================================================
-# CLEAN SURVEY DATA
-# =====================================================
-survey_cols = [c for c in df.columns if any(c.startswith(x) for x in ['A', 'I', 'E', 'O', 'H'])]
-dimensions = ['A', 'I', 'E', 'O', 'H']
 
-# Convert to numeric (non-numeric -> NaN)
-for col in survey_cols:
-    df[col] = pd.to_numeric(df[col], errors='coerce')
-
-# Fill missing with random integers from valid values
-for col in survey_cols:
-    valid = df[col].dropna().astype(int)
-    if not valid.empty:
-        df[col] = df[col].apply(lambda x: np.random.choice(valid) if pd.isna(x) else int(x))
-    else:
-        df[col] = 3
+dimensions = ['A', 'I', 'E', 'O', 'H']
 
-# =====================================================
-# ADD REGIONS AND CLEAN CATEGORICAL FIELDS
-# =====================================================
 regions = [
     "Noord-Holland", "Zuid-Holland", "Utrecht", "Limburg", "Gelderland",
     "Overijssel", "Friesland", "Drenthe", "Zeeland", "Flevoland"
 ]
-df['Region'] = np.random.choice(regions, size=len(df))
 
 extra_afdelingen = [
     "Financiën", "HR", "Marketing", "Communicatie", "ICT", "Klantenservice",
@@ -67,116 +54,330 @@ extra_afdelingen = [
 dienst_choices = ["<3 jaar", "3-10 jaar", "10-20 jaar", ">20 jaar"]
 age_choices = ["<25", "25-35", "35-45", "45-55", "55+"]
 
-# --- Clean Afdeling ---
-df['Afdeling'] = df['Afdeling'].astype(str)
-df['Afdeling'] = df['Afdeling'].replace(['', 'None', 'nan', 'NaN', 'Onbekend'], np.nan)
-
-# Remove numeric-like afdeling values
-df['Afdeling'] = df['Afdeling'].apply(
-    lambda x: x if isinstance(x, str) and not x.replace(' ', '').isdigit() else np.nan
-)
-
-# Fill missing with random Afdelingen
-mask = df['Afdeling'].isna()
-df.loc[mask, 'Afdeling'] = np.random.choice(extra_afdelingen, size=mask.sum())
-
-# Clean Dienstverband + Leeftijd
-df['Dienstverband'] = np.where(
-    df['Dienstverband'].isin(dienst_choices),
-    df['Dienstverband'],
-    np.random.choice(dienst_choices, size=len(df))
-)
-
-df['Leeftijd'] = np.where(
-    df['Leeftijd'].isin(age_choices),
-    df['Leeftijd'],
-    np.random.choice(age_choices, size=len(df))
-)
-
-# =====================================================
-# SYNTHETIC DATA GENERATION (PATTERN-BASED)
-# =====================================================
-n_synth = len(df) * SCALE_FACTOR
-synthetic = df.sample(n=n_synth, replace=True).copy()
-
-# Generate correlated synthetic scores per dimension
-for dim in dimensions:
-    cols = [c for c in survey_cols if c.startswith(dim)]
-    df_subset = df[cols].apply(pd.to_numeric, errors='coerce').dropna()
-    if df_subset.empty:
-        continue
-
-    means = df_subset.mean().values
-    cov = df_subset.corr().values
-    cov = np.nan_to_num(cov)
-    cov = (cov + cov.T) / 2
-    np.fill_diagonal(cov, 1.0)
-
-    synth_values = np.random.multivariate_normal(means, cov * 0.4, size=n_synth)
-    synth_values = np.clip(np.round(synth_values), 1, 5).astype(int)
-    for i, col in enumerate(cols):
-        synthetic[col] = synth_values[:, i]
-
-# Demographics
-synthetic['Region'] = np.random.choice(regions, size=n_synth)
-afdeling_choices = [str(x) for x in extra_afdelingen + list(df['Afdeling'].unique()) if pd.notna(x)]
-synthetic['Afdeling'] = np.random.choice(afdeling_choices, size=n_synth)
-synthetic['Dienstverband'] = np.random.choice(dienst_choices, size=n_synth)
-synthetic['Leeftijd'] = np.random.choice(age_choices, size=n_synth)
-synthetic['DistributionChannel'] = np.random.choice(df['DistributionChannel'].unique(), size=n_synth)
-
-# Random realistic dates
-start_date = datetime(2024, 1, 1)
-synthetic['StartDate'] = [start_date + timedelta(days=int(x)) for x in np.random.randint(0, 365, size=n_synth)]
-
-synthetic['ResponseId'] = [f"SYNTH_{i:06d}" for i in range(n_synth)]
-synthetic['is_synthetic'] = 1
-
-# Combine real + synthetic data
-df_big = pd.concat([df, synthetic], ignore_index=True)
-print(f"Combined dataset shape: {df_big.shape}")
-
-# =====================================================
-# NORMALIZE TO 3NF STRUCTURE
-# =====================================================
 respondent_cols = ['Region', 'Afdeling', 'Dienstverband', 'Leeftijd', 'UserLanguage', 'is_synthetic']
-respondents = df_big[respondent_cols].drop_duplicates().reset_index(drop=True)
-respondents['RespondentID'] = [uuid.uuid4().hex[:8] for _ in range(len(respondents))]
-
-df_big = df_big.merge(respondents, on=respondent_cols, how='left')
-
 session_cols = ['ResponseId', 'RespondentID', 'StartDate', 'Finished', 'DistributionChannel']
-sessions = df_big[session_cols].drop_duplicates().reset_index(drop=True)
-sessions['SessionID'] = [uuid.uuid4().hex[:8] for _ in range(len(sessions))]
+# Explicit, so a block whose StartDates are all midnight is not written date-only
+SESSION_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
-df_big = df_big.merge(sessions[['ResponseId', 'SessionID']], on='ResponseId', how='left')
+# Hashed ids (see surrogate_keys.py): the same demographics / ResponseId get the
+# same id on every run. Both use the full 16-digit hash: sessions grow with
+# SCALE_FACTOR, and ~10^4 demographic combinations already risk collisions at 8.
+RESPONDENT_ID_WIDTH = 16
+SESSION_ID_WIDTH = 16
 
-responses = df_big.melt(
-    id_vars=['SessionID'],
-    value_vars=survey_cols,
-    var_name='QuestionCode',
-    value_name='Score'
-)
+start_date = datetime(2024, 1, 1)
 
-# =====================================================
-# EXPORT TO CSV (Database Ready)
-# =====================================================
-respondents.to_csv(f"{OUTPUT_FILE_BASE}Respondent.csv", index=False)
-sessions.to_csv(f"{OUTPUT_FILE_BASE}Session.csv", index=False)
-responses.to_csv(f"{OUTPUT_FILE_BASE}Response.csv", index=False)
 
-print(f"""
+# ---------------------------------------------------------
+# 1️⃣ LOAD AND CLEAN BASE DATA
+# ---------------------------------------------------------
+def load_base_data(path):
+    """Read the survey export and clean scores and demographics; returns (df, survey_cols)."""
+    df = pd.read_csv(path)
+    df['StartDate'] = pd.to_datetime(df['StartDate'], format='%m/%d/%y %H:%M', errors='coerce')
+    df['is_synthetic'] = 0
+
+    # Replace missing demographics
+    df = df.assign(
+        Afdeling=df['Afdeling'].fillna('Onbekend'),
+        Dienstverband=df['Dienstverband'].fillna('Onbekend'),
+        Leeftijd=df['Leeftijd'].fillna('Onbekend')
+    )
+
+    # --- Clean survey data ---
+    survey_cols = [c for c in df.columns if any(c.startswith(x) for x in dimensions)]
+
+    # Convert to numeric (non-numeric -> NaN)
+    for col in survey_cols:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    # Fill missing with random integers from valid values
+    for col in survey_cols:
+        valid = df[col].dropna().astype(int)
+        if not valid.empty:
+            df[col] = df[col].apply(lambda x: np.random.choice(valid) if pd.isna(x) else int(x))
+        else:
+            df[col] = 3
+
+    # --- Add regions and clean categorical fields ---
+    df['Region'] = np.random.choice(regions, size=len(df))
+
+    # Clean Afdeling
+    df['Afdeling'] = df['Afdeling'].astype(str)
+    df['Afdeling'] = df['Afdeling'].replace(['', 'None', 'nan', 'NaN', 'Onbekend'], np.nan)
+
+    # Remove numeric-like afdeling values
+    df['Afdeling'] = df['Afdeling'].apply(
+        lambda x: x if isinstance(x, str) and not x.replace(' ', '').isdigit() else np.nan
+    )
+
+    # Fill missing with random Afdelingen
+    mask = df['Afdeling'].isna()
+    df.loc[mask, 'Afdeling'] = np.random.choice(extra_afdelingen, size=mask.sum())
+
+    # Clean Dienstverband + Leeftijd
+    df['Dienstverband'] = np.where(
+        df['Dienstverband'].isin(dienst_choices),
+        df['Dienstverband'],
+        np.random.choice(dienst_choices, size=len(df))
+    )
+
+    df['Leeftijd'] = np.where(
+        df['Leeftijd'].isin(age_choices),
+        df['Leeftijd'],
+        np.random.choice(age_choices, size=len(df))
+    )
+    return df, survey_cols
+
+
+# ---------------------------------------------------------
+# 2️⃣ SCORE MODEL: one multivariate normal per dimension
+# ---------------------------------------------------------
+def _cholesky(cov):
+    """Lower factor L with L @ L.T == cov (eigen-decomposition if cov is only semi-definite)."""
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        eigvals, eigvecs = np.linalg.eigh(cov)
+        return eigvecs * np.sqrt(np.clip(eigvals, 0, None))
+
+
+def fit_dimension_models(df, survey_cols):
+    """
+    Per dimension: (question columns, means, Cholesky factor of cov * 0.4).
+
+    Fitted once on the real data; drawing is then a matrix product, where
+    np.random.multivariate_normal refactorized the covariance on every call.
+    """
+    models = []
+    for dim in dimensions:
+        cols = [c for c in survey_cols if c.startswith(dim)]
+        df_subset = df[cols].apply(pd.to_numeric, errors='coerce').dropna()
+        if df_subset.empty:
+            continue
+
+        means = df_subset.mean().values
+        cov = df_subset.corr().values
+        cov = np.nan_to_num(cov)
+        cov = (cov + cov.T) / 2
+        np.fill_diagonal(cov, 1.0)
+        models.append((cols, means, _cholesky(cov * 0.4)))
+    return models
+
+
+# Scores are whole numbers 1-5 once rounded and clipped
+SCORE_DTYPE = np.int8
+
+# Per-process state for score workers (set once by _init_score_worker, not pickled per task)
+_score_worker = {}
+
+
+def _init_score_worker(shm_name, shape, layout):
+    shm = SharedMemory(name=shm_name)
+    _score_worker.update(shm=shm, scores=np.ndarray(shape, dtype=SCORE_DTYPE, buffer=shm.buf), layout=layout)
+
+
+def _draw_scores(task):
+    """Draw rows start:stop of one dimension, round and clip in place, store in the shared matrix."""
+    model, start, stop, seed_seq = task
+    first, means, factor = _score_worker['layout'][model]
+    z = np.random.default_rng(seed_seq).standard_normal((stop - start, len(means)))
+    values = z @ factor.T
+    values += means
+    np.round(values, out=values)
+    np.clip(values, 1, 5, out=values)
+    _score_worker['scores'][start:stop, first:first + len(means)] = values
+
+
+class ScoreSynthesizer:
+    """
+    Worker pool plus one shared-memory int8 score matrix (max_rows x all
+    question columns). Each draw is split into (dimension, row range) tasks
+    with their own spawned seed, so results do not depend on the worker count.
+    """
+
+    def __init__(self, models, max_rows, workers=SYNTH_WORKERS, seed=SYNTH_SEED):
+        self.columns = [col for cols, _, _ in models for col in cols]
+        offsets = np.cumsum([0] + [len(cols) for cols, _, _ in models])
+        layout = [(int(first), means, factor) for first, (_, means, factor) in zip(offsets, models)]
+        shape = (max(max_rows, 1), max(len(self.columns), 1))
+
+        self._shm = SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(SCORE_DTYPE).itemsize)
+        self._scores = np.ndarray(shape, dtype=SCORE_DTYPE, buffer=self._shm.buf)
+        self._n_models = len(models)
+        self._seed_seq = np.random.SeedSequence(seed)
+        init_args = (self._shm.name, shape, layout)
+        if workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_score_worker, initargs=init_args)
+        else:
+            self._pool = None
+            _init_score_worker(*init_args)
+
+    def draw(self, n):
+        """Scores for n respondents, columns in self.columns order (a view, valid until the next draw)."""
+        starts = range(0, n, SYNTH_TASK_ROWS)
+        seeds = self._seed_seq.spawn(self._n_models * len(starts))
+        tasks = [
+            (model, start, min(start + SYNTH_TASK_ROWS, n), seeds[model * len(starts) + k])
+            for model in range(self._n_models)
+            for k, start in enumerate(starts)
+        ]
+        if self._pool is None:
+            for task in tasks:
+                _draw_scores(task)
+        else:
+            list(self._pool.map(_draw_scores, tasks))
+        return self._scores[:n, :len(self.columns)]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+        else:
+            _score_worker.pop('shm').close()
+            _score_worker.clear()
+        del self._scores
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------------------------------------
+# 3️⃣ SYNTHETIC RESPONDENTS (PATTERN-BASED)
+# ---------------------------------------------------------
+def synthesize(df, synthesizer, n, offset=0):
+    """n synthetic respondents patterned on df, numbered SYNTH_{offset:06d} onwards."""
+    synthetic = df.sample(n=n, replace=True).copy()
+
+    # Correlated synthetic scores per dimension
+    if synthesizer.columns:
+        synthetic[synthesizer.columns] = synthesizer.draw(n).astype(int)
+
+    # Demographics
+    afdeling_choices = [str(x) for x in extra_afdelingen + list(df['Afdeling'].unique()) if pd.notna(x)]
+    synthetic['Region'] = np.random.choice(regions, size=n)
+    synthetic['Afdeling'] = np.random.choice(afdeling_choices, size=n)
+    synthetic['Dienstverband'] = np.random.choice(dienst_choices, size=n)
+    synthetic['Leeftijd'] = np.random.choice(age_choices, size=n)
+    synthetic['DistributionChannel'] = np.random.choice(df['DistributionChannel'].unique(), size=n)
+
+    # Random realistic dates
+    synthetic['StartDate'] = start_date + pd.to_timedelta(np.random.randint(0, 365, size=n), unit='D')
+
+    synthetic['ResponseId'] = [f"SYNTH_{i:06d}" for i in range(offset, offset + n)]
+    synthetic['is_synthetic'] = 1
+    return synthetic
+
+
+def _export_summary(respondents_shape, sessions_shape, responses_shape, response_target):
+    print(f"""
 Exported 3NF CSVs ready for relational import:
-- Respondent: {respondents.shape}
-- Session: {sessions.shape}
-- Response: {responses.shape}
+- Respondent: {respondents_shape}
+- Session: {sessions_shape}
+- Response: {responses_shape}
 
 Files saved as:
 {OUTPUT_FILE_BASE}Respondent.csv
 {OUTPUT_FILE_BASE}Session.csv
-{OUTPUT_FILE_BASE}Response.csv
+{response_target}
 """)
 
 
-
-
+# ---------------------------------------------------------
+# 4️⃣ NORMALIZE TO 3NF AND EXPORT
+# ---------------------------------------------------------
+def export_in_memory(df, survey_cols, synthesizer, n_synth):
+    synthetic = synthesize(df, synthesizer, n_synth)
+
+    # Combine real + synthetic data
+    df_big = pd.concat([df, synthetic], ignore_index=True)
+    print(f"Combined dataset shape: {df_big.shape}")
+
+    respondents, df_big['RespondentID'] = assign_keys(
+        df_big[respondent_cols], 'RespondentID', width=RESPONDENT_ID_WIDTH, namespace='respondent')
+    _, df_big['SessionID'] = assign_keys(
+        df_big['ResponseId'], 'SessionID', width=SESSION_ID_WIDTH, namespace='session')
+
+    sessions = df_big[session_cols + ['SessionID']].drop_duplicates().reset_index(drop=True)
+
+    responses = df_big.melt(
+        id_vars=['SessionID'],
+        value_vars=survey_cols,
+        var_name='QuestionCode',
+        value_name='Score'
+    )
+
+    # Export to CSV (database ready)
+    respondents.to_csv(f"{OUTPUT_FILE_BASE}Respondent.csv", index=False)
+    sessions.to_csv(f"{OUTPUT_FILE_BASE}Session.csv", index=False, date_format=SESSION_DATE_FORMAT)
+    responses.to_csv(f"{OUTPUT_FILE_BASE}Response.csv", index=False)
+
+    _export_summary(respondents.shape, sessions.shape, responses.shape, f"{OUTPUT_FILE_BASE}Response.csv")
+
+
+def export_chunked(df, survey_cols, synthesizer, n_synth):
+    """
+    Normalize and export block by block. Respondents are demographic
+    combinations, so the registry of those already written stays small.
+    Sessions are appended to the Session CSV per block.
+    """
+    response_dir = Path(f"{OUTPUT_FILE_BASE}Response")
+    response_dir.mkdir(exist_ok=True)
+    for stale in response_dir.glob("part-*.csv"):
+        stale.unlink()
+    session_file = f"{OUTPUT_FILE_BASE}Session.csv"
+
+    respondents = df[respondent_cols].iloc[:0].assign(RespondentID=pd.Series(dtype=object))
+    n_sessions = 0
+    n_responses = 0
+
+    def blocks():
+        """The real respondents first, then the synthetic ones CHUNK_SIZE at a time."""
+        yield df
+        for start in range(0, n_synth, CHUNK_SIZE):
+            yield synthesize(df, synthesizer, min(CHUNK_SIZE, n_synth - start), start)
+
+    for part, block in enumerate(blocks()):
+        block_respondents, block['RespondentID'] = assign_keys(
+            block[respondent_cols], 'RespondentID', width=RESPONDENT_ID_WIDTH, namespace='respondent')
+        respondents = pd.concat([respondents, block_respondents]).drop_duplicates(ignore_index=True)
+        if not respondents['RespondentID'].is_unique:
+            raise ValueError("RespondentID hash ids collide; increase RESPONDENT_ID_WIDTH")
+        _, block['SessionID'] = assign_keys(
+            block['ResponseId'], 'SessionID', width=SESSION_ID_WIDTH, namespace='session')
+
+        sessions = block[session_cols + ['SessionID']].drop_duplicates().reset_index(drop=True)
+        sessions.to_csv(session_file, index=False, mode='w' if part == 0 else 'a', header=part == 0,
+                        date_format=SESSION_DATE_FORMAT)
+        n_sessions += len(sessions)
+
+        responses = block.melt(
+            id_vars=['SessionID'],
+            value_vars=survey_cols,
+            var_name='QuestionCode',
+            value_name='Score'
+        )
+        responses.to_csv(response_dir / f"part-{part:05d}.csv", index=False)
+        n_responses += len(responses)
+        print(f"Block {part}: {len(block):,} respondents -> {len(responses):,} responses")
+
+    respondents.to_csv(f"{OUTPUT_FILE_BASE}Respondent.csv", index=False)
+
+    _export_summary(respondents.shape, (n_sessions, len(session_cols) + 1),
+                    (n_responses, 3), f"{response_dir}/part-*.csv")
+
+
+if __name__ == "__main__":
+    df, survey_cols = load_base_data(INPUT_FILE)
+    n_synth = len(df) * SCALE_FACTOR
+    models = fit_dimension_models(df, survey_cols)
+
+    with ScoreSynthesizer(models, CHUNK_SIZE if CHUNKED else n_synth) as synthesizer:
+        if CHUNKED:
+            export_chunked(df, survey_cols, synthesizer, n_synth)
+        else:
+            export_in_memory(df, survey_cols, synthesizer, n_synth)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed build cache for the external benchmark wrangling scripts.
+
+A parsed source file (Eurostat workbook, OECD extract, Kaggle CSV) is stored
+as Parquet under a key made of
+    the SHA-256 of the source file's content,
+    the parser name and version, and
+    the parser options (e.g. which metadata labels are extracted).
+A later run with the same source bytes and the same parser finds the entry
+and skips parsing; combined outputs and 3NF tables are then rebuilt from the
+cached partitions. Changing a file, bumping the parser version or changing
+its options simply misses, so the cache never has to be invalidated by hand.
+
+Files are only re-hashed when their size or modification time changed since
+the last run (see scripts/file_hash.py). Entries are written to a temporary
+directory and renamed into place, so an interrupted run never leaves a half-
+written partition behind. Old entries are not pruned; delete .build_cache/ to
+reclaim the space.
+
+The cache lives in .build_cache/ next to this file (BUILD_CACHE_DIR overrides
+it). It needs pyarrow; without it, or with BUILD_CACHE=0, every source is
+parsed as before.
+
+Usage (scripts add this folder to sys.path first):
+    from build_cache import cached
+
+    df = cached("Enterprise_GenAI_Adoption_Impact.csv", load_input, "genai_adoption", PARSER_VERSION)
+
+parse(source) returns a DataFrame or a dict of DataFrames; the cache hands
+back the same shape. lookup() and store() are the two halves of cached(),
+for scripts that parse misses elsewhere (e.g. in a process pool).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+from file_hash import file_stamp, load_json, write_json
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine)
+except ImportError:  # Optional dependency - fall back to parsing every run
+    pyarrow = None
+
+CACHE_DIR = Path(os.getenv("BUILD_CACHE_DIR", Path(__file__).resolve().parent / ".build_cache"))
+CACHE_VERSION = 1  # Bump to invalidate every entry after a storage format change
+
+MANIFEST = "manifest.json"
+SOURCES = "sources.json"
+
+
+def cache_enabled():
+    """Caching needs pyarrow and is not disabled via BUILD_CACHE=0."""
+    return pyarrow is not None and os.getenv("BUILD_CACHE", "1") != "0"
+
+
+def source_digest(source, parser):
+    """SHA-256 of source, reusing the last run's hash while size and mtime are unchanged."""
+    source = Path(source).resolve()
+    stamps_path = CACHE_DIR / parser / SOURCES
+    stamps = load_json(stamps_path) or {}
+    previous = stamps.get(str(source))
+    stamp = file_stamp(source, previous)  # FileNotFoundError for a missing source, as when parsing
+    if stamp != previous:
+        stamps[str(source)] = stamp
+        try:
+            stamps_path.parent.mkdir(parents=True, exist_ok=True)
+            write_json(stamps_path, stamps)
+        except OSError:
+            pass  # Only costs a re-hash next run
+    return stamp["sha256"]
+
+
+def entry_key(digest, parser, version, options=None):
+    """Cache key: source content + parser name, version and options."""
+    spec = json.dumps(
+        {"cache": CACHE_VERSION, "sha256": digest, "parser": parser, "version": version, "options": options},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()
+
+
+def _entry_dir(source, parser, version, options):
+    return CACHE_DIR / parser / entry_key(source_digest(source, parser), parser, version, options)
+
+
+def lookup(source, parser, version, options=None):
+    """The cached parse of source (DataFrame or dict of DataFrames), or None on a miss."""
+    if not cache_enabled():
+        return None
+    entry = _entry_dir(source, parser, version, options)
+    manifest = load_json(entry / MANIFEST)
+    if not manifest:
+        return None
+    try:
+        frames = {name: pd.read_parquet(entry / f"{i}.parquet") for i, name in enumerate(manifest["frames"])}
+    except (OSError, ValueError, KeyError):
+        return None  # Unreadable entry: parse again (and overwrite it)
+    return frames[None] if manifest["single"] else frames
+
+
+def store(source, parser, version, result, options=None):
+    """Save parse output for source; failures only cost the speed-up next run."""
+    if not cache_enabled():
+        return
+    single = isinstance(result, pd.DataFrame)
+    frames = {None: result} if single else result
+    entry = _entry_dir(source, parser, version, options)
+    tmp = entry.with_name(f"{entry.name}.tmp{os.getpid()}")
+    try:
+        tmp.mkdir(parents=True, exist_ok=True)
+        for i, df in enumerate(frames.values()):
+            df.to_parquet(tmp / f"{i}.parquet")
+        write_json(tmp / MANIFEST, {
+            "source": Path(source).name,
+            "parser": parser,
+            "version": version,
+            "options": options,
+            "single": single,
+            "frames": list(frames),
+            "rows": [len(df) for df in frames.values()],
+        })
+        if entry.exists():
+            shutil.rmtree(entry)  # Unreadable older copy of the same entry
+        os.replace(tmp, entry)
+    except (OSError, ValueError, TypeError) as e:
+        # A read-only folder or a column Parquet cannot hold (mixed object types)
+        print(f"⚠️  Could not cache {Path(source).name}: {e}")
+    finally:
+        if tmp.exists():
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def cached(source, parse, parser, version, options=None):
+    """
+    parse(source), or its cached result if source's content, the parser
+    version and the options are unchanged since it was stored.
+    """
+    result = lookup(source, parser, version, options)
+    if result is None:
+        result = parse(source)
+        store(source, parser, version, result, options)
+    return result
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Surrogate keys for the 3NF wrangling scripts.
+
+Values (or combinations of columns) are factorized once into integer codes
+in order of first appearance. The codes give both the dimension table (one
+row per distinct value) and every row's foreign key by array indexing, so
+no merge back onto the fact table is needed. Missing values are a value of
+their own, as they were with drop_duplicates + merge.
+
+Keys are either
+    sequential  code + start (1, 2, 3, ...), stable while the input order is, or
+    hashed      hex digits of a 64-bit hash of the value and a namespace:
+                identical across runs and input orders, so loads can upsert.
+
+Only the distinct values are hashed. Hashed ids that collide within a
+dimension raise a ValueError; use a larger width.
+
+Fact rows without a natural key get row_ids(): a hash of the row's content
+(and occurrence number, for repeated rows). Use the full 16 digits for those
+and for any dimension that can grow large: 8 digits (32 bits) already risk
+a collision at ~10^4 distinct values and fail outright near 10^5.
+
+Small sequential ids that must not change between runs come from a
+KeyRegistry: the natural key -> id mapping is kept in a CSV, known keys keep
+their id and new keys are appended after the highest one.
+
+Usage (scripts add this folder to sys.path first):
+    from surrogate_keys import KeyRegistry, assign_keys, row_ids
+
+    dim_country, df['Country_id'] = assign_keys(df['Country'], 'Country_id', width=8, namespace='country')
+    df['RecordID'] = row_ids(df, width=16, namespace='fact')
+
+    registry = KeyRegistry('key_registry/countries.csv', ['country_name'], 'country_id')
+    countries, df['country_id'] = registry.assign(df)
+    registry.save()
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Two hex digits per byte value, for vectorized hex formatting
+_HEX_BYTES = np.array([f"{i:02x}" for i in range(256)])
+
+
+def factorize_keys(data):
+    """
+    (codes, first_rows): an int64 code per row in order of first appearance,
+    and the position of each code's first row. data is a Series (one value
+    per row) or a DataFrame (the combination of its columns per row).
+    """
+    if isinstance(data, pd.Series):
+        codes, _ = pd.factorize(data, use_na_sentinel=False)
+    else:
+        codes = np.zeros(len(data), dtype=np.int64)
+        for col in data.columns:
+            col_codes, col_uniques = pd.factorize(data[col], use_na_sentinel=False)
+            # Fold the column in, then recompress so the codes stay small
+            codes, _ = pd.factorize(codes * len(col_uniques) + col_codes)
+    codes = codes.astype(np.int64, copy=False)
+    first_rows = pd.Series(codes).drop_duplicates().index.to_numpy()
+    return codes, first_rows
+
+
+def hash_ids(values, width=16, namespace=None):
+    """
+    Stable hex ids for the values of a Series or the rows of a DataFrame:
+    the first `width` hex digits (at most 16) of pandas' 64-bit hash.
+    """
+    if not 1 <= width <= 16:
+        raise ValueError(f"width must be 1-16 hex digits, got {width}")
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    if namespace is not None:
+        hashes = hashes ^ pd.util.hash_array(np.array([namespace], dtype=object))[0]
+    digits = _HEX_BYTES[hashes.astype('>u8').view(np.uint8).reshape(-1, 8)]
+    return np.ascontiguousarray(digits).view('U16').ravel().astype(f'U{width}').astype(object)
+
+
+def _check_unique(ids, width, what):
+    if not pd.Series(ids).is_unique:
+        raise ValueError(f"{width}-digit hash ids collide for {what}; use a larger width")
+
+
+def row_ids(frame, width=16, namespace=None, name='row'):
+    """
+    Stable hex id per row of frame, from its content. Identical rows are told
+    apart by their occurrence number, so every row gets its own id.
+    """
+    occurrence = frame.groupby(list(frame.columns), dropna=False, sort=False).cumcount().to_numpy()
+    ids = hash_ids(frame.assign(_occurrence=occurrence), width, namespace)
+    _check_unique(ids, width, name)
+    return ids
+
+
+def assign_keys(data, key_name, hashed=True, width=16, namespace=None, start=1):
+    """
+    Dimension table and per-row keys in one pass.
+
+    data: Series, or DataFrame whose column combination is the dimension
+    Returns (dim, keys): dim holds each distinct value once (first-appearance
+    order) plus key_name; keys is the key of every row of data.
+    """
+    codes, first_rows = factorize_keys(data)
+    dim = data.iloc[first_rows].reset_index(drop=True)
+    dim = dim.to_frame() if isinstance(dim, pd.Series) else dim
+    if hashed:
+        dim_keys = hash_ids(dim, width, namespace)
+        _check_unique(dim_keys, width, key_name)
+    else:
+        dim_keys = np.arange(start, start + len(dim), dtype=np.int64)
+    dim[key_name] = dim_keys
+    return dim, dim_keys[codes]
+
+
+class KeyRegistry:
+    """
+    Sequential surrogate keys that persist across runs.
+
+    path holds one row per natural key ever seen (the key columns plus
+    key_name). assign() looks the distinct keys of the data up in the
+    registry by factorizing both together (hash tables, no merges): known
+    keys keep their id, new ones get the next ids in order of first
+    appearance. Missing values are part of the key, stored as empty cells.
+    """
+
+    def __init__(self, path, columns, key_name):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.key_name = key_name
+        if self.path.exists():
+            table = pd.read_csv(self.path, dtype=str, keep_default_na=False, na_values=[""])
+            missing = [c for c in self.columns + [key_name] if c not in table.columns]
+            if missing:
+                raise ValueError(f"{self.path} lacks key registry columns {missing}")
+            self.table = table[self.columns].astype("string")
+            self.table[key_name] = table[key_name].astype(np.int64)
+        else:
+            self.table = pd.DataFrame({c: pd.Series(dtype="string") for c in self.columns})
+            self.table[key_name] = pd.Series(dtype=np.int64)
+        if len(self.table[self.columns].drop_duplicates()) != len(self.table):
+            raise ValueError(f"{self.path} maps a natural key to more than one {key_name}")
+
+    def assign(self, data):
+        """
+        (dim, keys) as from assign_keys: dim holds the natural keys present in
+        data (in id order) plus key_name; keys is the id of every row of data.
+        New keys are added to the registry; save() persists them.
+        """
+        data = data.to_frame() if isinstance(data, pd.Series) else data[self.columns]
+        codes, first_rows = factorize_keys(data.astype("string"))
+        distinct = data.iloc[first_rows].reset_index(drop=True)
+
+        # Registry rows are unique and come first, so their codes are 0..known-1
+        known = len(self.table)
+        both = pd.concat([self.table[self.columns], distinct.astype("string")], ignore_index=True)
+        distinct_codes = factorize_keys(both)[0][known:]
+        is_new = distinct_codes >= known
+        next_id = int(self.table[self.key_name].max()) + 1 if known else 1
+        dim_ids = next_id + distinct_codes - known
+        dim_ids[~is_new] = self.table[self.key_name].to_numpy()[distinct_codes[~is_new]]
+
+        if is_new.any():
+            added = distinct[is_new].astype("string")
+            added[self.key_name] = dim_ids[is_new]
+            self.table = pd.concat([self.table, added], ignore_index=True)
+
+        distinct[self.key_name] = dim_ids
+        dim = distinct.sort_values(self.key_name, kind="stable").reset_index(drop=True)
+        return dim, dim_ids[codes]
+
+    def save(self):
+        """Write the registry (all keys ever assigned, in id order)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.table.sort_values(self.key_name).to_csv(self.path, index=False, na_rep="")
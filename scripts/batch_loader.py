@@ -0,0 +1,267 @@
+"""
+Concurrent Batch Loader
+=======================
+
+Shared helper for the Supabase import scripts. Keeps a bounded number of
+insert batches in flight at once so imports are limited by throughput
+instead of one HTTP round-trip per batch.
+
+Usage:
+    from batch_loader import ConcurrentBatchLoader
+
+    loader = ConcurrentBatchLoader(insert_fn, max_in_flight=4)
+    for result in loader.run(batches):
+        ...  # per-batch reporting, in completion order
+    loader.report.print_summary()
+
+A batch that the server rejects can be bisected to isolate the bad rows
+(see insert_with_bisection): good rows still go through in large
+sub-batches and each rejected row comes back with the server's message.
+"""
+
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Type
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a single batch insert."""
+    batch_num: int
+    start_row: int
+    end_row: int
+    rows: list
+    inserted: int
+    latency: float
+    error: Optional[str] = None
+    rejected: list = field(default_factory=list)  # [(row, error message)] isolated by bisection
+    requests: int = 1
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def error_message(exc: Exception) -> str:
+    """Server error text for an exception (PostgREST APIError carries .message/.details)."""
+    message = getattr(exc, 'message', None)
+    details = getattr(exc, 'details', None)
+    if message and details:
+        return f"{message} ({details})"
+    return message or str(exc)
+
+
+def insert_with_bisection(insert_fn: Callable[[list], Optional[int]], rows: list,
+                          bisect_on: Tuple[Type[BaseException], ...] = (Exception,)) -> Tuple[int, list, int]:
+    """
+    Insert rows, splitting a rejected batch in half recursively until the
+    offending rows are isolated.
+
+    Good rows are committed in the largest sub-batches that succeed, so k bad
+    rows in a batch of n cost O(k log n) requests rather than n single-row
+    inserts. Exceptions not listed in `bisect_on` (e.g. transport errors)
+    are re-raised untouched, since splitting would not help.
+
+    Args:
+        insert_fn: Callable taking a list of rows; may return the inserted count
+        rows: Rows to insert
+        bisect_on: Exception types that indicate the server rejected the data
+
+    Returns:
+        tuple: (rows inserted, [(row, error message)] rejected, requests made)
+    """
+    try:
+        inserted = insert_fn(rows)
+        return (len(rows) if inserted is None else inserted), [], 1
+    except bisect_on as e:
+        if len(rows) == 1:
+            return 0, [(rows[0], error_message(e))], 1
+        mid = len(rows) // 2
+        left_ok, left_rejected, left_requests = insert_with_bisection(insert_fn, rows[:mid], bisect_on)
+        right_ok, right_rejected, right_requests = insert_with_bisection(insert_fn, rows[mid:], bisect_on)
+        return (
+            left_ok + right_ok,
+            left_rejected + right_rejected,
+            1 + left_requests + right_requests,
+        )
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class ThroughputReport:
+    """Collects per-batch latencies and row counts for a load run."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+        self.latencies = []
+        self.rows_ok = 0
+        self.rows_failed = 0
+        self.batches_ok = 0
+        self.batches_failed = 0
+        self.batches_skipped = 0
+
+    def record(self, result: BatchResult):
+        self.latencies.append(result.latency)
+        if result.ok:
+            self.batches_ok += 1
+            self.rows_ok += result.inserted
+            self.rows_failed += len(result.rejected)
+        else:
+            self.batches_failed += 1
+            self.rows_failed += len(result.rows)
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+
+    def summary(self) -> dict:
+        """
+        Summarise the run.
+
+        Returns:
+            dict: rows/s, batch latency percentiles (seconds) and counts
+        """
+        end = self.finished_at or time.perf_counter()
+        elapsed = max(end - self.started_at, 1e-9)
+        latencies = sorted(self.latencies)
+        return {
+            'elapsed_s': elapsed,
+            'rows_ok': self.rows_ok,
+            'rows_failed': self.rows_failed,
+            'batches_ok': self.batches_ok,
+            'batches_failed': self.batches_failed,
+            'batches_skipped': self.batches_skipped,
+            'rows_per_s': self.rows_ok / elapsed,
+            'p50_latency_s': _percentile(latencies, 50),
+            'p95_latency_s': _percentile(latencies, 95),
+            'max_latency_s': latencies[-1] if latencies else 0.0,
+        }
+
+    def format_lines(self) -> List[str]:
+        s = self.summary()
+        return [
+            f"Elapsed: {s['elapsed_s']:.2f}s",
+            f"Batches: {s['batches_ok']} ok, {s['batches_failed']} failed, {s['batches_skipped']} skipped",
+            f"Rows: {s['rows_ok']:,} ok, {s['rows_failed']:,} failed",
+            f"Throughput: {s['rows_per_s']:,.0f} rows/s",
+            f"Batch latency: p50={s['p50_latency_s'] * 1000:.0f}ms, "
+            f"p95={s['p95_latency_s'] * 1000:.0f}ms, max={s['max_latency_s'] * 1000:.0f}ms",
+        ]
+
+    def print_summary(self):
+        print("\nThroughput report:")
+        for line in self.format_lines():
+            print(f"  {line}")
+
+
+class ConcurrentBatchLoader:
+    """
+    Runs an insert function over a stream of batches with at most
+    `max_in_flight` requests outstanding.
+
+    Args:
+        insert_fn: Callable taking a list of row dicts. May return the number
+            of rows inserted; if it returns None the batch length is used.
+            Any exception marks the batch as failed.
+        max_in_flight: Upper bound on concurrent requests. 1 keeps the
+            original sequential behaviour.
+        bisect_on: Exception types that trigger bisection of a failed batch
+            (see insert_with_bisection). None disables bisection and a failed
+            batch is reported as a whole.
+    """
+
+    def __init__(self, insert_fn: Callable[[list], Optional[int]], max_in_flight: int = 4,
+                 bisect_on: Optional[Tuple[Type[BaseException], ...]] = None):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.insert_fn = insert_fn
+        self.max_in_flight = max_in_flight
+        self.bisect_on = bisect_on
+        self.report = ThroughputReport()
+
+    def _execute(self, batch_num: int, start_row: int, rows: list) -> BatchResult:
+        t0 = time.perf_counter()
+        rejected = []
+        requests = 1
+        try:
+            if self.bisect_on:
+                inserted, rejected, requests = insert_with_bisection(self.insert_fn, rows, self.bisect_on)
+            else:
+                inserted = self.insert_fn(rows)
+            error = None
+        except Exception as e:
+            inserted = 0
+            error = error_message(e)
+        latency = time.perf_counter() - t0
+        if error is None and inserted is None:
+            inserted = len(rows)
+        return BatchResult(
+            batch_num=batch_num,
+            start_row=start_row,
+            end_row=start_row + len(rows),
+            rows=rows,
+            inserted=inserted,
+            latency=latency,
+            error=error,
+            rejected=rejected,
+            requests=requests,
+        )
+
+    def run(self, batches: Iterable[list],
+            skip: Optional[Callable[[int], bool]] = None) -> Iterator[BatchResult]:
+        """
+        Submit batches lazily and yield results in completion order.
+
+        Batches are pulled from the iterable only when a slot frees up, so a
+        generator input is never materialised in full.
+
+        Args:
+            batches: Iterable of row lists
+            skip: Optional predicate on the 1-based batch number. Skipped
+                batches keep their number and row range but are not sent
+                (used to resume from a journal).
+        """
+        self.report = ThroughputReport()
+        batch_iter = iter(batches)
+        next_row = 0
+        batch_num = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            pending = set()
+            exhausted = False
+
+            while pending or not exhausted:
+                while not exhausted and len(pending) < self.max_in_flight:
+                    try:
+                        rows = next(batch_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if not rows:
+                        continue
+                    batch_num += 1
+                    start_row = next_row
+                    next_row += len(rows)
+                    if skip is not None and skip(batch_num):
+                        self.report.batches_skipped += 1
+                        continue
+                    pending.add(pool.submit(self._execute, batch_num, start_row, rows))
+
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: f.result().batch_num):
+                    result = future.result()
+                    self.report.record(result)
+                    yield result
+
+        self.report.finish()
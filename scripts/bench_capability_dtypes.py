@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Capability Dtype Memory Report
+==============================
+
+Memory of a long-format capability frame with the declared schema from
+capability_schema.py versus what pd.read_csv produces without it, at 1M and
+10M rows.
+
+Rows are synthesized from the labels in capability_baseline_oct2024.csv
+(32 constructs per respondent, the respondent's demographics repeated on
+each row). Columns are built and measured one at a time, so the report
+itself never holds a full 10M-row frame of Python strings.
+
+Baselines:
+    object     pandas < 3 (every label a Python str object)
+    default    this pandas version's read_csv default for text
+    declared   CAPABILITY_LONG_DTYPES
+
+Usage:
+    python scripts/bench_capability_dtypes.py [--rows 1000000 10000000]
+"""
+
+import argparse
+import io
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from capability_schema import CAPABILITY_LONG_DTYPES, CATEGORY_COLUMNS
+
+BASELINE_FILE = Path(__file__).parent.parent / 'data' / 'csv-imports' / 'capability_baseline_oct2024.csv'
+CONSTRUCTS_PER_RESPONDENT = 32
+MB = 1024 * 1024
+
+
+def default_text_dtype():
+    """Dtype read_csv gives a text column in this pandas version."""
+    return pd.read_csv(io.StringIO('label\nx\n'))['label'].dtype
+
+
+def synthetic_column(name: str, rows: int, labels: pd.DataFrame, rng: np.random.Generator) -> np.ndarray:
+    """One column of a synthetic long-format frame, as plain numpy values."""
+    construct_index = np.arange(rows) % CONSTRUCTS_PER_RESPONDENT
+    if name == 'ResponseId_id':
+        return np.char.add('CAP_', (np.arange(rows) // CONSTRUCTS_PER_RESPONDENT).astype('U8')).astype(object)
+    if name == 'score':
+        return np.round(rng.uniform(1.0, 5.0, rows), 1)
+    if name in ('dimension_id', 'construct_id', 'dimension', 'construct'):
+        column = labels[name]
+        values = column.to_numpy() if pd.api.types.is_integer_dtype(column) else column.to_numpy(dtype=object)
+        return values[construct_index]
+    # Demographics: one draw per respondent, repeated on each of its rows
+    values = np.asarray(labels[name].dropna().unique(), dtype=object)
+    respondents = (rows + CONSTRUCTS_PER_RESPONDENT - 1) // CONSTRUCTS_PER_RESPONDENT
+    drawn = values[rng.integers(0, len(values), respondents)]
+    return np.repeat(drawn, CONSTRUCTS_PER_RESPONDENT)[:rows]
+
+
+def column_memory(values: np.ndarray, name: str, text_dtype) -> dict:
+    """Deep memory of one column under each schema, in bytes."""
+    text = values.dtype == object
+    as_object = pd.Series(values, dtype=object if text else values.dtype)
+    default = pd.Series(values, dtype=text_dtype) if text else as_object
+    declared = as_object.astype(CAPABILITY_LONG_DTYPES.get(name, default.dtype))
+    return {
+        'object': as_object.memory_usage(deep=True, index=False),
+        'default': default.memory_usage(deep=True, index=False),
+        'declared': declared.memory_usage(deep=True, index=False),
+    }
+
+
+def memory_report(rows: int, labels: pd.DataFrame, seed: int = 42) -> dict:
+    """Per-column memory for a synthetic frame of `rows` rows."""
+    rng = np.random.default_rng(seed)
+    text_dtype = default_text_dtype()
+    columns = ['ResponseId_id', 'dimension_id', 'dimension', 'construct_id', 'construct', 'score'] + \
+        [c for c in CATEGORY_COLUMNS if c.endswith('_synthetic')]
+    return {name: column_memory(synthetic_column(name, rows, labels, rng), name, text_dtype)
+            for name in columns}
+
+
+def print_report(rows: int, report: dict):
+    print(f"\n{rows:,} rows")
+    print(f"  {'column':<22} {'object':>10} {'default':>10} {'declared':>10}")
+    for name, sizes in report.items():
+        print(f"  {name:<22} " + ' '.join(f"{sizes[k] / MB:>8.1f}MB" for k in ('object', 'default', 'declared')))
+    totals = {k: sum(sizes[k] for sizes in report.values()) for k in ('object', 'default', 'declared')}
+    print(f"  {'total':<22} " + ' '.join(f"{totals[k] / MB:>8.1f}MB" for k in ('object', 'default', 'declared')))
+    print(f"  declared vs object: -{(1 - totals['declared'] / totals['object']) * 100:.0f}%   "
+          f"declared vs default: -{(1 - totals['declared'] / totals['default']) * 100:.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory of long-format capability data per dtype schema")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    # One row per construct with its dimension, plus the demographic label pools
+    baseline = pd.read_csv(BASELINE_FILE)
+    labels = baseline.drop_duplicates('construct')\
+        .sort_values(['dimension_id', 'construct_id']).reset_index(drop=True)
+    for col in CATEGORY_COLUMNS:
+        if col.endswith('_synthetic'):
+            labels[col] = pd.Series(baseline[col].unique()).reindex(labels.index)
+
+    print(f"Text columns read as {default_text_dtype()} by default in pandas {pd.__version__}")
+    for rows in args.rows:
+        print_report(rows, memory_report(rows, labels))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Connection Pool Microbenchmark
+==============================
+
+Measures per-request overhead of a fresh HTTPS connection per request
+versus the shared keep-alive pool from supabase_client.py, against a local
+stand-in for PostgREST (TLS with a throwaway self-signed certificate, so the
+handshake cost is real; network latency is not).
+
+The stand-in server answers every POST with 201 and an empty body, like an
+insert with returning=minimal, so the numbers are transport overhead only.
+
+Usage:
+    python scripts/bench_http_pool.py [--requests 300] [--rows 500] [--max-in-flight 4]
+
+Requires the openssl CLI to create the certificate. The stdlib server only
+speaks HTTP/1.1, so HTTP/2 is not exercised here.
+"""
+
+import argparse
+import json
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from batch_loader import _percentile
+from supabase_client import pooled_session
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def make_certificate(directory: Path) -> tuple:
+    cert, key = directory / 'cert.pem', directory / 'key.pem'
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=localhost', '-addext', 'subjectAltName=DNS:localhost',
+         '-keyout', str(key), '-out', str(cert)],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+def start_server(cert: Path, key: Path) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(('localhost', 0), StandInHandler)
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(label: str, send, requests: int, max_in_flight: int) -> dict:
+    latencies = []
+
+    def timed(_):
+        t0 = time.perf_counter()
+        send()
+        latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        list(pool.map(timed, range(requests)))
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    result = {
+        'label': label,
+        'requests_per_s': requests / elapsed,
+        'p50_ms': _percentile(latencies, 50) * 1000,
+        'p95_ms': _percentile(latencies, 95) * 1000,
+    }
+    print(f"  {label:<28} {result['requests_per_s']:>8.0f} req/s   "
+          f"p50={result['p50_ms']:.2f}ms   p95={result['p95_ms']:.2f}ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs per-request HTTPS connections")
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--rows', type=int, default=500, help="Rows per simulated insert batch")
+    parser.add_argument('--max-in-flight', type=int, default=4)
+    args = parser.parse_args()
+
+    body = json.dumps([{'respondent_id': f'R{i}', 'construct_1': 3.5} for i in range(args.rows)])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = make_certificate(Path(tmp))
+        server = start_server(cert, key)
+        base_url = f"https://localhost:{server.server_address[1]}/rest/v1"
+        options = {'verify': str(cert), 'http2': False, 'pool_size': args.max_in_flight}
+
+        def fresh_connection():
+            with pooled_session(base_url, **options) as session:
+                session.post('/respondents', content=body)
+
+        shared = pooled_session(base_url, **options)
+
+        def pooled():
+            shared.post('/respondents', content=body)
+
+        print(f"{args.requests} POSTs of {args.rows} rows, {args.max_in_flight} in flight:")
+        cold = run('new connection per request', fresh_connection, args.requests, args.max_in_flight)
+        run('pooled (warm-up)', pooled, args.max_in_flight, args.max_in_flight)
+        warm = run('pooled keep-alive', pooled, args.requests, args.max_in_flight)
+
+        shared.close()
+        server.shutdown()
+
+    print(f"\nPer-request overhead saved: {cold['p50_ms'] - warm['p50_ms']:.2f}ms (p50), "
+          f"throughput x{warm['requests_per_s'] / cold['requests_per_s']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Capability Long-Format Schema
+=============================
+
+Declared dtypes for long-format capability files (one row per respondent
+and construct: capability_baseline_oct2024.csv, capability_demo.csv, the
+journey phase files, ...).
+
+Every row repeats the dimension/construct names and the respondent's
+synthetic demographics, so those columns are categoricals (one small code
+per row plus a handful of distinct labels). The ids fit in int8 (8
+dimensions, 32 constructs) and scores are float32, which is far more than
+the two decimals the database keeps.
+
+    column               default read   declared
+    dimension_id         int64          int8
+    construct_id         int64          int8
+    score                float64        float32
+    dimension, construct,
+    *_synthetic          string         category
+
+ResponseId_id stays a string: it is (nearly) unique per respondent, so a
+categorical would not save anything.
+
+float32 holds a score like 3.7 as 3.7000000477, so scores are widened with
+widen_scores() before averaging or other arithmetic whose result is
+written out; delta_manifest.hash_records widens before rounding as well.
+
+Usage:
+    from capability_schema import read_capability_long
+
+    df = read_capability_long('data/csv-imports/capability_baseline_oct2024.csv')
+
+See bench_capability_dtypes.py for the memory saved at 1M and 10M rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+from csv_cache import read_csv_cached
+
+CATEGORY_COLUMNS = [
+    'dimension', 'construct',
+    'industry_synthetic', 'country_synthetic', 'continent_synthetic', 'role_synthetic',
+]
+
+CAPABILITY_LONG_DTYPES = {
+    'dimension_id': 'int8',
+    'construct_id': 'int8',
+    'score': 'float32',
+    **{col: 'category' for col in CATEGORY_COLUMNS},
+}
+
+# float32 keeps ~7 significant digits, so scores below 10 round-trip exactly to 6 decimals
+WIDEN_DECIMALS = 6
+
+
+def read_capability_long(path, **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Read a long-format capability CSV with the declared dtypes.
+
+    Columns missing from the file are simply not typed. The parsed frame is
+    cached next to the CSV (see csv_cache.py).
+    """
+    return read_csv_cached(path, dtype=CAPABILITY_LONG_DTYPES, **read_csv_kwargs)
+
+
+def compact_capability_long(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast an in-memory long-format frame to the declared dtypes (columns it has)."""
+    return df.astype({col: dtype for col, dtype in CAPABILITY_LONG_DTYPES.items() if col in df.columns})
+
+
+def widen_scores(values) -> pd.Series:
+    """float32 scores as float64 without the float32 representation error (3.7, not 3.7000000477)."""
+    return pd.Series(values).astype(np.float64).round(WIDEN_DECIMALS)
@@ -0,0 +1,80 @@
+"""
+COPY Loader Scripts
+===================
+
+Building blocks for the psql loaders written next to COPY text files by
+generate_nov_2024_data.py and wave_simulation.py (--format copy). A loader
+copies each file into a temporary staging table with \\copy and inserts
+respondents and capability scores from there, resolving the company id
+once per statement:
+
+    CREATE TEMP TABLE nov_respondents (...) ON COMMIT DROP;
+    \\copy nov_respondents FROM 'supabase/copy/nov_2024/respondents.tsv' WITH (FORMAT text)
+    INSERT INTO respondents (company_id, respondent_id, ...)
+    SELECT company.id, s.respondent_id, ...
+    FROM nov_respondents s CROSS JOIN (SELECT id FROM companies WHERE name = ...) AS company
+    ON CONFLICT DO NOTHING;
+
+Paths are written relative to the repository root when possible, so the
+loaders are meant to be run from there.
+"""
+
+from pathlib import Path
+from typing import List, Mapping, Sequence
+
+from sql_render import copy_source
+from wave_columns import capability_select, capability_targets, respondent_select, respondent_targets
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def loader_path(path) -> str:
+    """Path as written in a loader: relative to the repository root when possible."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def loader_header(title: str, output_dir: Path) -> List[str]:
+    """Opening lines: title, how to run the loader, stop on error, BEGIN."""
+    return [
+        f"-- {title}",
+        f"-- Run from the repository root: psql \"$DATABASE_URL\" -f {loader_path(Path(output_dir) / 'load.sql')}",
+        "",
+        "\\set ON_ERROR_STOP on",
+        "BEGIN;",
+        "",
+    ]
+
+
+def staging_table(table: str, columns: Sequence[str], types: Mapping[str, str]) -> List[str]:
+    """CREATE TEMP TABLE for a COPY file's columns (TEXT unless typed), dropped at COMMIT."""
+    definitions = ',\n'.join(f"  {c} {types.get(c, 'TEXT')}" for c in columns)
+    return [f"CREATE TEMP TABLE {table} (", definitions, ") ON COMMIT DROP;"]
+
+
+def copy_from(table: str, path) -> str:
+    """psql \\copy of a COPY text file into table."""
+    return f"\\copy {table} FROM {copy_source(loader_path(path))} WITH (FORMAT text)"
+
+
+def respondents_insert(staging: str, wave_sql: Sequence[str], company_cte: str) -> List[str]:
+    """INSERT INTO respondents from a staging table, for one company and survey wave."""
+    return [
+        f"INSERT INTO respondents ({', '.join(respondent_targets())})",
+        f"SELECT {', '.join(respondent_select('s', wave_sql, cast=False))}",
+        f"FROM {staging} s CROSS JOIN ({company_cte}) AS company",
+        "ON CONFLICT DO NOTHING;",
+    ]
+
+
+def capability_insert(staging: str, wave_sql: Sequence[str], company_cte: str) -> List[str]:
+    """INSERT INTO capability_scores from a staging table, for one company and survey wave."""
+    return [
+        f"INSERT INTO capability_scores ({', '.join(capability_targets())})",
+        f"SELECT {', '.join(capability_select('s', wave_sql, cast=False))}",
+        f"FROM {staging} s CROSS JOIN ({company_cte}) AS company",
+        "ON CONFLICT DO NOTHING;",
+    ]
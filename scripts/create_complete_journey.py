@@ -3,33 +3,39 @@ Create Complete 3-Phase Assessment Journey
 Demonstrates progressive improvement from baseline through two intervention cycles
 """
 
-import pandas as pd
-import numpy as np
 from pathlib import Path
 import json
 from datetime import datetime
 
-# Set random seed for reproducibility
-np.random.seed(42)
+from capability_schema import read_capability_long
+from csv_cache import read_csv_cached
+from wave_boosts import DEFAULT_SEED, phase_generators
+from wave_simulation import (
+    JOURNEY_2025, apply_capability_wave, apply_sentiment_wave, capability_id_column, sentiment_id_column,
+)
+
+PHASE2_WAVE, PHASE3_WAVE = JOURNEY_2025.waves
 
 class JourneyGenerator:
-    def __init__(self, baseline_path):
+    def __init__(self, baseline_path, seed=DEFAULT_SEED):
         self.data_dir = Path(baseline_path)
         self.output_dir = self.data_dir / 'journey'
         self.output_dir.mkdir(exist_ok=True)
+        # Independent streams per phase: each phase reproduces on its own
+        self.phase2_rng, self.phase3_rng = phase_generators(seed, 2)
         
     def load_baseline(self):
         """Load the original Oct 2024 baseline data"""
         print("📊 Loading Oct 2024 baseline data...")
-        sentiment_df = pd.read_csv(self.data_dir / 'sentiment_realistic.csv')
-        capability_df = pd.read_csv(self.data_dir / 'capability_demo.csv')
+        sentiment_df = read_csv_cached(self.data_dir / 'sentiment_realistic.csv')
+        capability_df = read_capability_long(self.data_dir / 'capability_demo.csv')
         
         print(f"   ✓ {len(sentiment_df)} sentiment responses")
         print(f"   ✓ {len(capability_df)} capability scores")
         
         return sentiment_df, capability_df
     
-    def create_phase2_march2025(self, sentiment_base, capability_base):
+    def create_phase2_march2025(self, sentiment_base, capability_base, rng=None):
         """
         Phase 2: March 2025 - After implementing A1, B2, C1
         
@@ -50,52 +56,12 @@ class JourneyGenerator:
         """
         print("\n📈 Creating Phase 2: March 2025 data...")
         print("   Interventions: A1 (Strategy), B2 (Training), C1 (Innovation)")
+        if rng is None:
+            rng = self.phase2_rng
         
-        # Sentiment improvements
-        sentiment_p2 = sentiment_base.copy()
-        id_col = 'respondent_id' if 'respondent_id' in sentiment_p2.columns else 'RespondentID'
-        sentiment_p2[id_col] = sentiment_p2[id_col].apply(lambda x: f"MAR25_{x}")
-        
-        improvement_map = {
-            'A1_strategy_org': (list(range(21, 26)), 0.5, 0.1),  # Q21-25: +0.5 avg
-            'B2_training_collab': (list(range(6, 11)), 0.4, 0.08),  # Q6-10: +0.4 avg
-            'C1_innovation_career': (list(range(16, 21)), 0.4, 0.08),  # Q16-20: +0.4 avg
-        }
-        
-        for intervention, (questions, improvement, std) in improvement_map.items():
-            for q in questions:
-                col = f'sentiment_{q}'
-                if col in sentiment_p2.columns:
-                    boost = np.random.normal(improvement, std, len(sentiment_p2))
-                    sentiment_p2[col] = np.minimum(sentiment_p2[col] + boost, 5.0)
-        
-        # Ambient improvement to all questions
-        for i in range(1, 26):
-            col = f'sentiment_{i}'
-            if col in sentiment_p2.columns:
-                ambient = np.random.normal(0.3, 0.05, len(sentiment_p2))
-                sentiment_p2[col] = np.minimum(sentiment_p2[col] + ambient, 5.0)
-        
-        # Capability improvements
-        capability_p2 = capability_base.copy()
-        id_col = 'ResponseId_id' if 'ResponseId_id' in capability_p2.columns else 'respondent_id'
-        capability_p2[id_col] = capability_p2[id_col].apply(lambda x: f"MAR25_{x}")
-        
-        high_impact_dims = {
-            1: 0.6,  # Strategy & Vision
-            4: 0.5,  # Talent & Skills
-            6: 0.4,  # Innovation
-            7: 0.5   # Adaptation & Adoption
-        }
-        
-        for idx, row in capability_p2.iterrows():
-            dim = row['dimension_id']
-            if dim in high_impact_dims:
-                boost = np.random.normal(high_impact_dims[dim], 0.1)
-            else:
-                boost = np.random.normal(0.3, 0.05)
-            
-            capability_p2.at[idx, 'score'] = min(row['score'] + boost, 5.0)
+        # Targeted + ambient (+0.3) sentiment and per-dimension capability boosts (wave_simulation.JOURNEY_2025)
+        sentiment_p2 = apply_sentiment_wave(sentiment_base, PHASE2_WAVE, rng)
+        capability_p2 = apply_capability_wave(capability_base, PHASE2_WAVE, rng)
         
         # Calculate improvements
         sentiment_cols = [f'sentiment_{i}' for i in range(1, 26)]
@@ -110,7 +76,7 @@ class JourneyGenerator:
         
         return sentiment_p2, capability_p2
     
-    def create_phase3_nov2025(self, sentiment_p2, capability_p2, sentiment_base, capability_base):
+    def create_phase3_nov2025(self, sentiment_p2, capability_p2, sentiment_base, capability_base, rng=None):
         """
         Phase 3: Nov 2025 - After implementing A3, B3, C2
         
@@ -128,61 +94,14 @@ class JourneyGenerator:
         """
         print("\n📈 Creating Phase 3: Nov 2025 data...")
         print("   NEW Interventions: A3 (Ethics), B3 (Change Mgmt), C2 (Product Dev)")
-        
-        # Sentiment improvements (building on Phase 2)
-        sentiment_p3 = sentiment_p2.copy()
-        id_col = 'respondent_id' if 'respondent_id' in sentiment_p3.columns else 'RespondentID'
-        
-        # Change IDs from MAR25_ to NOV25_
-        sentiment_p3[id_col] = sentiment_p3[id_col].apply(
-            lambda x: x.replace('MAR25_', 'NOV25_') if 'MAR25_' in str(x) else f"NOV25_{x}"
-        )
-        
-        improvement_map = {
-            'A3_ethics': (list(range(11, 16)), 0.4, 0.08),  # Q11-15: Trust & Ethics
-            'B3_change': (list(range(1, 6)), 0.4, 0.08),    # Q1-5: Personal acceptance
-            'C2_product': (list(range(16, 21)), 0.3, 0.06), # Q16-20: Career growth
-        }
-        
-        for intervention, (questions, improvement, std) in improvement_map.items():
-            for q in questions:
-                col = f'sentiment_{q}'
-                if col in sentiment_p3.columns:
-                    boost = np.random.normal(improvement, std, len(sentiment_p3))
-                    sentiment_p3[col] = np.minimum(sentiment_p3[col] + boost, 5.0)
-        
-        # Strong ambient improvement (culture shift visible)
-        for i in range(1, 26):
-            col = f'sentiment_{i}'
-            if col in sentiment_p3.columns:
-                ambient = np.random.normal(0.4, 0.06, len(sentiment_p3))
-                sentiment_p3[col] = np.minimum(sentiment_p3[col] + ambient, 5.0)
-        
-        # Capability improvements (building on Phase 2)
-        capability_p3 = capability_p2.copy()
-        id_col = 'ResponseId_id' if 'ResponseId_id' in capability_p3.columns else 'respondent_id'
-        
-        # Change IDs
-        capability_p3[id_col] = capability_p3[id_col].apply(
-            lambda x: x.replace('MAR25_', 'NOV25_') if 'MAR25_' in str(x) else f"NOV25_{x}"
-        )
-        
-        high_impact_dims = {
-            8: 0.7,  # Ethics & Responsibility (A3)
-            5: 0.6,  # Org & Processes (B3)
-            6: 0.5,  # Innovation (C2)
-            2: 0.5,  # Data Maturity
-            3: 0.5,  # Technology
-        }
-        
-        for idx, row in capability_p3.iterrows():
-            dim = row['dimension_id']
-            if dim in high_impact_dims:
-                boost = np.random.normal(high_impact_dims[dim], 0.1)
-            else:
-                boost = np.random.normal(0.4, 0.06)
-            
-            capability_p3.at[idx, 'score'] = min(row['score'] + boost, 5.0)
+        if rng is None:
+            rng = self.phase3_rng
+        
+        # Building on Phase 2; IDs change from MAR25_ to NOV25_ (baseline ids with the new prefix)
+        sentiment_p3 = apply_sentiment_wave(sentiment_p2, PHASE3_WAVE, rng,
+                                            ids=sentiment_base[sentiment_id_column(sentiment_base)])
+        capability_p3 = apply_capability_wave(capability_p2, PHASE3_WAVE, rng,
+                                              ids=capability_base[capability_id_column(capability_base)])
         
         # Calculate TOTAL improvements from baseline
         sentiment_cols = [f'sentiment_{i}' for i in range(1, 26)]
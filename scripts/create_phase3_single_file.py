@@ -8,70 +8,53 @@ import numpy as np
 import json
 from pathlib import Path
 
-np.random.seed(42)
+from capability_schema import read_capability_long, widen_scores
+from csv_cache import read_csv_cached
+from sql_render import pick_column
+from wave_boosts import DEFAULT_SEED
+from wave_columns import CAPABILITY_SYNTHETIC_DEFAULTS, RESPONDENT_TEXT_COLUMNS, SENTIMENT_COLS
+from wave_simulation import PHASE3_PACKAGE, apply_capability_wave, apply_sentiment_wave
 
 def main():
     print("📦 Creating Phase 3 single upload file...")
     
     # Load baseline
     data_dir = Path(__file__).parent.parent / 'data' / 'csv-imports'
-    sentiment_df = pd.read_csv(data_dir / 'sentiment_realistic.csv')
-    capability_df = pd.read_csv(data_dir / 'capability_demo.csv')
+    sentiment_df = read_csv_cached(data_dir / 'sentiment_realistic.csv')
+    capability_df = read_capability_long(data_dir / 'capability_demo.csv')
     
     print(f"   Loaded {len(sentiment_df)} sentiment + {len(capability_df)} capability records")
     
-    # Apply Phase 3 improvements (cumulative: 21% from P2 + 35% more = 56% total)
+    # Apply Phase 3 improvements (wave_simulation.PHASE3_PACKAGE)
     print("📈 Applying Phase 3 improvements...")
+    wave = PHASE3_PACKAGE.waves[0]
+    rng = np.random.default_rng(DEFAULT_SEED)
     
-    # Sentiment: 56% total improvement from baseline
-    sentiment_p3 = []
-    for _, row in sentiment_df.iterrows():
-        record = {}
-        # Copy demographics
-        id_col = 'respondent_id' if 'respondent_id' in row else 'RespondentID'
-        record['respondent_id'] = f"P3_{row.get(id_col, row.name)}"
-        record['region'] = row.get('region') or row.get('Region', 'Unknown')
-        record['department'] = row.get('department') or row.get('Department', 'Unknown')
-        record['employment_type'] = row.get('employment_type') or row.get('EmploymentType', 'Full-time')
-        record['age'] = row.get('age') or row.get('Age', '30-39')
-        record['user_language'] = row.get('user_language') or row.get('UserLanguage', 'en')
-        record['industry'] = row.get('industry') or row.get('Industry', 'Financial Services')
-        record['continent'] = row.get('continent') or row.get('Continent', 'North America')
-        
-        # Apply Phase 3: REDUCE resistance across all areas (lower = better)
-        # 50% reduction from baseline = transformation
-        for i in range(1, 26):
-            key = f'sentiment_{i}'
-            if pd.notna(row.get(key)):
-                record[key] = max(float(row[key]) * 0.50, 1.0) # Cut resistance in half, min 1.0
-        
-        sentiment_p3.append(record)
+    # Sentiment: REDUCE resistance across all areas (lower = better), cut in half, min 1.0
+    sentiment = apply_sentiment_wave(sentiment_df, wave, rng)
+    records = pd.DataFrame({
+        name: pick_column(sentiment, sources, default)
+        for name, sources, default in RESPONDENT_TEXT_COLUMNS
+    })
+    present = [col for col in SENTIMENT_COLS if col in sentiment.columns]
+    records[present] = sentiment[present].astype(float)
+    # Missing answers are left out of the record
+    sentiment_p3 = [{k: v for k, v in record.items() if not (k in present and pd.isna(v))}
+                    for record in records.to_dict('records')]
     
-    # Capability: Strong improvements across all dimensions (higher = better)
-    capability_p3 = []
-    for _, row in capability_df.iterrows():
-        id_col = 'ResponseId_id' if 'ResponseId_id' in row else 'respondent_id'
-        dim = int(row['dimension_id'])
-        
-        # Phase 3 improvements by dimension
-        multiplier = 1.25  # Default 25% improvement
-        if dim in [1, 8]:  # Strategy, Ethics - major focus
-            multiplier = 1.35
-        elif dim in [4, 6, 7]:  # Talent, Innovation, Adoption
-            multiplier = 1.30
-        
-        capability_p3.append({
-            'respondent_id': f"P3_{row.get(id_col, row.name)}",
-            'dimension_id': dim,
-            'dimension': row['dimension'],
-            'construct_id': int(row['construct_id']),
-            'construct': row['construct'],
-            'score': min(float(row['score']) * multiplier, 7.0), # Max 7.0
-            'industry_synthetic': row.get('industry_synthetic', 'Financial Services'),
-            'country_synthetic': row.get('country_synthetic', 'USA'),
-            'continent_synthetic': row.get('continent_synthetic', 'North America'),
-            'role_synthetic': row.get('role_synthetic', 'Analyst')
-        })
+    # Capability: Strong improvements across all dimensions (higher = better), +25-35%, max 7.0
+    capability = apply_capability_wave(capability_df, wave, rng)
+    capability_records = pd.DataFrame({
+        'respondent_id': pick_column(capability, ['ResponseId_id', 'respondent_id']),
+        'dimension_id': capability['dimension_id'].astype(int),
+        'dimension': capability['dimension'].astype(object),
+        'construct_id': capability['construct_id'].astype(int),
+        'construct': capability['construct'].astype(object),
+        'score': widen_scores(capability['score']),
+    })
+    for col, default in CAPABILITY_SYNTHETIC_DEFAULTS.items():
+        capability_records[col] = pick_column(capability, [col], default).astype(object)
+    capability_p3 = capability_records.to_dict('records')
     
     # Create combined package
     phase3_package = {
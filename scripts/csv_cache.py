@@ -0,0 +1,121 @@
+"""
+Columnar CSV Cache
+==================
+
+Drop-in replacement for pd.read_csv on the data/csv-imports inputs. The
+first read parses the CSV as usual and saves the frame as an uncompressed
+Feather (Arrow IPC) file in a .csv_cache/ directory next to it; later reads
+memory-map the Feather file instead of re-parsing, which is close to
+instant and grows more worthwhile with file size.
+
+A cached copy is used only if it still matches the CSV:
+
+- same size and modification time -> hit, without reading the CSV
+- size or mtime changed -> the CSV is hashed (SHA-256); if the content is
+  unchanged (a checkout or `touch`) the stamp is refreshed, otherwise the
+  cache is rebuilt
+
+The dtypes and read_csv options are part of the cache entry, so asking for
+different dtypes re-parses instead of returning the old columns. Declaring
+dtypes up front (e.g. category for repeated labels) keeps both the parse
+and the cached file small.
+
+Caching needs pyarrow; without it (or with CSV_CACHE=0) read_csv_cached is
+a plain pd.read_csv.
+
+Usage:
+    from csv_cache import read_csv_cached
+
+    df = read_csv_cached(data_dir / 'sentiment_realistic.csv', dtype={'region': 'category'})
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from file_hash import file_stamp, load_json, write_atomic, write_json
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # Optional dependency - fall back to plain CSV reads
+    feather = None
+
+CACHE_DIR_NAME = '.csv_cache'
+CACHE_VERSION = 1  # Bump to invalidate every cache entry after a format change
+
+
+def cache_enabled() -> bool:
+    """Caching needs pyarrow and is not disabled via CSV_CACHE=0."""
+    return feather is not None and os.getenv('CSV_CACHE', '1') != '0'
+
+
+def cache_paths(csv_path: Path) -> tuple:
+    """(Feather file, JSON stamp) for a CSV."""
+    cache_dir = csv_path.parent / CACHE_DIR_NAME
+    return cache_dir / f"{csv_path.name}.feather", cache_dir / f"{csv_path.name}.json"
+
+
+def _options_key(dtype, read_csv_kwargs: dict) -> str:
+    """Stable description of how the CSV was parsed."""
+    if isinstance(dtype, dict):
+        dtype = {str(k): str(v) for k, v in sorted(dtype.items(), key=lambda item: str(item[0]))}
+    elif dtype is not None:
+        dtype = str(dtype)
+    return json.dumps({'dtype': dtype, 'read_csv': read_csv_kwargs}, sort_keys=True, default=str)
+
+
+def read_csv_cached(path, dtype=None, **read_csv_kwargs) -> pd.DataFrame:
+    """
+    pd.read_csv with a memory-mapped Feather cache next to the CSV.
+
+    Args:
+        path: CSV file
+        dtype: Declared column dtypes (passed to read_csv, kept in the cache)
+        **read_csv_kwargs: Other read_csv options (part of the cache key)
+
+    Returns:
+        pd.DataFrame: Same frame pd.read_csv(path, dtype=dtype, ...) would return
+
+    Raises:
+        FileNotFoundError: The CSV does not exist (as with read_csv)
+    """
+    csv_path = Path(path)
+    if not cache_enabled():
+        return pd.read_csv(csv_path, dtype=dtype, **read_csv_kwargs)
+
+    feather_path, stamp_path = cache_paths(csv_path)
+    options = _options_key(dtype, read_csv_kwargs)
+
+    stamp = load_json(stamp_path)
+    current = file_stamp(csv_path, stamp)  # FileNotFoundError for a missing CSV, like read_csv
+    if stamp and feather_path.exists() and stamp.get('version') == CACHE_VERSION \
+            and stamp.get('options') == options and stamp.get('sha256') == current['sha256']:
+        if stamp.get('mtime_ns') != current['mtime_ns']:
+            # Content unchanged (checkout, touch): refresh the stamp and keep the cache
+            stamp.update(current)
+            write_json(stamp_path, stamp)
+        try:
+            return feather.read_table(feather_path, memory_map=True).to_pandas()
+        except (OSError, ValueError):
+            pass  # Unreadable cache entry: rebuild below
+
+    df = pd.read_csv(csv_path, dtype=dtype, **read_csv_kwargs)
+
+    try:
+        feather_path.parent.mkdir(exist_ok=True)
+        # Uncompressed so later reads can memory-map the columns
+        write_atomic(feather_path, lambda tmp: df.to_feather(tmp, compression='uncompressed'))
+        write_json(stamp_path, {
+            'version': CACHE_VERSION,
+            'source': csv_path.name,
+            **current,
+            'options': options,
+            'rows': len(df),
+        })
+    except (OSError, ValueError) as e:
+        # A read-only data directory or an unserializable frame only costs the speed-up
+        print(f"⚠️  Could not cache {csv_path.name}: {e}")
+
+    return df
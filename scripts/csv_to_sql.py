@@ -1,25 +1,158 @@
 #!/usr/bin/env python3
 """
 Convert sentiment_demo.csv to SQL INSERT statements
+
+The CSV is read lazily and respondents are written as a series of bounded
+INSERT statements (--rows-per-statement / --max-statement-bytes), so memory
+stays constant and psql / the Supabase SQL editor never see one giant
+statement. An output path ending in .gz (or --gzip) is compressed on the fly.
+
+With --format copy the respondents go to a COPY text file next to the
+output (<output stem>.respondents.tsv[.gz]) and the output becomes a small
+psql loader that pulls it in with \\copy - much faster to load than INSERT
+statements, with no SQL quoting involved. Run it from the repository root:
+
+    psql "$DATABASE_URL" -f supabase/import_all_data.sql
+
+Usage:
+    python scripts/csv_to_sql.py [--csv data-foundation/sentiment_demo.csv]
+        [--output supabase/import_all_data.sql] [--rows-per-statement 1000]
+        [--max-statement-bytes 1000000] [--transaction] [--gzip] [--format sql|copy]
 """
+import argparse
 import csv
+import gzip
 import sys
+from pathlib import Path
+
+from sql_render import COPY_NULL, copy_source, copy_value
 
 # Company ID for Acme Corp
 COMPANY_ID = '550e8400-e29b-41d4-a716-446655440001'
 
-def csv_to_sql(csv_path, output_path):
-    """Convert CSV to SQL INSERT statements"""
-    
-    with open(csv_path, 'r', encoding='utf-8') as csvfile:
+ROWS_PER_STATEMENT = 1000
+MAX_STATEMENT_BYTES = 1_000_000  # Well below what psql and the SQL editor handle comfortably
+
+RESPONDENT_COLUMNS = [
+    'company_id', 'respondent_id', 'region', 'department', 'employment_type', 'age', 'user_language',
+] + [f'sentiment_{i}' for i in range(1, 26)]
+
+def quote(value: str) -> str:
+    """SQL string literal with single quotes escaped"""
+    return "'" + value.replace("'", "''") + "'"
+
+def respondent_values(row: dict) -> str:
+    """Render one CSV row as a VALUES tuple"""
+    values = [
+        quote(COMPANY_ID),
+        quote(row['RespondentID']),
+        quote(row['Region']),
+        quote(row['Department']),
+        quote(row['Employment_type']),
+        quote(row['Age']),
+        quote(row['UserLanguage'])
+    ]
+
+    # Add all sentiment scores
+    for i in range(1, 26):
+        value = row[f'Sentiment_{i}']
+        # Handle NULL/empty values
+        values.append(value.strip() if value and value.strip() else 'NULL')
+
+    return f"  ({', '.join(values)})"
+
+def respondent_copy_line(row: dict) -> str:
+    """Render one CSV row as a COPY text line"""
+    values = [
+        COMPANY_ID,
+        copy_value(row['RespondentID']),
+        copy_value(row['Region']),
+        copy_value(row['Department']),
+        copy_value(row['Employment_type']),
+        copy_value(row['Age']),
+        copy_value(row['UserLanguage'])
+    ]
+    for i in range(1, 26):
+        value = row[f'Sentiment_{i}']
+        values.append(value.strip() if value and value.strip() else COPY_NULL)
+    return '\t'.join(values) + '\n'
+
+def copy_data_path(output_path: str, compress: bool) -> str:
+    """COPY data file written next to the loader script"""
+    path = Path(output_path)
+    stem = path.name[:-len('.gz')] if path.name.endswith('.gz') else path.name
+    stem = stem[:-len('.sql')] if stem.endswith('.sql') else stem
+    return str(path.with_name(f"{stem}.respondents.tsv" + ('.gz' if compress else '')))
+
+def write_chunked_insert(out, table: str, columns: list, value_rows,
+                         rows_per_statement: int = ROWS_PER_STATEMENT,
+                         max_statement_bytes: int = MAX_STATEMENT_BYTES) -> tuple:
+    """
+    Write VALUES tuples as a series of bounded INSERT statements.
+
+    A statement is closed when it reaches rows_per_statement rows or when the
+    next tuple would push it past max_statement_bytes (a single oversized
+    tuple still gets its own statement). Tuples are written as they arrive,
+    so only the current one is held in memory.
+
+    Returns:
+        tuple: (rows written, statements written)
+    """
+    header = f"INSERT INTO {table} ({', '.join(columns)}) VALUES\n"
+    total_rows = statements = 0
+    rows_in_statement = statement_bytes = 0
+
+    for values in value_rows:
+        size = len(values) + 2
+        if rows_in_statement and (rows_in_statement >= rows_per_statement
+                                  or statement_bytes + size > max_statement_bytes):
+            out.write(";\n\n")
+            rows_in_statement = 0
+
+        if rows_in_statement == 0:
+            out.write(header)
+            statement_bytes = len(header)
+            statements += 1
+        else:
+            out.write(",\n")
+
+        out.write(values)
+        statement_bytes += size
+        rows_in_statement += 1
+        total_rows += 1
+
+    if rows_in_statement:
+        out.write(";\n")
+    return total_rows, statements
+
+def open_output(output_path: str, compress: bool = None):
+    """Open the SQL output for writing; gzip when asked or when the path ends in .gz"""
+    if compress is None:
+        compress = output_path.endswith('.gz')
+    if compress:
+        return gzip.open(output_path, 'wt', encoding='utf-8', compresslevel=6)
+    return open(output_path, 'w', encoding='utf-8')
+
+def csv_to_sql(csv_path, output_path, rows_per_statement=ROWS_PER_STATEMENT,
+               max_statement_bytes=MAX_STATEMENT_BYTES, transaction=False, compress=None,
+               output_format='sql'):
+    """Convert CSV to SQL INSERT statements (or a COPY file plus loader with output_format='copy')"""
+    if compress is None:
+        compress = output_path.endswith('.gz')
+
+    with open(csv_path, 'r', encoding='utf-8', newline='') as csvfile:
         reader = csv.DictReader(csvfile)
-        
-        with open(output_path, 'w', encoding='utf-8') as sqlfile:
+
+        # In copy mode the loader stays plain text for psql; only the data file is compressed
+        with open_output(output_path, compress and output_format != 'copy') as sqlfile:
             # Write header
             sqlfile.write("-- =============================================\n")
             sqlfile.write("-- AI Navigator - Complete Demo Data Import\n")
             sqlfile.write("-- =============================================\n\n")
-            
+
+            if transaction:
+                sqlfile.write("BEGIN;\n\n")
+
             # Insert companies
             sqlfile.write("-- Insert demo companies\n")
             sqlfile.write("INSERT INTO public.companies (id, name, display_name, logo_url) VALUES\n")
@@ -27,7 +160,7 @@ def csv_to_sql(csv_path, output_path):
             sqlfile.write("  ('550e8400-e29b-41d4-a716-446655440002', 'tech-innovations', 'Tech Innovations', null),\n")
             sqlfile.write("  ('550e8400-e29b-41d4-a716-446655440003', 'global-solutions', 'Global Solutions', null)\n")
             sqlfile.write("ON CONFLICT (name) DO NOTHING;\n\n")
-            
+
             # Insert demo users
             sqlfile.write("-- Insert demo users (password is 'demo123' for all)\n")
             sqlfile.write("INSERT INTO public.demo_users (email, password_hash, company_id, full_name, role) VALUES\n")
@@ -35,55 +168,68 @@ def csv_to_sql(csv_path, output_path):
             sqlfile.write("  ('demo@tech-innovations.com', 'demo123', '550e8400-e29b-41d4-a716-446655440002', 'Michael Chen', 'VP of Digital Transformation'),\n")
             sqlfile.write("  ('demo@global-solutions.com', 'demo123', '550e8400-e29b-41d4-a716-446655440003', 'Emma Rodriguez', 'Director of AI Strategy')\n")
             sqlfile.write("ON CONFLICT (email) DO NOTHING;\n\n")
-            
-            # Start respondents insert
+
             sqlfile.write("-- Insert all respondent data from CSV\n")
-            sqlfile.write("INSERT INTO public.respondents (\n")
-            sqlfile.write("  company_id, respondent_id, region, department, employment_type, age, user_language,\n")
-            sqlfile.write("  sentiment_1, sentiment_2, sentiment_3, sentiment_4, sentiment_5,\n")
-            sqlfile.write("  sentiment_6, sentiment_7, sentiment_8, sentiment_9, sentiment_10,\n")
-            sqlfile.write("  sentiment_11, sentiment_12, sentiment_13, sentiment_14, sentiment_15,\n")
-            sqlfile.write("  sentiment_16, sentiment_17, sentiment_18, sentiment_19, sentiment_20,\n")
-            sqlfile.write("  sentiment_21, sentiment_22, sentiment_23, sentiment_24, sentiment_25\n")
-            sqlfile.write(") VALUES\n")
-            
-            # Process CSV rows
-            rows = []
-            for row in reader:
-                values = [
-                    f"'{COMPANY_ID}'",
-                    f"'{row['RespondentID']}'",
-                    f"'{row['Region'].replace(chr(39), chr(39)+chr(39))}'",  # Escape single quotes
-                    f"'{row['Department'].replace(chr(39), chr(39)+chr(39))}'",
-                    f"'{row['Employment_type'].replace(chr(39), chr(39)+chr(39))}'",
-                    f"'{row['Age']}'",
-                    f"'{row['UserLanguage']}'"
-                ]
-                
-                # Add all sentiment scores
-                for i in range(1, 26):
-                    sentiment_key = f'Sentiment_{i}'
-                    value = row[sentiment_key]
-                    # Handle NULL/empty values
-                    if value and value.strip():
-                        values.append(value)
-                    else:
-                        values.append('NULL')
-                
-                rows.append(f"  ({', '.join(values)})")
-            
-            # Write all rows
-            sqlfile.write(',\n'.join(rows))
-            sqlfile.write(';\n')
-            
-            print(f"Successfully converted {len(rows)} rows to SQL")
-            print(f"Output file: {output_path}")
+            if output_format == 'copy':
+                # Stream respondents into a COPY text file and load it with \copy
+                data_path = copy_data_path(output_path, compress)
+                with open_output(data_path, compress) as datafile:
+                    row_count = 0
+                    for row in reader:
+                        datafile.write(respondent_copy_line(row))
+                        row_count += 1
+                statements = 1
+                sqlfile.write(f"\\copy public.respondents ({', '.join(RESPONDENT_COLUMNS)}) "
+                              f"FROM {copy_source(data_path, gzipped=compress)} WITH (FORMAT text)\n")
+            else:
+                # Stream respondents in bounded statements
+                row_count, statements = write_chunked_insert(
+                    sqlfile, 'public.respondents', RESPONDENT_COLUMNS,
+                    (respondent_values(row) for row in reader),
+                    rows_per_statement=rows_per_statement,
+                    max_statement_bytes=max_statement_bytes,
+                )
+
+            if transaction:
+                sqlfile.write("\nCOMMIT;\n")
+
+            if output_format == 'copy':
+                print(f"Successfully converted {row_count} rows to COPY format")
+                print(f"Data file: {data_path}")
+                print(f"Loader (run with psql): {output_path}")
+            else:
+                print(f"Successfully converted {row_count} rows to SQL ({statements} INSERT statements)")
+                print(f"Output file: {output_path}")
+
+    return row_count
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert sentiment CSV to SQL INSERT statements")
+    parser.add_argument('--csv', default='data-foundation/sentiment_demo.csv',
+                        help="Sentiment CSV to convert")
+    parser.add_argument('--output', default='supabase/import_all_data.sql',
+                        help="SQL output path (.gz is compressed)")
+    parser.add_argument('--rows-per-statement', type=int, default=ROWS_PER_STATEMENT,
+                        help="Max rows per INSERT statement")
+    parser.add_argument('--max-statement-bytes', type=int, default=MAX_STATEMENT_BYTES,
+                        help="Max size of one INSERT statement")
+    parser.add_argument('--transaction', action='store_true',
+                        help="Wrap the whole script in BEGIN/COMMIT")
+    parser.add_argument('--gzip', action='store_true', default=None,
+                        help="gzip the output, or the data file with --format copy (implied by a .gz output path)")
+    parser.add_argument('--format', choices=['sql', 'copy'], default='sql',
+                        help="sql: INSERT statements; copy: COPY text file plus a psql \\copy loader")
+    return parser.parse_args()
 
 if __name__ == '__main__':
-    csv_path = 'data-foundation/sentiment_demo.csv'
-    output_path = 'supabase/import_all_data.sql'
-    
-    print(f"Converting {csv_path} to SQL...")
-    csv_to_sql(csv_path, output_path)
-    print("Done!")
+    args = parse_args()
 
+    print(f"Converting {args.csv} to SQL...")
+    try:
+        csv_to_sql(args.csv, args.output, rows_per_statement=args.rows_per_statement,
+                   max_statement_bytes=args.max_statement_bytes, transaction=args.transaction,
+                   compress=args.gzip, output_format=args.format)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print("Done!")
@@ -0,0 +1,146 @@
+"""
+Delta Import Manifest
+=====================
+
+Content hashes of every respondent sent by the previous import, so a rerun
+over a mostly unchanged file only sends new or changed respondents (and,
+optionally, deletes respondents that disappeared).
+
+A respondent's hash covers its normalized database record: scores rounded
+to the database precision, NaN treated as NULL. For long-format data the
+hashes of a respondent's rows are combined order-independently, so row
+order in the CSV does not matter.
+
+Manifests live in logs/manifests/<name>.json as {key: uint64 hash}, where
+key is "<company_id>|<respondent_id>".
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_DIR = "logs/manifests"
+SCORE_DECIMALS = 2  # Score columns are DECIMAL(5,2) in the database
+KEY_SEPARATOR = '|'
+
+
+def record_keys(df: pd.DataFrame, company_col: str = 'company_id',
+                respondent_col: str = 'respondent_id') -> pd.Series:
+    """Manifest keys ("<company_id>|<respondent_id>") for each row."""
+    return df[company_col].astype(str) + KEY_SEPARATOR + df[respondent_col].astype(str)
+
+
+def split_key(key: str) -> Tuple[str, str]:
+    """Inverse of record_keys: (company_id, respondent_id)."""
+    company_id, respondent_id = key.split(KEY_SEPARATOR, 1)
+    return company_id, respondent_id
+
+
+def hash_records(df: pd.DataFrame, keys: pd.Series, columns: Sequence[str]) -> pd.Series:
+    """
+    Content hash per key over the given columns.
+
+    Rows sharing a key (long format) are combined with a wrapping uint64 sum,
+    which is independent of row order. Floats are widened to float64 before
+    rounding, so float32 scores hash like the float64 ones they came from
+    (categoricals and small ints already hash like their values).
+
+    Returns:
+        pd.Series: uint64 hash indexed by key
+    """
+    normalized = df[list(columns)].copy()
+    for col in normalized.columns:
+        if pd.api.types.is_float_dtype(normalized[col]):
+            normalized[col] = normalized[col].astype(np.float64).round(SCORE_DECIMALS)
+
+    row_hashes = pd.util.hash_pandas_object(normalized, index=False).to_numpy(dtype=np.uint64)
+    codes, uniques = pd.factorize(keys, sort=False)
+
+    combined = np.zeros(len(uniques), dtype=np.uint64)
+    np.add.at(combined, codes, row_hashes)
+    return pd.Series(combined, index=pd.Index(uniques, name='key'), dtype='uint64')
+
+
+class DeltaManifest:
+    """
+    Hashes from the last successful import for one target.
+
+    Args:
+        name: Manifest name, e.g. "respondents.capability_demo_wide"
+        manifest_dir: Directory for manifest files
+    """
+
+    def __init__(self, name: str, manifest_dir: str = MANIFEST_DIR):
+        self.path = Path(manifest_dir) / f"{name}.json"
+        self.hashes = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.hashes = json.load(f)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def diff(self, current: pd.Series) -> Tuple[List[str], List[str]]:
+        """
+        Compare current hashes against the manifest.
+
+        Returns:
+            tuple: (keys that are new or changed, keys no longer present)
+        """
+        previous = self.hashes
+        keys = current.index.tolist()
+        changed = [k for k, h in zip(keys, current.tolist()) if previous.get(k) != h]
+        present = set(keys)
+        deleted = [k for k in previous if k not in present]
+        return changed, deleted
+
+    def update(self, current: pd.Series, committed_keys: Iterable[str],
+               deleted_keys: Iterable[str] = ()):
+        """Record committed keys with their current hash and drop deleted keys."""
+        committed = pd.Index(list(committed_keys))
+        if len(committed):
+            self.hashes.update(zip(committed.tolist(), current.loc[committed].tolist()))
+        for key in deleted_keys:
+            self.hashes.pop(key, None)
+
+    def save(self):
+        """Write atomically so an interrupted save never leaves a torn manifest."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.hashes, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+def delete_respondents(supabase, table: str, keys: Iterable[str], chunk_size: int = 200) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Delete rows for the given manifest keys, grouped by company.
+
+    Returns:
+        tuple: (keys deleted, [(key, error message)] for failed chunks)
+    """
+    by_company = {}
+    for key in keys:
+        company_id, respondent_id = split_key(key)
+        by_company.setdefault(company_id, []).append(respondent_id)
+
+    deleted, failed = [], []
+    for company_id, respondent_ids in by_company.items():
+        for start in range(0, len(respondent_ids), chunk_size):
+            chunk = respondent_ids[start:start + chunk_size]
+            chunk_keys = [f"{company_id}{KEY_SEPARATOR}{r}" for r in chunk]
+            try:
+                supabase.table(table).delete()\
+                    .eq('company_id', company_id)\
+                    .in_('respondent_id', chunk)\
+                    .execute()
+                deleted.extend(chunk_keys)
+            except Exception as e:
+                failed.extend((k, str(e)) for k in chunk_keys)
+    return deleted, failed
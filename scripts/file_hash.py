@@ -0,0 +1,79 @@
+"""
+File Hashing
+============
+
+Content hashes of files and the stamps that let a cache skip re-hashing,
+shared by the import journal (import_journal.py), the CSV cache
+(csv_cache.py) and the benchmark build cache
+(docs/development/database-info/build_cache.py).
+
+A stamp records a file's size, modification time and SHA-256. While size
+and mtime still match, file_stamp reuses the recorded hash instead of
+reading the file again; stamps are kept as JSON and written atomically.
+
+Usage:
+    from file_hash import file_stamp, hash_file, load_json, write_json
+
+    digest = hash_file('data/csv-imports/sentiment_demo.csv')
+    stamp = file_stamp('data/csv-imports/sentiment_demo.csv', load_json(stamp_path))
+    write_json(stamp_path, stamp)
+"""
+
+import hashlib
+import json
+import os
+from typing import Optional
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_stamp(path, previous: Optional[dict] = None) -> dict:
+    """
+    {'size', 'mtime_ns', 'sha256'} of a file. The hash is taken from the
+    previous stamp while size and mtime match it, otherwise the file is hashed.
+
+    Raises:
+        FileNotFoundError: The file does not exist
+    """
+    stat = os.stat(path)
+    if previous and previous.get('size') == stat.st_size \
+            and previous.get('mtime_ns') == stat.st_mtime_ns and previous.get('sha256'):
+        digest = previous['sha256']
+    else:
+        digest = hash_file(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+
+
+def write_atomic(path, write):
+    """Call write(tmp) on a temporary file, then rename it to path, so a crash never leaves half a file."""
+    tmp = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def load_json(path) -> Optional[dict]:
+    """JSON stamp or manifest, or None if it is missing or unreadable."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path, data):
+    """Write a JSON stamp or manifest atomically."""
+    def write(tmp):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+    write_atomic(path, write)
@@ -3,27 +3,40 @@ Generate November 2024 assessment data with improvements
 Shows progress after implementing interventions A1, B2, and C1 in October
 """
 
-import pandas as pd
 import numpy as np
 from pathlib import Path
+import argparse
 import json
 
-# Set random seed for reproducibility
-np.random.seed(42)
+from capability_schema import read_capability_long
+from csv_cache import read_csv_cached
+from copy_loader import capability_insert, copy_from, loader_header, respondents_insert, staging_table
+from sql_render import (
+    COPY_NULL, ROWS_PER_STATEMENT, copy_text, sql_decimal, sql_integer, sql_text,
+    write_copy_text, write_cte_inserts,
+)
+from wave_columns import (
+    CAPABILITY_TYPES, SENTIMENT_TYPES, capability_columns, capability_select, capability_targets,
+    respondent_select, respondent_targets, sentiment_columns,
+)
+from wave_boosts import DEFAULT_SEED, phase_generators
+from wave_simulation import apply_capability_wave, apply_sentiment_wave, november_2024_scenario
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
 
 def load_baseline_data():
     """Load October 2024 baseline data"""
     data_dir = Path(__file__).parent.parent / 'data' / 'csv-imports'
     
     # Load sentiment data
-    sentiment_df = pd.read_csv(data_dir / 'sentiment_realistic.csv')
+    sentiment_df = read_csv_cached(data_dir / 'sentiment_realistic.csv')
     
     # Load capability data
-    capability_df = pd.read_csv(data_dir / 'capability_demo.csv')
+    capability_df = read_capability_long(data_dir / 'capability_demo.csv')
     
     return sentiment_df, capability_df
 
-def improve_sentiment_scores(df, improvement_rate=0.15):
+def improve_sentiment_scores(df, improvement_rate=0.15, rng=None):
     """
     Apply improvements to sentiment scores
     Simulates impact of interventions A1 (Strategy), B2 (Training), C1 (Innovation)
@@ -32,46 +45,16 @@ def improve_sentiment_scores(df, improvement_rate=0.15):
     - A1: Improves questions 21-25 (organizational stability)
     - B2: Improves questions 6-10 (collaboration & trust)
     - C1: Improves questions 16-20 (career development)
-    """
-    df_nov = df.copy()
-    
-    # Change respondent IDs to indicate November wave (handle both naming conventions)
-    id_col = 'RespondentID' if 'RespondentID' in df_nov.columns else 'respondent_id'
-    df_nov[id_col] = df_nov[id_col].apply(lambda x: f"NOV_{x}")
-    
-    # Improvement mapping: which questions each intervention improves
-    intervention_impacts = {
-        'A1_strategy': list(range(21, 26)),  # Q21-Q25: Org stability
-        'B2_training': list(range(6, 11)),    # Q6-Q10: Collaboration
-        'C1_innovation': list(range(16, 21))  # Q16-Q20: Career development
-    }
     
-    # Apply improvements
-    for intervention, questions in intervention_impacts.items():
-        for q in questions:
-            col_name = f'sentiment_{q}'
-            if col_name in df_nov.columns:
-                # Improve scores: add 15% on average, with some variation
-                improvement = np.random.normal(improvement_rate, 0.05, len(df_nov))
-                # Ensure we don't exceed max score of 5.0
-                df_nov[col_name] = np.minimum(
-                    df_nov[col_name] + improvement,
-                    5.0
-                )
-    
-    # Add some general improvement to all questions (ambient improvement)
-    for i in range(1, 26):
-        col_name = f'sentiment_{i}'
-        if col_name in df_nov.columns:
-            ambient_improvement = np.random.normal(0.05, 0.02, len(df_nov))
-            df_nov[col_name] = np.minimum(
-                df_nov[col_name] + ambient_improvement,
-                5.0
-            )
-    
-    return df_nov
+    Plus a small ambient improvement on every question; the effects are
+    declared in wave_simulation.november_2024_scenario.
+    """
+    if rng is None:
+        rng = np.random.default_rng(DEFAULT_SEED)
+    wave = november_2024_scenario(sentiment_rate=improvement_rate).waves[0]
+    return apply_sentiment_wave(df, wave, rng)
 
-def improve_capability_scores(df, improvement_rate=0.12):
+def improve_capability_scores(df, improvement_rate=0.12, rng=None):
     """
     Apply improvements to capability scores
     
@@ -79,37 +62,22 @@ def improve_capability_scores(df, improvement_rate=0.12):
     - A1: Dimension 1 (Strategy & Vision)
     - B2: Dimension 4 (Talent & Skills), Dimension 7 (Adaptation & Adoption)
     - C1: Dimension 6 (Innovation Capability)
-    """
-    df_nov = df.copy()
-    
-    # Change respondent IDs (handle both naming conventions)
-    id_col = 'ResponseId_id' if 'ResponseId_id' in df_nov.columns else 'respondent_id'
-    df_nov[id_col] = df_nov[id_col].apply(lambda x: f"NOV_{x}")
-    
-    # Dimensions that benefit from our interventions
-    high_impact_dimensions = [1, 4, 6, 7]  # Strategy, Talent, Innovation, Adoption
-    
-    for idx, row in df_nov.iterrows():
-        dim = row['dimension_id']
-        
-        if dim in high_impact_dimensions:
-            # Higher improvement for targeted dimensions
-            improvement = np.random.normal(improvement_rate, 0.04)
-        else:
-            # Modest improvement for other dimensions
-            improvement = np.random.normal(0.06, 0.02)
-        
-        # Apply improvement (max score is 5.0)
-        df_nov.at[idx, 'score'] = min(row['score'] + improvement, 5.0)
     
-    return df_nov
+    Other dimensions get a modest improvement (max score is 5.0).
+    """
+    if rng is None:
+        rng = np.random.default_rng(DEFAULT_SEED)
+    wave = november_2024_scenario(capability_rate=improvement_rate).waves[0]
+    return apply_capability_wave(df, wave, rng)
 
-def generate_november_sql(sentiment_df, capability_df, output_path):
-    """Generate SQL to insert November 2024 data"""
-    
-    company_id_query = "(SELECT id FROM companies WHERE name = 'acme-wealth')"
-    
-    sql_lines = [
+COMPANY_ID_QUERY = "(SELECT id FROM companies WHERE name = 'acme-wealth')"
+COMPANY_CTE = "SELECT id FROM companies WHERE name = 'acme-wealth'"
+SURVEY_WAVE_SQL = ["'nov-2024'", "'2024-11-15'::DATE"]
+
+def period_sql_lines():
+    """Sections 1-2: the November assessment period and applied interventions"""
+    company_id_query = COMPANY_ID_QUERY
+    return [
         "-- November 2024 Assessment Data",
         "-- Shows progress after implementing interventions A1, B2, and C1",
         "-- Generated with improved scores in targeted areas",
@@ -156,93 +124,11 @@ def generate_november_sql(sentiment_df, capability_df, output_path):
         f"  ({company_id_query}, (SELECT id FROM assessment_periods WHERE survey_wave = 'oct-2024-baseline' AND company_id = {company_id_query}), 'C1', '2024-11-01', 'completed', 'Innovation Labs launched with pilot projects')",
         "ON CONFLICT DO NOTHING;",
         "",
-        "-- ============================================================================",
-        "-- 3. INSERT NOVEMBER SENTIMENT DATA",
-        "-- ============================================================================",
-        "",
     ]
-    
-    # Generate INSERT statements for sentiment data (batch inserts for efficiency)
-    batch_size = 50
-    for batch_start in range(0, len(sentiment_df), batch_size):
-        batch_end = min(batch_start + batch_size, len(sentiment_df))
-        batch = sentiment_df.iloc[batch_start:batch_end]
-        
-        sql_lines.append("INSERT INTO respondents (")
-        sql_lines.append("  company_id, respondent_id, region, department, employment_type, age, user_language, industry, continent,")
-        sql_lines.append("  survey_wave, assessment_date,")
-        sql_lines.append("  " + ", ".join([f"sentiment_{i}" for i in range(1, 26)]))
-        sql_lines.append(") VALUES")
-        
-        values = []
-        for _, row in batch.iterrows():
-            sentiment_values = ", ".join([
-                f"{row[f'sentiment_{i}']:.2f}" if pd.notna(row.get(f'sentiment_{i}')) else "NULL"
-                for i in range(1, 26)
-            ])
-            
-            # Handle both naming conventions
-            respondent_id = row.get('RespondentID') or row.get('respondent_id')
-            region = row.get('Region') or row.get('region', 'Unknown')
-            department = row.get('Department') or row.get('department', 'Unknown')
-            employment = row.get('EmploymentType') or row.get('employment_type', 'Full-time')
-            age = row.get('Age') or row.get('age', '30-39')
-            language = row.get('UserLanguage') or row.get('user_language', 'en')
-            industry = row.get('Industry') or row.get('industry', 'Financial Services')
-            continent = row.get('Continent') or row.get('continent', 'North America')
-            
-            values.append(
-                f"  ({company_id_query}, '{respondent_id}', "
-                f"'{region}', '{department}', "
-                f"'{employment}', '{age}', "
-                f"'{language}', '{industry}', "
-                f"'{continent}', 'nov-2024', '2024-11-15', "
-                f"{sentiment_values})"
-            )
-        
-        sql_lines.append(",\n".join(values))
-        sql_lines.append("ON CONFLICT DO NOTHING;")
-        sql_lines.append("")
-    
-    sql_lines.extend([
-        "-- ============================================================================",
-        "-- 4. INSERT NOVEMBER CAPABILITY DATA",
-        "-- ============================================================================",
-        "",
-    ])
-    
-    # Generate INSERT statements for capability data
-    for batch_start in range(0, len(capability_df), batch_size):
-        batch_end = min(batch_start + batch_size, len(capability_df))
-        batch = capability_df.iloc[batch_start:batch_end]
-        
-        sql_lines.append("INSERT INTO capability_scores (")
-        sql_lines.append("  company_id, respondent_id, dimension_id, dimension, construct_id, construct, score,")
-        sql_lines.append("  industry_synthetic, country_synthetic, continent_synthetic, role_synthetic,")
-        sql_lines.append("  survey_wave, assessment_date")
-        sql_lines.append(") VALUES")
-        
-        values = []
-        for _, row in batch.iterrows():
-            # Handle both naming conventions
-            respondent_id = row.get('ResponseId_id') or row.get('respondent_id')
-            
-            values.append(
-                f"  ({company_id_query}, '{respondent_id}', "
-                f"{row['dimension_id']}, '{row['dimension']}', "
-                f"{row['construct_id']}, '{row['construct']}', {row['score']:.2f}, "
-                f"'{row.get('industry_synthetic', 'Financial Services')}', "
-                f"'{row.get('country_synthetic', 'USA')}', "
-                f"'{row.get('continent_synthetic', 'North America')}', "
-                f"'{row.get('role_synthetic', 'Analyst')}', "
-                f"'nov-2024', '2024-11-15')"
-            )
-        
-        sql_lines.append(",\n".join(values))
-        sql_lines.append("ON CONFLICT DO NOTHING;")
-        sql_lines.append("")
-    
-    sql_lines.extend([
+
+def footer_sql_lines():
+    """Section 5: respondent counts and a verification notice"""
+    return [
         "-- ============================================================================",
         "-- 5. UPDATE RESPONDENT COUNTS",
         "-- ============================================================================",
@@ -277,15 +163,103 @@ def generate_november_sql(sentiment_df, capability_df, output_path):
         "  RAISE NOTICE '  Sentiment respondents: %', sentiment_count;",
         "  RAISE NOTICE '  Capability scores: %', capability_count;",
         "END $$;",
-    ])
-    
-    # Write to file
+    ]
+
+def section_header(number, title):
+    return [
+        "-- ============================================================================",
+        f"-- {number}. {title}",
+        "-- ============================================================================",
+        "",
+    ]
+
+def generate_november_sql(sentiment_df, capability_df, output_path, rows_per_statement=ROWS_PER_STATEMENT):
+    """
+    Generate SQL to insert November 2024 data
+
+    Respondent and capability rows are rendered a column at a time and
+    streamed to disk in INSERT statements of rows_per_statement rows; the
+    company id is resolved once per statement via a CTE.
+    """
     with open(output_path, 'w') as f:
-        f.write('\n'.join(sql_lines))
+        f.write('\n'.join(period_sql_lines() + section_header(3, "INSERT NOVEMBER SENTIMENT DATA")) + '\n')
+        
+        write_cte_inserts(
+            f, 'respondents', COMPANY_CTE,
+            select=respondent_select('v', SURVEY_WAVE_SQL),
+            target_columns=respondent_targets(),
+            value_columns=sentiment_columns(sentiment_df, sql_text, sql_decimal),
+            rows_per_statement=rows_per_statement,
+        )
+        
+        f.write('\n'.join(section_header(4, "INSERT NOVEMBER CAPABILITY DATA")) + '\n')
+        
+        write_cte_inserts(
+            f, 'capability_scores', COMPANY_CTE,
+            select=capability_select('v', SURVEY_WAVE_SQL),
+            target_columns=capability_targets(),
+            value_columns=capability_columns(capability_df, sql_text, sql_decimal, sql_integer),
+            rows_per_statement=rows_per_statement,
+        )
+        
+        # Update counts and verify
+        f.write('\n'.join(footer_sql_lines()))
     
     print(f"✅ Generated SQL file: {output_path}")
 
+def generate_november_copy(sentiment_df, capability_df, output_dir):
+    """
+    Write November 2024 data as COPY text files plus a psql loader script
+
+    output_dir/respondents.tsv and capability_scores.tsv hold the rows in
+    COPY text format (no SQL quoting involved); output_dir/load.sql loads
+    them into temporary staging tables with \\copy and inserts from there,
+    resolving the company id once. Run it with psql from the repository
+    root:
+
+        psql "$DATABASE_URL" -f <output_dir>/load.sql
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    copy_decimal = lambda values: sql_decimal(values, null=COPY_NULL)
+    copy_integer = lambda values: sql_integer(values, null=COPY_NULL)
+
+    sentiment = sentiment_columns(sentiment_df, copy_text, copy_decimal)
+    capability = capability_columns(capability_df, copy_text, copy_decimal, copy_integer)
+
+    with open(output_dir / 'respondents.tsv', 'w', encoding='utf-8', newline='') as f:
+        write_copy_text(f, list(sentiment.values()))
+    with open(output_dir / 'capability_scores.tsv', 'w', encoding='utf-8', newline='') as f:
+        write_copy_text(f, list(capability.values()))
+
+    lines = loader_header("November 2024 Assessment Data (COPY loader)", output_dir)
+    lines += period_sql_lines()
+    lines += section_header(3, "INSERT NOVEMBER SENTIMENT DATA")
+    lines += staging_table('nov_respondents', list(sentiment), SENTIMENT_TYPES)
+    lines.append(copy_from('nov_respondents', output_dir / 'respondents.tsv'))
+    lines += respondents_insert('nov_respondents', SURVEY_WAVE_SQL, COMPANY_CTE) + [""]
+    lines += section_header(4, "INSERT NOVEMBER CAPABILITY DATA")
+    lines += staging_table('nov_capability_scores', list(capability), CAPABILITY_TYPES)
+    lines.append(copy_from('nov_capability_scores', output_dir / 'capability_scores.tsv'))
+    lines += capability_insert('nov_capability_scores', SURVEY_WAVE_SQL, COMPANY_CTE) + [""]
+    lines += footer_sql_lines()
+    lines += ["", "COMMIT;", ""]
+
+    with open(output_dir / 'load.sql', 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+    print(f"✅ Generated COPY files in: {output_dir}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate November 2024 assessment data")
+    parser.add_argument('--format', choices=['sql', 'copy'], default='sql',
+                        help="sql: INSERT migration; copy: COPY text files plus a psql loader")
+    parser.add_argument('--copy-dir', default=str(REPO_ROOT / 'supabase' / 'copy' / 'nov_2024'),
+                        help="Output directory for --format copy")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     print("🚀 Generating November 2024 assessment data with improvements...")
     
     # Load baseline data
@@ -296,8 +270,9 @@ def main():
     
     # Apply improvements
     print("\n📈 Applying improvements based on interventions A1, B2, C1...")
-    sentiment_nov = improve_sentiment_scores(sentiment_df)
-    capability_nov = improve_capability_scores(capability_df)
+    sentiment_rng, capability_rng = phase_generators(DEFAULT_SEED, 2)
+    sentiment_nov = improve_sentiment_scores(sentiment_df, rng=sentiment_rng)
+    capability_nov = improve_capability_scores(capability_df, rng=capability_rng)
     
     # Calculate average improvements
     sentiment_cols = [f'sentiment_{i}' for i in range(1, 26)]
@@ -314,9 +289,13 @@ def main():
     print(f"   Average capability improvement: +{avg_improvement_capability:.3f}")
     
     # Generate SQL
-    print("\n📝 Generating SQL migration...")
-    output_path = Path(__file__).parent.parent / 'supabase' / 'migrations' / '012_nov_2024_data.sql'
-    generate_november_sql(sentiment_nov, capability_nov, output_path)
+    if args.format == 'copy':
+        print("\n📝 Generating COPY files...")
+        generate_november_copy(sentiment_nov, capability_nov, args.copy_dir)
+    else:
+        print("\n📝 Generating SQL migration...")
+        output_path = Path(__file__).parent.parent / 'supabase' / 'migrations' / '012_nov_2024_data.sql'
+        generate_november_sql(sentiment_nov, capability_nov, output_path)
     
     # Also save CSVs for reference
     csv_output_dir = Path(__file__).parent.parent / 'data' / 'csv-imports'
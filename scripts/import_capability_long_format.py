@@ -8,20 +8,46 @@ Assigns company_id deterministically based on respondent_id hash.
 Requires environment variables:
   NEXT_PUBLIC_SUPABASE_URL
   NEXT_PUBLIC_SUPABASE_ANON_KEY
+
+Backends:
+  --backend postgrest  (default) Batched inserts through the Supabase API
+  --backend copy       Streams the CSV straight into Postgres with
+                       COPY ... FROM STDIN. Needs DATABASE_URL and psycopg2;
+                       see pg_copy.py for a local Postgres setup.
+
+Delta mode (postgrest backend):
+  --delta              Keep existing scores and upsert only respondents whose
+                       rows changed since the last delta import
+  --delete-missing     With --delta, delete respondents no longer in the file
 """
 
+import argparse
+import csv
 import os
 import sys
 import pandas as pd
-from supabase import create_client, Client
+from supabase import Client
 from datetime import datetime
 import hashlib
 
+from capability_schema import read_capability_long
+from csv_payload import CsvRows, post_csv
+from delta_manifest import SCORE_DECIMALS, DeltaManifest, delete_respondents, hash_records, record_keys
+from pg_copy import connect, copy_rows, get_database_url
+from supabase_client import get_client
+
 # Configuration
 INPUT_FILE = "data-foundation/capability_demo.csv"
 BATCH_SIZE = 1000
 LOG_DIR = "logs"
 
+# Column order for the COPY backend
+COPY_COLUMNS = [
+    'respondent_id', 'company_id', 'dimension_id', 'dimension', 'construct_id',
+    'construct', 'score', 'industry_synthetic', 'country_synthetic',
+    'continent_synthetic', 'role_synthetic',
+]
+
 # Demo companies for respondent assignment
 DEMO_COMPANIES = ["acme-corp", "tech-innovations", "global-solutions"]
 
@@ -41,11 +67,191 @@ def hash_respondent_to_company(respondent_id: str) -> str:
     company_index = hash_value % 3
     return DEMO_COMPANIES[company_index]
 
-def main():
-    print_header("CAPABILITY DATA IMPORT (LONG FORMAT)")
-    print(f"Input: {INPUT_FILE}")
+def select_delta(df: pd.DataFrame, companies: dict, manifest: DeltaManifest) -> tuple:
+    """
+    Restrict df to respondents that are new or changed since the manifest.
+
+    Hashes each respondent's 32 rows (with the company it will be assigned to)
+    and compares against the previous import.
+
+    Returns:
+        tuple: (changed rows, per-respondent hashes, manifest keys no longer present)
+    """
+    respondent_ids = df['ResponseId_id'].unique()
+    company_by_respondent = {r: companies.get(hash_respondent_to_company(r)) for r in respondent_ids}
+
+    keyed = df.assign(company_id=df['ResponseId_id'].map(company_by_respondent))
+    keyed = keyed[keyed['company_id'].notna()]
+    keys = record_keys(keyed, respondent_col='ResponseId_id')
+
+    value_columns = [c for c in COPY_COLUMNS if c not in ('respondent_id', 'company_id') and c in keyed.columns]
+    hashes = hash_records(keyed, keys, value_columns)
+    changed, missing = manifest.diff(hashes)
+
+    changed_ids = {key.split('|', 1)[1] for key in changed}
+    return df[df['ResponseId_id'].isin(changed_ids)], hashes, missing
+
+def build_score_payload(df: pd.DataFrame, companies: dict) -> pd.DataFrame:
+    """
+    capability_scores rows for the whole DataFrame, in COPY_COLUMNS order.
+
+    Rows whose hashed company is missing from the database are dropped with
+    a warning.
+    """
+    respondent_ids = df['ResponseId_id']
+    company_names = respondent_ids.map({r: hash_respondent_to_company(r) for r in respondent_ids.unique()})
+    company_ids = company_names.map(companies)
+
+    for company_name in company_names[company_ids.isna()].unique():
+        print(f"  ⚠️  Warning: Company {company_name} not found, skipping its rows")
+
+    known = company_ids.notna()
+    payload = df[known].rename(columns={'ResponseId_id': 'respondent_id'})\
+        .reindex(columns=COPY_COLUMNS)
+    payload['company_id'] = company_ids[known]
+    payload['dimension_id'] = payload['dimension_id'].astype(int)
+    payload['construct_id'] = payload['construct_id'].astype(int)
+    # float32 scores carry binary noise (3.7 -> 3.7000000477); send what the column stores
+    payload['score'] = payload['score'].astype(float).round(SCORE_DECIMALS)
+    return payload
+
+def write_import_log(total_rows: int, insert_count: int, actual_count: int, company_counts: dict,
+                     expected_count: int = None) -> str:
+    """Write the import log and return its path"""
+    if expected_count is None:
+        expected_count = insert_count
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_file = f"{LOG_DIR}/capability_import_log.txt"
+    with open(log_file, 'w') as f:
+        f.write(f"Capability Data Import (LONG Format) - {datetime.now()}\n")
+        f.write(f"=" * 80 + "\n\n")
+        f.write(f"Input file: {INPUT_FILE}\n")
+        f.write(f"Total rows: {total_rows:,}\n")
+        f.write(f"Records inserted: {insert_count:,}\n")
+        f.write(f"Database count: {actual_count:,}\n")
+        f.write(f"\nCompany Distribution:\n")
+        for company_name, count in sorted(company_counts.items()):
+            f.write(f"  {company_name}: {count:,} scores\n")
+        f.write(f"\nStatus: {'SUCCESS' if actual_count == expected_count else 'PARTIAL'}\n")
+    return log_file
+
+def iter_copy_rows(csv_path: str, companies: dict, company_counts: dict, respondents: set):
+    """
+    Stream capability_scores tuples straight from the CSV for COPY.
+
+    Tallies per-company row counts and distinct respondents as it goes so
+    the caller can report without a second pass.
+    """
+    company_by_respondent = {}
+
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        for line_num, row in enumerate(reader, start=2):
+            respondent_id = row['ResponseId_id']
+            company_name = company_by_respondent.get(respondent_id)
+            if company_name is None:
+                company_name = hash_respondent_to_company(respondent_id)
+                company_by_respondent[respondent_id] = company_name
+
+            company_id = companies.get(company_name)
+            if not company_id:
+                print(f"  ⚠️  Warning: Company {company_name} not found, skipping line {line_num}")
+                continue
+
+            company_counts[company_name] = company_counts.get(company_name, 0) + 1
+            respondents.add(respondent_id)
+
+            yield (
+                respondent_id,
+                company_id,
+                int(float(row['dimension_id'])),
+                row['dimension'],
+                int(float(row['construct_id'])),
+                row['construct'],
+                float(row['score']),
+                row.get('industry_synthetic') or None,
+                row.get('country_synthetic') or None,
+                row.get('continent_synthetic') or None,
+                row.get('role_synthetic') or None,
+            )
+
+def run_copy_import(database_url: str):
+    """Load capability_scores with COPY FROM STDIN over a direct Postgres connection"""
+    print_step("🔐 Connecting to Postgres...")
+    try:
+        conn = connect(get_database_url(database_url))
+    except Exception as e:
+        print(f"  ❌ Error: {e}")
+        sys.exit(1)
+    print("  ✅ Connected to Postgres")
+
+    if not os.path.exists(INPUT_FILE):
+        print(f"  ❌ Error: File not found: {INPUT_FILE}")
+        sys.exit(1)
+
+    company_counts = {}
+    respondents = set()
+    started = datetime.now()
+
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                print_step("🏢 Fetching company IDs...")
+                cur.execute("SELECT id, name FROM companies")
+                companies = {name: str(company_id) for company_id, name in cur.fetchall()}
+                print(f"  ✅ Found {len(companies)} companies")
+
+                # Clear and reload in one transaction so a failed COPY leaves the old data in place
+                print_step("🗑️  Clearing existing capability scores...")
+                cur.execute("TRUNCATE capability_scores")
+                print("  ✅ Cleared existing data")
+
+                print_step(f"📤 Streaming {INPUT_FILE} into capability_scores via COPY...")
+                insert_count = copy_rows(
+                    cur, 'capability_scores', COPY_COLUMNS,
+                    iter_copy_rows(INPUT_FILE, companies, company_counts, respondents),
+                )
+                print(f"  ✅ Copied {insert_count:,} records")
+
+                print_step("🔍 Verifying import...")
+                cur.execute("SELECT count(*) FROM capability_scores")
+                actual_count = cur.fetchone()[0]
+    except Exception as e:
+        print(f"  ❌ Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"  Expected: {insert_count:,}")
+    print(f"  Actual in database: {actual_count:,}")
+    print(f"  Match: ✅" if actual_count == insert_count else f"  Mismatch: ⚠️")
+    print(f"  Unique respondents: {len(respondents):,}")
+    print(f"  Wall clock: {elapsed:.1f}s ({insert_count / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    print_step("📊 Company distribution:")
+    for company_name, count in sorted(company_counts.items()):
+        print(f"  {company_name}: {count:,} scores ({count // 32} respondents)")
+
+    log_file = write_import_log(insert_count, insert_count, actual_count, company_counts)
+    print_step(f"📄 Import log saved to: {log_file}")
+
+    print_header("✅ IMPORT COMPLETE!")
+    print(f"Loaded: {insert_count:,} capability scores")
+    print(f"Database count: {actual_count:,}")
+    print(f"Log file: {log_file}")
     print_header("")
 
+def run_postgrest_import(delta: bool = False, delete_missing: bool = False,
+                         payload_format: str = 'json', compress: bool = False):
+    """
+    Load capability_scores through batched PostgREST inserts.
+
+    With delta=True existing scores are kept and only respondents whose rows
+    changed since the last delta import are upserted. payload_format='csv'
+    sends each batch as a text/csv body (optionally gzipped) instead of JSON.
+    """
+
     # Check environment variables
     print_step("🔐 Initializing Supabase connection...")
     supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
@@ -56,7 +262,7 @@ def main():
         sys.exit(1)
 
     # Initialize Supabase client
-    supabase: Client = create_client(supabase_url, supabase_key)
+    supabase: Client = get_client(supabase_url, supabase_key)
     print("  ✅ Connected to Supabase")
 
     # Fetch company IDs
@@ -68,7 +274,7 @@ def main():
     # Load capability data
     print_step(f"📂 Loading capability data from {INPUT_FILE}...")
     try:
-        df = pd.read_csv(INPUT_FILE)
+        df = read_capability_long(INPUT_FILE)
         print(f"  ✅ Loaded {len(df):,} rows")
         print(f"  Columns: {', '.join(df.columns.tolist())}")
     except FileNotFoundError:
@@ -84,113 +290,113 @@ def main():
     print(f"  Expected rows per respondent: 32")
     print(f"  Actual avg rows per respondent: {len(df) / unique_respondents:.1f}")
 
-    # Clear existing capability scores
-    print_step("🗑️  Clearing existing capability scores...")
-    try:
-        supabase.table('capability_scores').delete().neq('id', '00000000-0000-0000-0000-000000000000').execute()
-        print("  ✅ Cleared existing data")
-    except Exception as e:
-        print(f"  ⚠️  Warning: {e}")
+    manifest = None
+    missing = []
+    source_rows = len(df)
+    if delta:
+        # Delta: compare against the previous import instead of clearing the table
+        manifest = DeltaManifest(f"capability_scores.{os.path.splitext(os.path.basename(INPUT_FILE))[0]}")
+        print_step(f"🔁 Computing delta against {manifest.path}...")
+        df, hashes, missing = select_delta(df, companies, manifest)
+        print(f"  ✅ {df['ResponseId_id'].nunique():,} respondents new/changed "
+              f"({len(df):,} rows), {len(missing):,} no longer present")
+    else:
+        # Clear existing capability scores
+        print_step("🗑️  Clearing existing capability scores...")
+        try:
+            supabase.table('capability_scores').delete().neq('id', '00000000-0000-0000-0000-000000000000').execute()
+            print("  ✅ Cleared existing data")
+        except Exception as e:
+            print(f"  ⚠️  Warning: {e}")
 
     # Prepare insert records
     print_step("📦 Preparing records for import...")
-    insert_records = []
-
-    for idx, row in df.iterrows():
-        # Assign company via hash
-        company_name = hash_respondent_to_company(row['ResponseId_id'])
-        company_id = companies.get(company_name)
-
-        if not company_id:
-            print(f"  ⚠️  Warning: Company {company_name} not found, skipping row {idx}")
-            continue
-
-        insert_data = {
-            'respondent_id': row['ResponseId_id'],
-            'company_id': company_id,
-            'dimension_id': int(row['dimension_id']),
-            'dimension': row['dimension'],
-            'construct_id': int(row['construct_id']),
-            'construct': row['construct'],
-            'score': float(row['score']),
-            'industry_synthetic': row.get('industry_synthetic'),
-            'country_synthetic': row.get('country_synthetic'),
-            'continent_synthetic': row.get('continent_synthetic'),
-            'role_synthetic': row.get('role_synthetic')
-        }
-
-        insert_records.append(insert_data)
-
-    print(f"  ✅ Prepared {len(insert_records):,} records")
+    payload = build_score_payload(df, companies)
+    total_records = len(payload)
+    print(f"  ✅ Prepared {total_records:,} records")
 
     # Insert in batches
-    print_step(f"📤 Importing {len(insert_records):,} records in batches of {BATCH_SIZE}...")
-    total_batches = (len(insert_records) + BATCH_SIZE - 1) // BATCH_SIZE
+    print_step(f"📤 Importing {total_records:,} records in batches of {BATCH_SIZE} ({payload_format})...")
+    total_batches = (total_records + BATCH_SIZE - 1) // BATCH_SIZE
     insert_count = 0
+    failed_keys = set()
+    on_conflict = 'company_id,respondent_id,construct_id' if delta else None
 
     for batch_num in range(total_batches):
         start_idx = batch_num * BATCH_SIZE
-        end_idx = min(start_idx + BATCH_SIZE, len(insert_records))
-        batch = insert_records[start_idx:end_idx]
+        end_idx = min(start_idx + BATCH_SIZE, total_records)
+        batch_df = payload.iloc[start_idx:end_idx]
 
         print(f"  Batch {batch_num + 1}/{total_batches}: rows {start_idx + 1:,}-{end_idx:,}...", end=" ", flush=True)
 
         try:
-            response = supabase.table('capability_scores').insert(batch).execute()
-            inserted = len(response.data)
+            if payload_format == 'csv':
+                inserted = post_csv(supabase, 'capability_scores', CsvRows(batch_df), on_conflict=on_conflict,
+                                    resolution='merge' if delta else None, compress=compress)
+            else:
+                batch = batch_df.astype(object).where(batch_df.notna(), None).to_dict('records')
+                if delta:
+                    response = supabase.table('capability_scores')\
+                        .upsert(batch, on_conflict=on_conflict)\
+                        .execute()
+                else:
+                    response = supabase.table('capability_scores').insert(batch).execute()
+                inserted = len(response.data)
             insert_count += inserted
             print(f"✅ {inserted} rows")
         except Exception as e:
             print(f"❌ Error: {e}")
+            failed_keys.update(record_keys(batch_df))
             # Continue with next batch
             continue
 
-    print(f"\n  ✅ Inserted {insert_count:,} / {len(insert_records):,} records")
+    print(f"\n  ✅ Inserted {insert_count:,} / {total_records:,} records")
+
+    if delta:
+        deleted = []
+        if delete_missing and missing:
+            print_step(f"🗑️  Deleting {len(missing):,} respondents no longer in the input...")
+            deleted, delete_errors = delete_respondents(supabase, 'capability_scores', missing)
+            for key, error in delete_errors:
+                print(f"  ❌ Error deleting {key}: {error}")
+            print(f"  ✅ Deleted {len(deleted):,} respondents")
+
+        sent_keys = set(record_keys(payload))
+        manifest.update(hashes, sent_keys - failed_keys, deleted)
+        manifest.save()
+        print(f"  📒 Delta manifest updated: {manifest.path} ({len(manifest):,} respondents)")
 
     # Verify import
     print_step("🔍 Verifying import...")
     count_response = supabase.table('capability_scores').select('id', count='exact').execute()
     actual_count = count_response.count
 
-    print(f"  Expected: {insert_count:,}")
+    # In delta mode unchanged rows are already in the table, so expect the whole file
+    expected_count = source_rows if delta else insert_count
+    print(f"  Expected: {expected_count:,}")
     print(f"  Actual in database: {actual_count:,}")
 
-    if actual_count == insert_count:
+    if actual_count == expected_count:
         print(f"  Match: ✅")
     else:
         print(f"  Mismatch: ⚠️")
 
     # Company distribution
     print_step("📊 Company distribution:")
-    company_counts = {}
-    for record in insert_records:
-        company_id = record['company_id']
-        company_name = [name for name, uuid in companies.items() if uuid == company_id][0]
-        company_counts[company_name] = company_counts.get(company_name, 0) + 1
+    company_names = {uuid: name for name, uuid in companies.items()}
+    company_counts = payload['company_id'].map(company_names).value_counts().to_dict()
 
     for company_name, count in sorted(company_counts.items()):
         respondent_count = count // 32  # Each respondent has 32 constructs
         print(f"  {company_name}: {count:,} scores ({respondent_count} respondents)")
 
     # Create import log
-    os.makedirs(LOG_DIR, exist_ok=True)
-    log_file = f"{LOG_DIR}/capability_import_log.txt"
-    with open(log_file, 'w') as f:
-        f.write(f"Capability Data Import (LONG Format) - {datetime.now()}\n")
-        f.write(f"=" * 80 + "\n\n")
-        f.write(f"Input file: {INPUT_FILE}\n")
-        f.write(f"Total rows: {len(df):,}\n")
-        f.write(f"Records inserted: {insert_count:,}\n")
-        f.write(f"Database count: {actual_count:,}\n")
-        f.write(f"\nCompany Distribution:\n")
-        for company_name, count in sorted(company_counts.items()):
-            f.write(f"  {company_name}: {count:,} scores\n")
-        f.write(f"\nStatus: {'SUCCESS' if actual_count == insert_count else 'PARTIAL'}\n")
+    log_file = write_import_log(source_rows, insert_count, actual_count, company_counts, expected_count)
 
     print_step(f"📄 Import log saved to: {log_file}")
 
     print_header("✅ IMPORT COMPLETE!")
-    print(f"Loaded: {insert_count:,} / {len(insert_records):,} capability scores")
+    print(f"Loaded: {insert_count:,} / {total_records:,} capability scores")
     print(f"Database count: {actual_count:,}")
     print(f"Log file: {log_file}")
     print(f"\nNext steps:")
@@ -199,5 +405,39 @@ def main():
     print(f"3. Test API endpoints with new schema")
     print_header("")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Import long-format capability data")
+    parser.add_argument('--backend', choices=['postgrest', 'copy'], default='postgrest',
+                        help="postgrest: batched API inserts; copy: COPY FROM STDIN over Postgres")
+    parser.add_argument('--database-url', default=None,
+                        help="Postgres connection string for --backend copy (defaults to $DATABASE_URL)")
+    parser.add_argument('--delta', action='store_true',
+                        help="Only upsert respondents that are new or changed since the last delta import")
+    parser.add_argument('--delete-missing', action='store_true',
+                        help="With --delta, delete respondents that disappeared from the input")
+    parser.add_argument('--payload', choices=['json', 'csv'], default='json',
+                        help="PostgREST request body format: JSON records or a text/csv body")
+    parser.add_argument('--gzip', action='store_true',
+                        help="With --payload csv, gzip request bodies (needs a gateway that accepts "
+                             "Content-Encoding: gzip)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    print_header("CAPABILITY DATA IMPORT (LONG FORMAT)")
+    print(f"Input: {INPUT_FILE}")
+    print(f"Backend: {args.backend}")
+    print_header("")
+
+    if args.backend == 'copy':
+        if args.delta:
+            print("  ❌ Error: --delta is only supported with --backend postgrest")
+            sys.exit(1)
+        run_copy_import(args.database_url)
+    else:
+        run_postgrest_import(delta=args.delta, delete_missing=args.delete_missing,
+                             payload_format=args.payload, compress=args.gzip)
+
 if __name__ == "__main__":
     main()
@@ -17,14 +17,28 @@ Prerequisites:
 
 Usage:
     python scripts/import_capability_wide.py
+    python scripts/import_capability_wide.py --resume   # continue an interrupted import
+    python scripts/import_capability_wide.py --delta    # only new/changed respondents
 """
 
+import argparse
+import numpy as np
 import pandas as pd
 import os
-from supabase import create_client, Client
+from supabase import Client
 from pathlib import Path
 from datetime import datetime
 
+from postgrest.exceptions import APIError
+
+from batch_loader import error_message, insert_with_bisection
+from csv_payload import CsvRows, post_csv
+from delta_manifest import (
+    DeltaManifest, KEY_SEPARATOR, delete_respondents, hash_records, record_keys, split_key
+)
+from import_journal import BatchJournal
+from supabase_client import get_client
+
 # Configuration
 INPUT_FILE = "data-foundation/capability_demo_wide.csv"
 BATCH_SIZE = 500  # Insert in batches to avoid timeout
@@ -45,7 +59,7 @@ def initialize_supabase() -> Client:
             "NEXT_PUBLIC_SUPABASE_ANON_KEY environment variables."
         )
 
-    return create_client(url, key)
+    return get_client(url, key)
 
 
 def fetch_company_mapping(supabase: Client) -> dict:
@@ -71,176 +85,319 @@ def fetch_company_mapping(supabase: Client) -> dict:
     return mapping
 
 
-def prepare_row_for_insert(row: pd.Series, company_mapping: dict) -> dict:
+CONSTRUCT_COLUMNS = [f'construct_{i}' for i in range(1, 33)]
+
+# Respondent metadata columns: database column -> source column (None = not in capability data)
+METADATA_COLUMNS = {
+    'region': 'region',
+    'department': None,  # Capability data doesn't have department
+    'employment_type': 'employment_type',
+    'age': None,  # Capability data doesn't have age
+    'user_language': None,  # Capability data doesn't have language
+    'industry': 'industry',
+    'continent': 'continent',
+}
+
+
+def build_insert_payload(df: pd.DataFrame, company_mapping: dict) -> tuple:
     """
-    Prepare a single row for database insertion.
+    Build database-ready respondent records for the whole DataFrame at once.
+
+    Company names are mapped to UUIDs with a single column-level map and the
+    32 construct columns are converted to float with NaN -> None in bulk.
+    Rows with a construct value that is not a number are reported and left
+    out, as float() rejecting them used to do row by row.
 
     Args:
-        row: Pandas Series representing one respondent
+        df: Wide-format capability data
         company_mapping: Dict mapping company names to UUIDs
 
     Returns:
-        dict: Row data formatted for Supabase insert
+        tuple: (typed payload DataFrame, list of error dicts for rows with an
+                unknown company or a non-numeric score, in row order). Use
+                payload_records() to turn a slice into JSON-ready records.
     """
-    # Map company name to UUID
-    company_id = company_mapping.get(row['company_name'])
-
-    if not company_id:
-        raise ValueError(f"Unknown company: {row['company_name']}")
-
-    # Build insert data
-    insert_data = {
-        'company_id': company_id,
-        'respondent_id': row['respondent_id'],
-        'region': row.get('region'),
-        'department': None,  # Capability data doesn't have department
-        'employment_type': row.get('employment_type'),
-        'age': None,  # Capability data doesn't have age
-        'user_language': None,  # Capability data doesn't have language
-        'industry': row.get('industry'),
-        'continent': row.get('continent'),
+    company_ids = df['company_name'].map(company_mapping)
+    unknown = company_ids.isna()
+
+    errors = {
+        position: {'respondent_id': respondent_id, 'error': f"Unknown company: {company_name}"}
+        for position, respondent_id, company_name in zip(
+            np.flatnonzero(unknown.to_numpy()), df.loc[unknown, 'respondent_id'], df.loc[unknown, 'company_name']
+        )
     }
 
-    # Add all 32 construct scores
-    for i in range(1, 33):
-        col_name = f'construct_{i}'
-        value = row.get(col_name)
+    known = df.loc[~unknown]
+    raw_constructs = known.reindex(columns=CONSTRUCT_COLUMNS)
+    constructs = raw_constructs.apply(pd.to_numeric, errors='coerce').astype('float64')
+
+    # Values coercion turned into NaN; confirm with float(), which also accepts e.g. 'nan'
+    invalid = pd.Series(False, index=known.index)
+    suspect = raw_constructs.notna().to_numpy() & constructs.isna().to_numpy()
+    positions = np.flatnonzero(~unknown.to_numpy())
+    for row, col in zip(*np.nonzero(suspect)):
+        if invalid.iat[row]:
+            continue  # Only the first bad value per row is reported
+        try:
+            float(raw_constructs.iat[row, col])
+        except (TypeError, ValueError) as e:
+            invalid.iat[row] = True
+            errors[positions[row]] = {'respondent_id': known['respondent_id'].iat[row], 'error': str(e)}
+
+    known, constructs = known.loc[~invalid], constructs.loc[~invalid]
+    payload = pd.DataFrame({
+        'company_id': company_ids[known.index],
+        'respondent_id': known['respondent_id'],
+    }, index=known.index)
+
+    for db_col, src_col in METADATA_COLUMNS.items():
+        payload[db_col] = known[src_col] if src_col in known.columns else None
+
+    payload = pd.concat([payload, constructs], axis=1)
+    return payload, [errors[position] for position in sorted(errors)]
+
+
+def payload_records(payload: pd.DataFrame) -> list:
+    """Convert a payload slice to plain records with NaN -> None."""
+    payload = payload.astype(object)
+    return payload.where(payload.notna(), None).to_dict('records')
 
-        # Convert NaN to None for database insertion
-        if pd.isna(value):
-            insert_data[col_name] = None
-        else:
-            insert_data[col_name] = float(value)
 
-    return insert_data
+def write_respondents(supabase: Client, rows, mode: str = 'insert', compress: bool = False):
+    """
+    Write a batch of respondent records.
+
+    rows is either a list of records (sent as JSON) or CsvRows (sent as a
+    text/csv body, optionally gzipped).
+
+    Modes:
+        insert: plain insert
+        ignore: upsert that skips rows already present (resume)
+        merge: upsert that overwrites rows already present (delta)
+    """
+    if isinstance(rows, CsvRows):
+        post_csv(supabase, 'respondents', rows,
+                 on_conflict=None if mode == 'insert' else 'company_id,respondent_id',
+                 resolution=None if mode == 'insert' else mode, compress=compress)
+    elif mode == 'insert':
+        supabase.table('respondents').insert(rows).execute()
+    else:
+        supabase.table('respondents')\
+            .upsert(rows, on_conflict='company_id,respondent_id', ignore_duplicates=(mode == 'ignore'),
+                    returning='minimal')\
+            .execute()
 
 
-def import_in_batches(supabase: Client, df: pd.DataFrame, company_mapping: dict) -> dict:
+def import_in_batches(supabase: Client, df: pd.DataFrame, company_mapping: dict,
+                      journal: BatchJournal = None, mode: str = 'insert',
+                      delta: DeltaManifest = None, delete_missing: bool = False,
+                      payload_format: str = 'json', compress: bool = False) -> dict:
     """
     Import data in batches to avoid timeouts.
 
+    Args:
+        journal: Optional batch journal; committed batches are recorded in it
+            and batches it already lists are skipped
+        mode: Write mode passed to write_respondents ('insert', 'ignore', 'merge')
+        delta: Optional manifest from the previous import. Only respondents
+            whose content hash is new or changed are sent, and the manifest
+            is updated with the ones that committed.
+        delete_missing: With delta, also delete respondents that are in the
+            manifest but no longer in the input
+        payload_format: 'json' (list of records) or 'csv' (text/csv body)
+        compress: With csv, gzip request bodies
+
     Returns:
         dict: Import statistics
     """
     total_rows = len(df)
-    batches = (total_rows // BATCH_SIZE) + 1
 
     stats = {
         'total_rows': total_rows,
         'inserted': 0,
+        'skipped': 0,
+        'unchanged': 0,
+        'deleted': 0,
         'errors': 0,
         'error_details': []
     }
 
-    print(f"\n📤 Importing {total_rows:,} respondents in {batches} batches...")
+    payload, payload_errors = build_insert_payload(df, company_mapping)
+    stats['errors'] += len(payload_errors)
+    stats['error_details'].extend(payload_errors)
+
+    if payload_errors:
+        print(f"\n⚠️  Skipping {len(payload_errors):,} respondents with unknown companies or invalid scores")
+
+    keys = record_keys(payload)
+    if delta is not None:
+        hashes = hash_records(payload, keys, payload.columns)
+        changed, missing = delta.diff(hashes)
+        send_mask = keys.isin(set(changed)).to_numpy()
+        stats['unchanged'] = int((~send_mask).sum())
+        payload, keys = payload[send_mask], keys[send_mask]
+        print(f"\n🔁 Delta vs {delta.path}: {len(payload):,} new/changed, "
+              f"{stats['unchanged']:,} unchanged, {len(missing):,} no longer present")
+
+    failed_keys = set()
+    total_records = len(payload)
+    batches = (total_records + BATCH_SIZE - 1) // BATCH_SIZE
+
+    print(f"\n📤 Importing {total_records:,} respondents in {batches} batches...")
 
     for batch_num in range(batches):
         start_idx = batch_num * BATCH_SIZE
-        end_idx = min((batch_num + 1) * BATCH_SIZE, total_rows)
-
-        batch_df = df.iloc[start_idx:end_idx]
+        end_idx = min((batch_num + 1) * BATCH_SIZE, total_records)
 
         print(f"  Batch {batch_num + 1}/{batches}: rows {start_idx+1}-{end_idx}... ", end='')
 
-        # Prepare batch data
-        batch_data = []
-        for _, row in batch_df.iterrows():
-            try:
-                batch_data.append(prepare_row_for_insert(row, company_mapping))
-            except Exception as e:
-                stats['errors'] += 1
-                stats['error_details'].append({
-                    'respondent_id': row.get('respondent_id', 'unknown'),
-                    'error': str(e)
-                })
-                continue
+        if journal and journal.is_done(batch_num + 1):
+            stats['skipped'] += end_idx - start_idx
+            print("⏭️  already committed")
+            continue
+
+        if payload_format == 'csv':
+            batch_data = CsvRows(payload.iloc[start_idx:end_idx])
+        else:
+            batch_data = payload_records(payload.iloc[start_idx:end_idx])
 
-        # Insert batch
+        # Insert batch; a rejected batch is bisected so only the bad rows are lost
         try:
-            response = supabase.table('respondents').insert(batch_data).execute()
-            stats['inserted'] += len(batch_data)
-            print(f"✅ {len(batch_data)} rows")
+            inserted, rejected, requests = insert_with_bisection(
+                lambda rows: write_respondents(supabase, rows, mode, compress), batch_data, bisect_on=(APIError,)
+            )
         except Exception as e:
             stats['errors'] += len(batch_data)
-            print(f"❌ Error: {str(e)}")
+            failed_keys.update(keys.iloc[start_idx:end_idx])
+            print(f"❌ Error: {error_message(e)}")
             stats['error_details'].append({
                 'batch': batch_num + 1,
-                'error': str(e)
+                'error': error_message(e)
             })
+            continue
+
+        stats['inserted'] += inserted
+        stats['errors'] += len(rejected)
+        if journal:
+            journal.record(batch_num + 1, start_idx, end_idx, inserted)
+
+        if rejected:
+            print(f"⚠️  {inserted} rows, {len(rejected)} rejected ({requests} requests)")
+            for row, error in rejected:
+                print(f"    ❌ {row['respondent_id']}: {error}")
+                failed_keys.add(f"{row['company_id']}{KEY_SEPARATOR}{row['respondent_id']}")
+                stats['error_details'].append({
+                    'batch': batch_num + 1,
+                    'respondent_id': row['respondent_id'],
+                    'error': error
+                })
+        else:
+            print(f"✅ {inserted} rows")
+
+    if delta is not None:
+        deleted = []
+        if delete_missing and missing:
+            print(f"\n🗑️  Deleting {len(missing):,} respondents no longer in the input...")
+            deleted, delete_errors = delete_respondents(supabase, 'respondents', missing)
+            stats['deleted'] = len(deleted)
+            stats['errors'] += len(delete_errors)
+            for key, error in delete_errors:
+                stats['error_details'].append({'respondent_id': split_key(key)[1], 'error': error})
+            print(f"  ✅ Deleted {len(deleted):,}")
+
+        delta.update(hashes, [k for k in keys if k not in failed_keys], deleted)
+        delta.save()
+        print(f"\n📒 Delta manifest updated: {delta.path} ({len(delta):,} respondents)")
 
     return stats
 
 
-def verify_import(supabase: Client, expected_count: int) -> dict:
+def count_capability_respondents(supabase: Client, company_id: str = None) -> int:
+    """
+    Exact count of respondents with capability data, optionally for one company.
+
+    Count-only request: the count comes back in the Content-Range header and
+    no rows are transferred.
+    """
+    query = supabase.table('respondents')\
+        .select('id', count='exact')\
+        .not_.is_('construct_1', 'null')
+    if company_id is not None:
+        query = query.eq('company_id', company_id)
+    return query.limit(0).execute().count or 0
+
+
+def fetch_construct_stats(supabase: Client) -> dict:
+    """
+    count/min/max/mean for all 32 constructs, aggregated in the database.
+
+    Uses the respondent_construct_stats() function from migration
+    015_respondent_construct_stats.sql (one round-trip, exact over all rows).
+
+    Returns:
+        dict: {construct_column: {'min', 'max', 'mean', 'n'}}, empty if the
+        function is not installed
+    """
+    try:
+        response = supabase.rpc('respondent_construct_stats', {}).execute()
+    except APIError as e:
+        print(f"  ⚠️  Score stats unavailable ({error_message(e)}). "
+              f"Apply supabase/migrations/014_restore_wide_construct_columns.sql "
+              f"and 015_respondent_construct_stats.sql")
+        return {}
+
+    return {
+        row['construct']: {
+            'min': float(row['min_score']),
+            'max': float(row['max_score']),
+            'mean': float(row['mean_score']),
+            'n': row['n'],
+        }
+        for row in response.data
+        if row['n']
+    }
+
+
+def verify_import(supabase: Client, expected_count: int, company_mapping: dict) -> dict:
     """
     Verify imported data in database.
 
+    All counts and score statistics are computed server-side, so verification
+    costs 2 + len(company_mapping) small requests regardless of table size.
+
     Returns:
         dict: Verification results
     """
     print("\n🔍 Verifying import...")
 
-    # Count total respondents with capability data
-    response = supabase.table('respondents')\
-        .select('*', count='exact')\
-        .not_.is_('construct_1', 'null')\
-        .execute()
-
-    actual_count = response.count if hasattr(response, 'count') else len(response.data)
-
-    # Get company distribution
-    response_all = supabase.table('respondents')\
-        .select('company_id')\
-        .not_.is_('construct_1', 'null')\
-        .execute()
+    actual_count = count_capability_respondents(supabase)
 
     company_distribution = {}
-    for row in response_all.data:
-        company_id = row['company_id']
-        company_distribution[company_id] = company_distribution.get(company_id, 0) + 1
-
-    # Get score ranges
-    response_scores = supabase.table('respondents')\
-        .select('construct_1,construct_16,construct_32')\
-        .not_.is_('construct_1', 'null')\
-        .limit(1000)\
-        .execute()
-
-    score_stats = {
-        'construct_1': [],
-        'construct_16': [],
-        'construct_32': []
-    }
-
-    for row in response_scores.data:
-        for col in score_stats.keys():
-            if row.get(col) is not None:
-                score_stats[col].append(float(row[col]))
+    for company_name, company_id in company_mapping.items():
+        count = count_capability_respondents(supabase, company_id)
+        if count:
+            company_distribution[company_id] = count
 
     verification = {
         'expected_count': expected_count,
         'actual_count': actual_count,
         'match': actual_count == expected_count,
         'company_distribution': company_distribution,
-        'score_ranges': {}
+        'score_ranges': fetch_construct_stats(supabase)
     }
 
-    for col, values in score_stats.items():
-        if values:
-            verification['score_ranges'][col] = {
-                'min': min(values),
-                'max': max(values),
-                'mean': sum(values) / len(values),
-                'sample_size': len(values)
-            }
-
     print(f"  Expected respondents: {expected_count:,}")
     print(f"  Actual respondents: {actual_count:,}")
     print(f"  Match: {'✅' if verification['match'] else '❌'}")
 
+    company_names = {company_id: name for name, company_id in company_mapping.items()}
     print(f"\n  Company distribution:")
     for company_id, count in company_distribution.items():
-        print(f"    {company_id}: {count:,}")
+        print(f"    {company_names.get(company_id, company_id)}: {count:,}")
+
+    unmapped = actual_count - sum(company_distribution.values())
+    if unmapped > 0:
+        print(f"  ⚠️  {unmapped:,} respondents belong to companies not in the mapping")
 
     return verification
 
@@ -258,6 +415,9 @@ def generate_log(stats: dict, verification: dict, log_path: str):
         "-" * 80,
         f"Total rows processed: {stats['total_rows']:,}",
         f"Successfully inserted: {stats['inserted']:,}",
+        f"Skipped (already committed): {stats.get('skipped', 0):,}",
+        f"Unchanged (delta): {stats.get('unchanged', 0):,}",
+        f"Deleted (delta): {stats.get('deleted', 0):,}",
         f"Errors encountered: {stats['errors']}",
         "",
         "VERIFICATION RESULTS",
@@ -275,14 +435,14 @@ def generate_log(stats: dict, verification: dict, log_path: str):
 
     log_lines.extend([
         "",
-        "SCORE RANGES (Sample)",
+        "SCORE RANGES",
         "-" * 80,
     ])
 
     for col, ranges in verification['score_ranges'].items():
         log_lines.append(
             f"{col}: min={ranges['min']:.2f}, max={ranges['max']:.2f}, "
-            f"mean={ranges['mean']:.2f} (n={ranges['sample_size']})"
+            f"mean={ranges['mean']:.2f} (n={ranges['n']:,})"
         )
 
     if stats['error_details']:
@@ -309,8 +469,26 @@ def generate_log(stats: dict, verification: dict, log_path: str):
     print(f"\n📄 Import log saved to: {log_path}")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Import wide-format capability data")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip batches already committed by a previous interrupted run")
+    parser.add_argument('--delta', action='store_true',
+                        help="Only upsert respondents that are new or changed since the last delta import")
+    parser.add_argument('--delete-missing', action='store_true',
+                        help="With --delta, delete respondents that disappeared from the input")
+    parser.add_argument('--payload', choices=['json', 'csv'], default='json',
+                        help="Request body format: JSON records or a text/csv body (about half the bytes)")
+    parser.add_argument('--gzip', action='store_true',
+                        help="With --payload csv, gzip request bodies (needs a gateway that accepts "
+                             "Content-Encoding: gzip)")
+    return parser.parse_args()
+
+
 def main():
     """Main import pipeline."""
+    args = parse_args()
+
     print("=" * 80)
     print("CAPABILITY DATA IMPORT PIPELINE")
     print("=" * 80)
@@ -343,10 +521,23 @@ def main():
         return
 
     # Step 4: Import data in batches
-    stats = import_in_batches(supabase, df, company_mapping)
+    if args.delta:
+        mode = 'merge'
+        delta = DeltaManifest(f"respondents.{Path(INPUT_FILE).stem}")
+    else:
+        mode = 'ignore' if args.resume else 'insert'
+        delta = None
+
+    journal_name = 'respondents.delta' if args.delta else 'respondents'
+    with BatchJournal(INPUT_FILE, journal_name, BATCH_SIZE, resume=args.resume) as journal:
+        if args.resume:
+            print(f"\n⏯️  Resuming: {len(journal.completed)} batches already committed ({journal.path})")
+        stats = import_in_batches(supabase, df, company_mapping, journal=journal, mode=mode,
+                                  delta=delta, delete_missing=args.delete_missing,
+                                  payload_format=args.payload, compress=args.gzip)
 
     # Step 5: Verify import
-    verification = verify_import(supabase, expected_count=len(df))
+    verification = verify_import(supabase, expected_count=len(df), company_mapping=company_mapping)
 
     # Step 6: Generate log
     generate_log(stats, verification, LOG_FILE)
@@ -360,6 +551,11 @@ def main():
 
     print("=" * 80)
     print(f"Inserted: {stats['inserted']:,} / {stats['total_rows']:,}")
+    if stats['skipped']:
+        print(f"Skipped (already committed): {stats['skipped']:,}")
+    if args.delta:
+        print(f"Unchanged (delta): {stats['unchanged']:,}")
+        print(f"Deleted (delta): {stats['deleted']:,}")
     print(f"Errors: {stats['errors']}")
     print(f"Database count: {verification['actual_count']:,}")
     print(f"Log file: {LOG_FILE}")
@@ -14,9 +14,10 @@ Usage:
 import os
 import sys
 import pandas as pd
-from supabase import create_client, Client
+from supabase import Client
 from docx import Document
 from dotenv import load_dotenv
+from supabase_client import get_client
 
 # Load environment variables
 load_dotenv()
@@ -30,7 +31,7 @@ if not SUPABASE_URL or not SUPABASE_KEY:
     sys.exit(1)
 
 # Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase: Client = get_client(SUPABASE_URL, SUPABASE_KEY)
 
 # File paths
 EXCEL_FILE = 'docs/archive/intervention-source-docs/0 - Overview of interventions per area.xlsx'
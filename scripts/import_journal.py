@@ -0,0 +1,139 @@
+"""
+Import Batch Journal
+====================
+
+Durable local record of committed import batches, so an interrupted import
+can be resumed with --resume instead of starting over (and duplicating
+everything already loaded).
+
+The journal is a JSON-lines file under logs/journals/. The first line is a
+header identifying the source file (SHA-256), target table and batch size;
+every following line is one committed batch:
+
+    {"batch_index": 3, "start_row": 1000, "end_row": 1500, "row_count": 500,
+     "source_hash": "…", "committed_at": "2025-11-03T10:12:44"}
+
+Each entry is flushed and fsync'd before the next batch is reported, so a
+crash loses at most the batch that was in flight.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from file_hash import hash_file
+
+JOURNAL_DIR = "logs/journals"
+
+
+class BatchJournal:
+    """
+    Append-only journal of committed batches for one (source file, table) pair.
+
+    Args:
+        source_file: Input file being imported
+        table: Target table name
+        batch_size: Rows per batch; batch boundaries must match to resume
+        resume: Keep and honour an existing journal. Without it any previous
+            journal for this source/table is discarded and a fresh one started.
+        journal_dir: Directory for journal files
+    """
+
+    def __init__(self, source_file: str, table: str, batch_size: int,
+                 resume: bool = False, journal_dir: str = JOURNAL_DIR):
+        self.source_file = source_file
+        self.table = table
+        self.batch_size = batch_size
+        self.source_hash = hash_file(source_file)
+        self.completed = {}
+
+        Path(journal_dir).mkdir(parents=True, exist_ok=True)
+        self.path = Path(journal_dir) / f"{Path(source_file).stem}.{table}.jsonl"
+
+        header = {
+            'source_file': str(source_file),
+            'source_hash': self.source_hash,
+            'table': table,
+            'batch_size': batch_size,
+        }
+
+        if resume and self.path.exists():
+            self._load(header)
+        else:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'header': header}) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+        self._fh = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self, header: dict):
+        with open(self.path, 'r+b') as f:
+            data = f.read()
+            tail = data.rfind(b'\n') + 1
+            if tail < len(data):
+                # Unterminated final line from a crash mid-write. Repair it before
+                # appending, so the next entry does not land on the same line.
+                try:
+                    json.loads(data[tail:])
+                    f.write(b'\n')  # Complete entry, only the newline is missing
+                    data += b'\n'
+                except ValueError:
+                    f.truncate(tail)  # Torn entry: that batch was never recorded
+                    data = data[:tail]
+                f.flush()
+                os.fsync(f.fileno())
+        lines = data.decode('utf-8').splitlines()
+
+        if not lines:
+            raise ValueError(f"Journal {self.path} is empty; rerun without --resume")
+
+        previous = json.loads(lines[0]).get('header', {})
+        for key in ('source_hash', 'table', 'batch_size'):
+            if previous.get(key) != header[key]:
+                raise ValueError(
+                    f"Journal {self.path} does not match this run ({key}: "
+                    f"{previous.get(key)!r} != {header[key]!r}). The source file or batch "
+                    f"size changed; rerun without --resume to start over."
+                )
+
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn entry with a later one appended to it (journals written
+                # before torn lines were repaired): neither batch is counted
+                continue
+            self.completed[entry['batch_index']] = entry
+
+    @property
+    def completed_rows(self) -> int:
+        return sum(entry['row_count'] for entry in self.completed.values())
+
+    def is_done(self, batch_index: int) -> bool:
+        return batch_index in self.completed
+
+    def record(self, batch_index: int, start_row: int, end_row: int, row_count: int):
+        """Durably record a committed batch."""
+        entry = {
+            'batch_index': batch_index,
+            'start_row': start_row,
+            'end_row': end_row,
+            'row_count': row_count,
+            'source_hash': self.source_hash,
+            'committed_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        self._fh.write(json.dumps(entry) + '\n')
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self.completed[batch_index] = entry
+
+    def close(self):
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
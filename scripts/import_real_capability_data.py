@@ -13,15 +13,24 @@ Requires environment variables:
 import os
 import sys
 import pandas as pd
-from supabase import create_client, Client
+from supabase import Client
 from datetime import datetime
 import hashlib
 
+from batch_loader import ConcurrentBatchLoader
+from keyset_reader import DigestSet, iter_pages
+from supabase_client import get_client
+
 # Configuration
 INPUT_FILE = "data-foundation/capability_real_wide.csv"
 BATCH_SIZE = 50
+UPDATE_BATCH_SIZE = 2000  # Construct updates per upsert request
+UPDATE_MAX_IN_FLIGHT = 4
+EXISTING_PAGE_SIZE = 1000  # Keyset page size when scanning existing respondents
 LOG_DIR = "logs"
 
+CONSTRUCT_COLUMNS = [f'construct_{i}' for i in range(1, 33)]
+
 # Demo companies for new respondents
 DEMO_COMPANIES = ["acme-corp", "tech-innovations", "global-solutions"]
 
@@ -41,6 +50,91 @@ def hash_respondent_to_company(respondent_id: str) -> str:
     company_index = hash_value % 3
     return DEMO_COMPANIES[company_index]
 
+def build_update_records(df_existing: pd.DataFrame, existing_pairs: pd.DataFrame) -> list:
+    """
+    Build construct-only upsert records for respondents already in the database.
+
+    Each record carries the (company_id, respondent_id) conflict key plus the
+    32 construct columns, so the upsert only touches those columns. A
+    respondent_id present under several companies gets one record per company,
+    matching the old per-row .eq('respondent_id', ...) update.
+    """
+    updates = existing_pairs.merge(
+        df_existing[['respondent_id'] + CONSTRUCT_COLUMNS],
+        on='respondent_id',
+        how='inner'
+    )
+    updates = updates[['company_id', 'respondent_id'] + CONSTRUCT_COLUMNS].astype(object)
+    return updates.where(updates.notna(), None).to_dict('records')
+
+def bulk_update_constructs(supabase: Client, update_records: list) -> int:
+    """
+    Apply construct updates with batched upserts on (company_id, respondent_id).
+
+    Returns:
+        int: Number of respondent rows updated
+    """
+    def upsert(batch):
+        supabase.table('respondents')\
+            .upsert(batch, on_conflict='company_id,respondent_id', returning='minimal')\
+            .execute()
+
+    batches = (
+        update_records[start:start + UPDATE_BATCH_SIZE]
+        for start in range(0, len(update_records), UPDATE_BATCH_SIZE)
+    )
+    loader = ConcurrentBatchLoader(upsert, max_in_flight=UPDATE_MAX_IN_FLIGHT)
+    update_count = 0
+
+    for result in loader.run(batches):
+        if result.ok:
+            update_count += result.inserted
+            print(f"  Updated {update_count}/{len(update_records)}...")
+        else:
+            print(f"  ❌ Error updating rows {result.start_row + 1}-{result.end_row}: {result.error}")
+
+    loader.report.print_summary()
+    return update_count
+
+def fetch_existing_respondents(supabase: Client, wanted_ids: set) -> tuple:
+    """
+    Stream all (respondent_id, company_id) pairs with keyset pagination.
+
+    Every respondent_id goes into a DigestSet (8 bytes each), but only pairs
+    for respondents in the input file are kept as rows, so memory follows
+    the input size rather than the table size.
+
+    Returns:
+        tuple: (DigestSet of all existing respondent_ids,
+                DataFrame of respondent_id/company_id pairs for wanted_ids)
+    """
+    existing_ids = DigestSet()
+    pairs = []
+    company_ids = {}  # Intern the handful of distinct company UUIDs
+
+    for page in iter_pages(supabase, 'respondents', ['respondent_id', 'company_id'],
+                           page_size=EXISTING_PAGE_SIZE):
+        existing_ids.update(row['respondent_id'] for row in page)
+        for row in page:
+            if row['respondent_id'] in wanted_ids:
+                company_id = company_ids.setdefault(row['company_id'], row['company_id'])
+                pairs.append((row['respondent_id'], company_id))
+
+    existing_pairs = pd.DataFrame(pairs, columns=['respondent_id', 'company_id'])
+    return existing_ids, existing_pairs
+
+def count_respondents(supabase: Client, capability_only: bool = False) -> int:
+    """
+    Exact respondent count (optionally only those with capability data).
+
+    Count-only request: the count comes back in the Content-Range header, so
+    it is not capped at one PostgREST page like a plain select.
+    """
+    query = supabase.table('respondents').select('id', count='exact')
+    if capability_only:
+        query = query.not_.is_('construct_1', 'null')
+    return query.limit(0).execute().count or 0
+
 def main():
     print_header("REAL CAPABILITY DATA IMPORT PIPELINE")
     print(f"Input: {INPUT_FILE}")
@@ -56,7 +150,7 @@ def main():
         sys.exit(1)
 
     # Initialize Supabase client
-    supabase: Client = create_client(supabase_url, supabase_key)
+    supabase: Client = get_client(supabase_url, supabase_key)
     print("  ✅ Connected to Supabase")
 
     # Fetch company IDs
@@ -78,13 +172,13 @@ def main():
 
     # Check which respondents already exist
     print_step("🔍 Checking existing respondents...")
-    existing_response = supabase.table('respondents').select('respondent_id').execute()
-    existing_ids = {r['respondent_id'] for r in existing_response.data}
+    existing_ids, existing_pairs = fetch_existing_respondents(supabase, set(df['respondent_id']))
     print(f"  ✅ Found {len(existing_ids)} existing respondents in database")
 
     # Separate into updates vs inserts
-    df_existing = df[df['respondent_id'].isin(existing_ids)]
-    df_new = df[~df['respondent_id'].isin(existing_ids)]
+    is_existing = existing_ids.isin(df['respondent_id'])
+    df_existing = df[is_existing]
+    df_new = df[~is_existing]
 
     print(f"\n  Respondents to UPDATE: {len(df_existing)}")
     print(f"  Respondents to INSERT: {len(df_new)}")
@@ -94,23 +188,8 @@ def main():
     if len(df_existing) > 0:
         print_step(f"🔄 Updating {len(df_existing)} existing respondents...")
 
-        for idx, row in df_existing.iterrows():
-            update_data = {}
-
-            # Add all construct scores
-            for i in range(1, 33):
-                col_name = f'construct_{i}'
-                value = row.get(col_name)
-                update_data[col_name] = None if pd.isna(value) else float(value)
-
-            # Update via respondent_id
-            try:
-                supabase.table('respondents').update(update_data).eq('respondent_id', row['respondent_id']).execute()
-                update_count += 1
-                if (update_count) % 10 == 0:
-                    print(f"  Updated {update_count}/{len(df_existing)}...")
-            except Exception as e:
-                print(f"  ❌ Error updating {row['respondent_id']}: {e}")
+        update_records = build_update_records(df_existing, existing_pairs)
+        update_count = bulk_update_constructs(supabase, update_records)
 
         print(f"  ✅ Updated {update_count} respondents")
 
@@ -168,14 +247,14 @@ def main():
 
     # Verify import
     print_step("🔍 Verifying import...")
-    all_respondents_after = supabase.table('respondents').select('respondent_id,construct_1').execute()
-    respondents_with_capability = [r for r in all_respondents_after.data if r.get('construct_1') is not None]
+    total_respondents = count_respondents(supabase)
+    capability_respondents = count_respondents(supabase, capability_only=True)
 
-    print(f"  Total respondents in database: {len(all_respondents_after.data)}")
-    print(f"  Respondents with capability data: {len(respondents_with_capability)}")
+    print(f"  Total respondents in database: {total_respondents}")
+    print(f"  Respondents with capability data: {capability_respondents}")
     print(f"  Expected: {len(existing_ids) + insert_count}")
 
-    if len(respondents_with_capability) >= (len(existing_ids) + insert_count):
+    if capability_respondents >= (len(existing_ids) + insert_count):
         print(f"  Match: ✅")
     else:
         print(f"  Mismatch: ⚠️")
@@ -201,14 +280,14 @@ def main():
         f.write(f"Input file: {INPUT_FILE}\n")
         f.write(f"Respondents updated: {update_count}\n")
         f.write(f"Respondents inserted: {insert_count}\n")
-        f.write(f"Total capability respondents: {len(respondents_with_capability)}\n")
+        f.write(f"Total capability respondents: {capability_respondents}\n")
         f.write(f"\nStatus: {'SUCCESS' if insert_count + update_count == len(df) else 'PARTIAL'}\n")
 
     print_header("✅ IMPORT SUCCESSFUL!")
     print(f"Updated: {update_count} / {len(df_existing)}")
     print(f"Inserted: {insert_count} / {len(df_new)}")
     print(f"Total: {update_count + insert_count} / {len(df)}")
-    print(f"\nDatabase now has {len(respondents_with_capability)} respondents with capability data")
+    print(f"\nDatabase now has {capability_respondents} respondents with capability data")
     print(f"Log file: {LOG_DIR}/import_log.txt")
     print(f"\nNext steps:")
     print(f"1. Review import log for any errors")
@@ -12,8 +12,9 @@ This script:
 
 import json
 import os
-from supabase import create_client, Client
+from supabase import Client
 from dotenv import load_dotenv
+from supabase_client import get_client
 
 # Load environment variables
 load_dotenv('.env.local')
@@ -25,7 +26,7 @@ SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
     raise Exception('Missing Supabase credentials in .env.local')
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+supabase: Client = get_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 
 # Root cause to category_id mapping
 ROOT_CAUSE_TO_CATEGORY = {
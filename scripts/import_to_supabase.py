@@ -2,10 +2,18 @@
 """
 Import CSV data directly to Supabase using the API
 """
+import argparse
 import csv
 import os
 from pathlib import Path
-from supabase import create_client, Client
+import pandas as pd
+from postgrest.exceptions import APIError
+from supabase import Client
+
+from batch_loader import ConcurrentBatchLoader
+from csv_payload import CsvRows, post_csv
+from import_journal import BatchJournal
+from supabase_client import get_client
 
 # Load environment variables from .env.local
 def load_env():
@@ -36,7 +44,7 @@ COMPANY_ID = '550e8400-e29b-41d4-a716-446655440001'
 
 def setup_supabase() -> Client:
     """Initialize Supabase client"""
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+    return get_client(SUPABASE_URL, SUPABASE_KEY)
 
 def insert_companies(supabase: Client):
     """Insert demo companies"""
@@ -100,58 +108,146 @@ def insert_users(supabase: Client):
         except Exception as e:
             print(f"  [ERROR] {user['email']}: {str(e)}")
 
-def insert_respondents_batch(supabase: Client, csv_path: str, batch_size: int = 100):
-    """Insert respondents in batches"""
-    print(f"\nImporting respondents from CSV (batch size: {batch_size})...")
+def build_respondent(row: dict) -> dict:
+    """Map one sentiment CSV row to a respondents record"""
+    respondent = {
+        'company_id': COMPANY_ID,
+        'respondent_id': row['RespondentID'],
+        'region': row['Region'],
+        'department': row['Department'],
+        'employment_type': row['Employment_type'],
+        'age': row['Age'],
+        'user_language': row['UserLanguage']
+    }
+    
+    # Add sentiment scores
+    for i in range(1, 26):
+        sentiment_key = f'Sentiment_{i}'
+        value = row[sentiment_key]
+        respondent[f'sentiment_{i}'] = float(value) if value and value.strip() else None
     
+    return respondent
+
+def iter_respondent_batches(csv_path: str, batch_size: int):
+    """Stream respondent records from the CSV in lists of batch_size"""
     with open(csv_path, 'r', encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)
         
         batch = []
-        total = 0
-        
         for row in reader:
-            respondent = {
-                'company_id': COMPANY_ID,
-                'respondent_id': row['RespondentID'],
-                'region': row['Region'],
-                'department': row['Department'],
-                'employment_type': row['Employment_type'],
-                'age': row['Age'],
-                'user_language': row['UserLanguage']
-            }
-            
-            # Add sentiment scores
-            for i in range(1, 26):
-                sentiment_key = f'Sentiment_{i}'
-                value = row[sentiment_key]
-                respondent[f'sentiment_{i}'] = float(value) if value and value.strip() else None
-            
-            batch.append(respondent)
-            
-            # Insert batch when it reaches batch_size
+            batch.append(build_respondent(row))
             if len(batch) >= batch_size:
-                try:
-                    supabase.table('respondents').insert(batch).execute()
-                    total += len(batch)
-                    print(f"  [OK] Imported {total} respondents...")
-                    batch = []
-                except Exception as e:
-                    print(f"  [ERROR] Error inserting batch: {str(e)}")
-                    batch = []
+                yield batch
+                batch = []
         
-        # Insert remaining batch
         if batch:
-            try:
-                supabase.table('respondents').insert(batch).execute()
-                total += len(batch)
-                print(f"  [OK] Imported {total} respondents...")
-            except Exception as e:
-                print(f"  [ERROR] Error inserting final batch: {str(e)}")
-        
-        print(f"\n[SUCCESS] Total respondents imported: {total}")
+            yield batch
+
+# Sentiment CSV column -> respondents column
+RESPONDENT_COLUMNS = {
+    'RespondentID': 'respondent_id',
+    'Region': 'region',
+    'Department': 'department',
+    'Employment_type': 'employment_type',
+    'Age': 'age',
+    'UserLanguage': 'user_language'
+}
+
+def iter_respondent_frames(csv_path: str, batch_size: int):
+    """Stream respondent batches as CsvRows, built column-wise from CSV chunks"""
+    chunks = pd.read_csv(csv_path, chunksize=batch_size, dtype=str, keep_default_na=False)
+    for chunk in chunks:
+        frame = chunk[list(RESPONDENT_COLUMNS)].rename(columns=RESPONDENT_COLUMNS)
+        frame.insert(0, 'company_id', COMPANY_ID)
+        for i in range(1, 26):
+            values = chunk[f'Sentiment_{i}'].str.strip()
+            frame[f'sentiment_{i}'] = pd.to_numeric(values.mask(values == ''))
+        yield CsvRows(frame)
+
+def insert_respondents_batch(supabase: Client, csv_path: str, batch_size: int = 100,
+                             max_in_flight: int = 1, resume: bool = False,
+                             payload_format: str = 'json', compress: bool = False):
+    """
+    Insert respondents in batches
+    
+    With max_in_flight > 1, up to that many batches are sent concurrently
+    so the import is not bound by one round-trip per batch.
+    
+    Every committed batch is recorded in a local journal. With resume=True,
+    batches already in the journal are skipped and the rest are sent as
+    upserts that ignore existing rows, so a batch that committed just before
+    a crash is not duplicated.
+    
+    A batch the server rejects is bisected until the bad rows are isolated;
+    the good rows are still imported and each rejected row is reported with
+    the server's error message.
+    
+    payload_format='csv' sends each batch as a text/csv body (optionally
+    gzipped) instead of a JSON array, roughly halving the request size.
+    """
+    print(f"\nImporting respondents from CSV (batch size: {batch_size}, in flight: {max_in_flight})...")
+    
+    journal = BatchJournal(csv_path, 'respondents', batch_size, resume=resume)
+    if resume:
+        print(f"  [RESUME] {len(journal.completed)} batches ({journal.completed_rows} rows) "
+              f"already committed per {journal.path}")
+    
+    def insert(batch):
+        if isinstance(batch, CsvRows):
+            post_csv(supabase, 'respondents', batch,
+                     on_conflict='company_id,respondent_id' if resume else None,
+                     resolution='ignore' if resume else None, compress=compress)
+        elif resume:
+            supabase.table('respondents')\
+                .upsert(batch, on_conflict='company_id,respondent_id', ignore_duplicates=True)\
+                .execute()
+        else:
+            supabase.table('respondents').insert(batch).execute()
+    
+    loader = ConcurrentBatchLoader(insert, max_in_flight=max_in_flight, bisect_on=(APIError,))
+    total = journal.completed_rows
+    
+    if payload_format == 'csv':
+        batches = iter_respondent_frames(csv_path, batch_size)
+    else:
+        batches = iter_respondent_batches(csv_path, batch_size)
+    for result in loader.run(batches, skip=journal.is_done):
+        if result.ok:
+            journal.record(result.batch_num, result.start_row, result.end_row, result.inserted)
+            total += result.inserted
+            print(f"  [OK] Batch {result.batch_num} (rows {result.start_row + 1}-{result.end_row}): "
+                  f"imported {total} respondents...")
+            for row, error in result.rejected:
+                print(f"  [REJECTED] {row['respondent_id']}: {error}")
+        else:
+            print(f"  [ERROR] Error inserting batch {result.batch_num} "
+                  f"(rows {result.start_row + 1}-{result.end_row}): {result.error}")
+    
+    journal.close()
+    print(f"\n[SUCCESS] Total respondents imported: {total}")
+    loader.report.print_summary()
+    return total
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Import demo data to Supabase")
+    parser.add_argument('--csv', default='data-foundation/sentiment_demo.csv',
+                        help="Sentiment CSV to import")
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help="Rows per insert request")
+    parser.add_argument('--max-in-flight', type=int, default=4,
+                        help="Concurrent insert requests (1 = sequential)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip batches already committed by a previous interrupted run")
+    parser.add_argument('--payload', choices=['json', 'csv'], default='json',
+                        help="Request body format: JSON records or a text/csv body (about half the bytes)")
+    parser.add_argument('--gzip', action='store_true',
+                        help="With --payload csv, gzip request bodies (needs a gateway that accepts "
+                             "Content-Encoding: gzip)")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    
     print("=" * 50)
     print("AI Navigator - Supabase Data Import")
     print("=" * 50)
@@ -162,7 +258,9 @@ def main():
     # Insert data
     insert_companies(supabase)
     insert_users(supabase)
-    insert_respondents_batch(supabase, 'data-foundation/sentiment_demo.csv', batch_size=100)
+    insert_respondents_batch(supabase, args.csv, batch_size=args.batch_size,
+                             max_in_flight=args.max_in_flight, resume=args.resume,
+                             payload_format=args.payload, compress=args.gzip)
     
     print("\n" + "=" * 50)
     print("[SUCCESS] Import complete!")
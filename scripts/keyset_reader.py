@@ -0,0 +1,125 @@
+"""
+Keyset-Paginated Table Reader
+=============================
+
+Streams every row of a PostgREST table in primary-key order, one page at a
+time. A plain `.select().execute()` only returns the first page (capped by
+the API's max-rows setting), so anything past that limit is silently
+missing; offset paging gets slower with every page. Keyset paging asks for
+`id > <last id seen> ORDER BY id` instead, so each page is an index range
+scan no matter how deep into the table it is.
+
+Only the current page is held in memory. Pair with DigestSet to keep
+membership for millions of keys in 8 bytes per key.
+
+Usage:
+    from keyset_reader import DigestSet, iter_rows
+
+    existing = DigestSet()
+    for row in iter_rows(supabase, 'respondents', ['respondent_id']):
+        existing.add(row['respondent_id'])
+    mask = existing.isin(df['respondent_id'])
+"""
+
+import hashlib
+from array import array
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_PAGE_SIZE = 1000  # Supabase's default max-rows; larger values are capped by the server
+
+
+def iter_pages(supabase, table: str, columns: Sequence[str], key: str = 'id',
+               page_size: int = DEFAULT_PAGE_SIZE,
+               filters: Optional[Callable] = None) -> Iterator[List[dict]]:
+    """
+    Yield pages of rows ordered by `key`, following the last key of each page.
+
+    The loop ends on an empty page rather than a short one, because the
+    server may cap pages below `page_size` (max-rows) without saying so.
+
+    Args:
+        supabase: Supabase client
+        table: Table name
+        columns: Columns to select; `key` is added if missing
+        key: Unique, orderable column to page on (the primary key)
+        page_size: Rows requested per page
+        filters: Optional callable applied to each query, e.g.
+            lambda q: q.not_.is_('construct_1', 'null')
+    """
+    select_columns = list(columns) if key in columns else [key] + list(columns)
+    select = ','.join(select_columns)
+    last_key = None
+
+    while True:
+        query = supabase.table(table).select(select)
+        if filters is not None:
+            query = filters(query)
+        if last_key is not None:
+            query = query.gt(key, last_key)
+        page = query.order(key).limit(page_size).execute().data
+
+        if not page:
+            return
+        last_key = page[-1][key]
+        yield page
+
+
+def iter_rows(supabase, table: str, columns: Sequence[str], **kwargs) -> Iterator[dict]:
+    """Row-by-row view of iter_pages."""
+    for page in iter_pages(supabase, table, columns, **kwargs):
+        yield from page
+
+
+def digest(value) -> int:
+    """Stable 64-bit digest of a key (blake2b, not Python's salted hash)."""
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), 'little')
+
+
+class DigestSet:
+    """
+    Set membership over 64-bit digests of string keys.
+
+    Digests are appended to a compact uint64 buffer and sorted once on first
+    lookup, so n keys cost 8n bytes instead of a Python set of str objects
+    (~70+ bytes each). Lookups are binary searches; isin() checks a whole
+    column at once. A false positive needs a 64-bit collision, which is
+    negligible at millions of keys (~n²/2⁶⁵).
+    """
+
+    def __init__(self, values: Iterable = ()):
+        self._pending = array('Q')
+        self._sorted = np.empty(0, dtype=np.uint64)
+        self.update(values)
+
+    def add(self, value):
+        self._pending.append(digest(value))
+
+    def update(self, values: Iterable):
+        self._pending.extend(digest(v) for v in values)
+
+    def _freeze(self) -> np.ndarray:
+        if len(self._pending):
+            merged = np.concatenate([self._sorted, np.frombuffer(self._pending, dtype=np.uint64)])
+            self._sorted = np.unique(merged)
+            self._pending = array('Q')
+        return self._sorted
+
+    def __len__(self) -> int:
+        return len(self._freeze())
+
+    def __contains__(self, value) -> bool:
+        keys = self._freeze()
+        h = np.uint64(digest(value))
+        i = np.searchsorted(keys, h)
+        return bool(i < len(keys) and keys[i] == h)
+
+    def isin(self, values: Iterable) -> np.ndarray:
+        """Boolean mask: which of `values` are in the set."""
+        keys = self._freeze()
+        hashes = np.fromiter((digest(v) for v in values), dtype=np.uint64)
+        if not len(keys):
+            return np.zeros(len(hashes), dtype=bool)
+        idx = np.minimum(np.searchsorted(keys, hashes), len(keys) - 1)
+        return keys[idx] == hashes
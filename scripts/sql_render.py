@@ -0,0 +1,202 @@
+"""
+Vectorized SQL Rendering
+========================
+
+Renders DataFrames as multi-row INSERT statements a whole column at a time
+(pandas string ops instead of per-cell f-strings in an iterrows loop) and
+streams the statements to an open file.
+
+Constant lookups such as the company id are resolved once per statement
+through a CTE instead of a scalar subquery repeated in every tuple:
+
+    WITH company AS (SELECT id FROM companies WHERE name = 'acme-wealth')
+    INSERT INTO respondents (company_id, respondent_id, ...)
+    SELECT company.id, v.respondent_id, ...
+    FROM company CROSS JOIN (VALUES
+      ('NOV_RESP_0001', ...),
+      ...
+    ) AS v(respondent_id, ...)
+    ON CONFLICT DO NOTHING;
+
+VALUES columns inside a subquery are typed from their literals (an all-NULL
+column would come out as text), so non-text columns carry an explicit cast
+in the SELECT list.
+
+The same column renderers produce COPY text format (tab-separated, \\N for
+NULL, backslash escapes) for write_copy_text, which loads several times
+faster than INSERT statements and needs no SQL quoting at all.
+
+Categorical columns (see capability_schema.py) are rendered per category
+and expanded by code, so a label repeated on a million rows is quoted once.
+"""
+
+import shlex
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+ROWS_PER_STATEMENT = 1000
+NULL = 'NULL'
+COPY_NULL = '\\N'
+
+# COPY text format escapes (backslash first)
+COPY_ESCAPES = [('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r')]
+
+
+def _expand_categories(s: pd.Series, labels: pd.Series, missing: str) -> pd.Series:
+    """Rendered labels of a categorical, one per row by code (missing for NaN)."""
+    codes = s.cat.codes.to_numpy()
+    lookup = np.append(labels.to_numpy(dtype=object), missing)  # code -1 picks the last entry
+    return pd.Series(lookup[codes], index=s.index, dtype=object)
+
+
+def sql_text(values, default: Optional[str] = None) -> pd.Series:
+    """Quote a column as SQL string literals; missing values become default (or NULL)."""
+    s = pd.Series(values)
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        missing = NULL if default is None else sql_text([default]).iloc[0]
+        return _expand_categories(s, sql_text(s.cat.categories), missing)
+    if default is not None:
+        s = s.fillna(default)
+    missing = s.isna()
+    quoted = "'" + s.astype(str).str.replace("'", "''", regex=False) + "'"
+    return quoted.mask(missing, NULL)
+
+
+def copy_text(values, default: Optional[str] = None) -> pd.Series:
+    """Escape a column for COPY text format; missing values become default (or \\N)."""
+    s = pd.Series(values)
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        missing = COPY_NULL if default is None else copy_value(default)
+        return _expand_categories(s, copy_text(s.cat.categories), missing)
+    if default is not None:
+        s = s.fillna(default)
+    missing = s.isna()
+    escaped = s.astype(str)
+    for char, replacement in COPY_ESCAPES:
+        escaped = escaped.str.replace(char, replacement, regex=False)
+    return escaped.astype(object).mask(missing, COPY_NULL)
+
+
+def copy_value(value) -> str:
+    """Scalar version of copy_text for row-at-a-time writers."""
+    if value is None:
+        return COPY_NULL
+    value = str(value)
+    for char, replacement in COPY_ESCAPES:
+        value = value.replace(char, replacement)
+    return value
+
+
+def copy_source(path, gzipped: bool = False) -> str:
+    """
+    FROM target of a psql \\copy for a data file: the quoted path, or for a
+    gzipped file a PROGRAM that decompresses it. psql un-doubles '' inside the
+    quotes; the path is also shell-quoted inside the PROGRAM command, so
+    spaces and quotes in paths survive both.
+    """
+    target = f"gzip -dc {shlex.quote(str(path))}" if gzipped else str(path)
+    literal = "'" + target.replace("'", "''") + "'"
+    return f"PROGRAM {literal}" if gzipped else literal
+
+
+def sql_decimal(values, decimals: int = 2, null: str = NULL) -> pd.Series:
+    """
+    Fixed-point literals without per-value string formatting.
+
+    Values are scaled to integers; the integer part is converted with one
+    astype(str) and the zero-padded fraction is looked up from a table of
+    10**decimals precomputed strings.
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(arr)
+    scale = 10 ** decimals
+    scaled = np.rint(np.abs(np.where(missing, 0.0, arr)) * scale).astype(np.int64)
+
+    whole = (scaled // scale).astype(str).astype(object)
+    if decimals:
+        fractions = np.array([f".{i:0{decimals}d}" for i in range(scale)], dtype=object)
+        out = whole + fractions[scaled % scale]
+    else:
+        out = whole
+    out = np.where(arr < 0, '-' + out, out)
+    return pd.Series(np.where(missing, null, out), dtype=object)
+
+
+def sql_integer(values, null: str = NULL) -> pd.Series:
+    """Integer literals (NULL for missing)."""
+    s = pd.Series(values)
+    missing = s.isna()
+    return s.fillna(0).astype(np.int64).astype(str).astype(object).mask(missing, null)
+
+
+def render_tuples(columns: Sequence[pd.Series], start: int = 0, stop: int = None) -> list:
+    """Join rendered columns into "  (a, b, c)" VALUES tuples for rows start:stop."""
+    column_lists = [c.iloc[start:stop].tolist() for c in columns]
+    return ['  (' + ', '.join(values) + ')' for values in zip(*column_lists)]
+
+
+def write_cte_inserts(out, table: str, cte: str, select: Sequence[str], target_columns: Sequence[str],
+                      value_columns: Dict[str, pd.Series], rows_per_statement: int = ROWS_PER_STATEMENT,
+                      suffix: str = "ON CONFLICT DO NOTHING") -> int:
+    """
+    Stream INSERT ... SELECT ... FROM <cte> CROSS JOIN (VALUES ...) statements.
+
+    Args:
+        out: Open text file
+        table: Target table
+        cte: Body of the `WITH company AS (...)` CTE (evaluated once per statement)
+        select: SELECT list expressions, in target column order; refer to
+            VALUES columns as v.<name> and the CTE as company
+        target_columns: Target column names
+        value_columns: {name: rendered column} for the VALUES list
+        rows_per_statement: Tuples per statement
+        suffix: Appended to each statement
+
+    Returns:
+        int: Rows written
+    """
+    columns = [c.reset_index(drop=True) for c in value_columns.values()]
+    total = len(columns[0]) if columns else 0
+    head = (
+        f"WITH company AS ({cte})\n"
+        f"INSERT INTO {table} (\n  {', '.join(target_columns)}\n)\n"
+        f"SELECT {', '.join(select)}\n"
+        f"FROM company CROSS JOIN (VALUES\n"
+    )
+    tail = f"\n) AS v({', '.join(value_columns)})\n{suffix};\n\n"
+
+    for start in range(0, total, rows_per_statement):
+        out.write(head)
+        out.write(',\n'.join(render_tuples(columns, start, start + rows_per_statement)))
+        out.write(tail)
+    return total
+
+
+def pick_column(df: pd.DataFrame, names: Iterable[str], default=None) -> pd.Series:
+    """First of `names` present in df (missing values filled with default), else a constant column."""
+    for name in names:
+        if name in df.columns:
+            column = df[name]
+            if default is None:
+                return column
+            if isinstance(column.dtype, pd.CategoricalDtype) and default not in column.cat.categories:
+                column = column.cat.add_categories([default])
+            return column.fillna(default)
+    return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+
+def write_copy_text(out, columns: Sequence[pd.Series], rows_per_chunk: int = 10000) -> int:
+    """
+    Write pre-rendered COPY text columns as tab-separated lines.
+
+    Returns:
+        int: Rows written
+    """
+    columns = [c.reset_index(drop=True) for c in columns]
+    total = len(columns[0]) if columns else 0
+    for start in range(0, total, rows_per_chunk):
+        column_lists = [c.iloc[start:start + rows_per_chunk].tolist() for c in columns]
+        out.write(''.join('\t'.join(values) + '\n' for values in zip(*column_lists)))
+    return total
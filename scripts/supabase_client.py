@@ -0,0 +1,119 @@
+"""
+Shared Supabase Client
+======================
+
+One client factory for all import scripts. The PostgREST session behind the
+client is replaced with a tuned httpx connection pool:
+
+- keep-alive connections sized for the concurrent batch loaders, so
+  back-to-back batches reuse warm TLS connections instead of handshaking
+- explicit connect/read timeouts (connect fails fast, large batches may
+  take a while)
+- HTTP/2 when the `h2` package is installed (pip install h2), which lets
+  concurrent batches share one connection
+
+Clients are cached per (url, key), so every caller in a process shares the
+same pool. Connections are only opened on the first request.
+
+Tuning (environment variables, all optional):
+    SUPABASE_POOL_SIZE        max connections per client (default 8)
+    SUPABASE_CONNECT_TIMEOUT  seconds (default 10)
+    SUPABASE_READ_TIMEOUT     seconds (default 120)
+    SUPABASE_HTTP2            0 to force HTTP/1.1
+
+Usage:
+    from supabase_client import get_client
+
+    supabase = get_client(url, key)
+
+See bench_http_pool.py for the per-request overhead with and without
+connection reuse.
+"""
+
+import importlib.util
+import os
+import threading
+
+import httpx
+from postgrest.utils import SyncClient
+from supabase import Client, create_client
+
+POOL_SIZE = int(os.getenv('SUPABASE_POOL_SIZE', '8'))
+CONNECT_TIMEOUT = float(os.getenv('SUPABASE_CONNECT_TIMEOUT', '10'))
+READ_TIMEOUT = float(os.getenv('SUPABASE_READ_TIMEOUT', '120'))
+KEEPALIVE_EXPIRY = 60.0  # Idle seconds before a pooled connection is dropped
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package and is not disabled via SUPABASE_HTTP2=0."""
+    if os.getenv('SUPABASE_HTTP2', '1') == '0':
+        return False
+    return importlib.util.find_spec('h2') is not None
+
+
+def pooled_session(base_url: str, headers=None, pool_size: int = POOL_SIZE,
+                   connect_timeout: float = CONNECT_TIMEOUT, read_timeout: float = READ_TIMEOUT,
+                   http2: bool = None, verify=True) -> SyncClient:
+    """
+    httpx session with keep-alive pooling, for use as a PostgREST session.
+
+    Args:
+        base_url: PostgREST base URL (…/rest/v1)
+        headers: Default headers (apikey, Authorization, …)
+        pool_size: Max open connections; all are kept alive between requests
+        connect_timeout: Seconds to establish a connection
+        read_timeout: Seconds to wait for a response
+        http2: Negotiate HTTP/2; None means "if available"
+        verify: TLS verification (True, False or a CA bundle path)
+    """
+    if http2 is None:
+        http2 = http2_available()
+    return SyncClient(
+        base_url=base_url,
+        headers=headers,
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        http2=http2,
+        verify=verify,
+    )
+
+
+def get_client(url: str, key: str, **session_options) -> Client:
+    """
+    Shared Supabase client for (url, key) with a pooled PostgREST session.
+
+    The first call for a given (url, key) creates the client; later calls
+    return the same instance (and ignore session_options).
+
+    Args:
+        url: Supabase project URL
+        key: API key (anon or service role)
+        **session_options: Passed to pooled_session (pool_size, timeouts, http2, verify)
+    """
+    with _lock:
+        client = _clients.get((url, key))
+        if client is None:
+            client = create_client(url, key)
+            postgrest = client.postgrest
+            default_session = postgrest.session
+            postgrest.session = pooled_session(
+                str(default_session.base_url), default_session.headers, **session_options
+            )
+            default_session.close()
+            _clients[(url, key)] = client
+    return client
+
+
+def close_clients():
+    """Close all pooled connections (optional; they are also closed at exit)."""
+    with _lock:
+        for client in _clients.values():
+            client.postgrest.session.close()
+        _clients.clear()
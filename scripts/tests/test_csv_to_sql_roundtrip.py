@@ -0,0 +1,134 @@
+"""
+Round-trip tests for csv_to_sql.py against a local Postgres.
+
+Each output format (INSERT statements, COPY text, gzipped COPY text) is
+loaded with psql into its own throwaway database, and the respondents table
+must come out identical. Needs psql on PATH and TEST_DATABASE_URL pointing
+at a server where the user may create databases, e.g.
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost/postgres pytest scripts/tests
+
+Skipped when either is missing.
+"""
+
+import csv
+import os
+import shutil
+import subprocess
+import sys
+import uuid
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from csv_to_sql import csv_to_sql
+
+DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+PSQL = shutil.which('psql')
+
+pytestmark = pytest.mark.skipif(not (DATABASE_URL and PSQL), reason="needs psql and TEST_DATABASE_URL")
+
+SCHEMA = """
+CREATE TABLE companies (id UUID PRIMARY KEY, name TEXT UNIQUE, display_name TEXT, logo_url TEXT);
+CREATE TABLE demo_users (
+  email TEXT UNIQUE, password_hash TEXT, company_id UUID REFERENCES companies(id), full_name TEXT, role TEXT
+);
+CREATE TABLE respondents (
+  company_id UUID REFERENCES companies(id),
+  respondent_id TEXT, region TEXT, department TEXT, employment_type TEXT, age TEXT, user_language TEXT,
+  {sentiments}
+);
+""".format(sentiments=',\n  '.join(f'sentiment_{i} NUMERIC' for i in range(1, 26)))
+
+# Values that need quoting in SQL or escaping in COPY text
+TRICKY_ROWS = [
+    ('R1', "O'Brien's region", 'Sales, EMEA', 'Full-time', '30-39', 'en'),
+    ('R2', 'Tab\there', 'Back\\slash', 'Part-time', '40-49', 'nl'),
+    ('R3', 'Line\nbreak', 'Ünïcødé – dept', 'Contract', '', 'de'),
+    ('R4', '\\N', 'NULL', "''", '20-29', 'fr'),
+]
+
+
+def _psql(url, *args, cwd=None):
+    return subprocess.run([PSQL, '-X', '-q', '-v', 'ON_ERROR_STOP=1', '-d', url, *args],
+                          cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+def _database_url(name):
+    parts = urlsplit(DATABASE_URL)
+    return urlunsplit(parts._replace(path=f'/{name}'))
+
+
+@pytest.fixture
+def fresh_database():
+    """Factory for empty databases with the demo schema, dropped afterwards."""
+    names = []
+
+    def create():
+        name = f'csv_to_sql_test_{uuid.uuid4().hex[:12]}'
+        _psql(DATABASE_URL, '-c', f'CREATE DATABASE {name}')
+        names.append(name)
+        url = _database_url(name)
+        _psql(url, '-c', SCHEMA)
+        return url
+
+    yield create
+    for name in names:
+        _psql(DATABASE_URL, '-c', f'DROP DATABASE IF EXISTS {name}')
+
+
+@pytest.fixture
+def sentiment_csv(tmp_path):
+    """Sentiment CSV in a directory whose name needs quoting (space and quote)."""
+    data_dir = tmp_path / "data dir's"
+    data_dir.mkdir()
+    path = data_dir / 'sentiment demo.csv'
+    header = ['RespondentID', 'Region', 'Department', 'Employment_type', 'Age', 'UserLanguage'] \
+        + [f'Sentiment_{i}' for i in range(1, 26)]
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for n, text_values in enumerate(TRICKY_ROWS):
+            scores = [str((n + i) % 5 + 1) if (n + i) % 7 else '' for i in range(1, 26)]
+            writer.writerow(list(text_values) + scores)
+        for n in range(2500):  # enough rows for several INSERT statements
+            writer.writerow([f'BULK_{n:05d}', 'North', 'Ops', 'Full-time', '30-39', 'en']
+                            + [f'{(n * i) % 5 + 1}.5' for i in range(1, 26)])
+    return path
+
+
+def _load_and_dump(url, loader, cwd):
+    _psql(url, '-f', str(loader), cwd=cwd)
+    return _psql(url, '-c', 'COPY (SELECT * FROM respondents ORDER BY respondent_id) TO STDOUT')
+
+
+def test_copy_output_loads_same_rows_as_insert_output(tmp_path, sentiment_csv, fresh_database):
+    out_dir = sentiment_csv.parent
+    dumps = {}
+    for name, kwargs in [
+        ('sql', dict(output_format='sql', rows_per_statement=1000)),
+        ('copy', dict(output_format='copy', compress=False)),
+        ('copy_gzip', dict(output_format='copy', compress=True)),
+    ]:
+        loader = out_dir / f'import {name}.sql'
+        rows = csv_to_sql(str(sentiment_csv), str(loader), transaction=True, **kwargs)
+        assert rows == len(TRICKY_ROWS) + 2500
+        dumps[name] = _load_and_dump(fresh_database(), loader, cwd=tmp_path)
+
+    assert dumps['sql'].count('\n') == len(TRICKY_ROWS) + 2500
+    assert dumps['copy'] == dumps['sql']
+    assert dumps['copy_gzip'] == dumps['sql']
+
+
+def test_tricky_text_values_survive_copy(tmp_path, sentiment_csv, fresh_database):
+    loader = sentiment_csv.parent / 'import.sql'
+    csv_to_sql(str(sentiment_csv), str(loader), output_format='copy')
+    url = fresh_database()
+    _psql(url, '-f', str(loader), cwd=tmp_path)
+    loaded = _psql(url, '-A', '-t', '-R', '\x1e', '-F', '\x1f', '-c',
+                   "SELECT respondent_id, region, department, employment_type, age, user_language "
+                   "FROM respondents WHERE respondent_id LIKE 'R_' ORDER BY respondent_id")
+    rows = [tuple(record.split('\x1f')) for record in loaded.rstrip('\n').split('\x1e')]
+    assert rows == TRICKY_ROWS
@@ -0,0 +1,84 @@
+"""
+Regression tests for the Eurostat sheet reader.
+
+data_wrangeling_Eurostat.py reads each sheet's cells once and parses the
+grid itself instead of calling pd.read_excel per header guess, mirroring
+pandas' read_excel internals. These tests build a small Eurostat-style
+workbook and check the grid parser still returns what pd.read_excel does,
+so a pandas upgrade that changes those internals shows up here.
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'docs' / 'development' / 'database-info'
+                       / 'EUROSTAT_load_db'))
+from data_wrangeling_Eurostat import _open_workbook, _parse_grid, _read_sheet_tidy, _sheet_grid
+
+SHEET = 'Sheet 1'
+TIME_ROW = 4
+
+# Metadata, a TIME/GEO header band with blank cells to forward-fill, then data
+# with ints, floats, Eurostat's ':' placeholder, an error cell and blanks
+ROWS = [
+    ['Data extracted on 16/10/2025 10:12:34 from [ESTAT]'],
+    ['Dataset:', None, 'Artificial intelligence by size class of enterprise [isoc_eb_ai]'],
+    [],
+    ['Time frequency', None, 'Annual'],
+    ['TIME', '2021', None, '2023', None],
+    ['GEO (Labels)', None, None, None, None],
+    ['European Union - 27 countries (from 2020)', 8, None, 7.5, None],
+    ['Belgium', 10, None, ':', None],
+    ['Netherlands', '#N/A', None, 13.25, None],
+    [None, None, None, None, None, None, None],  # trailing blank row, wider than the data
+]
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    path = tmp_path / 'isoc_eb_ai$defaultview_spreadsheet.xlsx'
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = SHEET
+    for row in ROWS:
+        sheet.append(row)
+    workbook.save(path)
+    return path
+
+
+def _grid(path):
+    workbook = _open_workbook(path)
+    try:
+        return _sheet_grid(workbook, SHEET)
+    finally:
+        workbook.close()
+
+
+@pytest.mark.parametrize('header', [None, 0, [TIME_ROW, TIME_ROW + 1]])
+def test_parse_grid_matches_read_excel(workbook_path, header):
+    expected = pd.read_excel(workbook_path, sheet_name=SHEET, header=header, dtype=str)
+    pd.testing.assert_frame_equal(_parse_grid(_grid(workbook_path), header), expected)
+
+
+def test_parse_grid_leaves_the_grid_unchanged(workbook_path):
+    grid = _grid(workbook_path)
+    before = [list(values) for values in grid]
+    _parse_grid(grid, [TIME_ROW, TIME_ROW + 1])
+    assert grid == before
+
+
+def test_read_sheet_tidy_finds_the_header_band(workbook_path):
+    workbook = _open_workbook(workbook_path)
+    try:
+        tidy, error = _read_sheet_tidy(workbook, SHEET)
+    finally:
+        workbook.close()
+    assert error is None
+    assert sorted(set(tidy['country_name'])) == ['Belgium', 'European Union - 27 countries (from 2020)', 'Netherlands']
+    assert sorted(set(tidy['year'])) == [2021, 2023]
+    assert (tidy['time_frequency'] == 'Annual').all()
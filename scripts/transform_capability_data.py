@@ -23,6 +23,8 @@ import hashlib
 from pathlib import Path
 from datetime import datetime
 
+from capability_schema import read_capability_long, widen_scores
+
 # Configuration
 INPUT_FILE = "data-foundation/capability_demo.csv"
 OUTPUT_FILE = "data-foundation/capability_demo_wide.csv"
@@ -107,8 +109,8 @@ def handle_duplicates(df: pd.DataFrame) -> pd.DataFrame:
 
     initial_count = len(df)
 
-    # Group by respondent and construct, average scores
-    deduplicated = df.groupby(['ResponseId_id', 'construct_id']).agg({
+    # Group by respondent and construct, average scores (in float64; scores load as float32)
+    deduplicated = df.assign(score=widen_scores(df['score'])).groupby(['ResponseId_id', 'construct_id']).agg({
         'score': 'mean',  # Average duplicate scores
         'dimension_id': 'first',
         'dimension': 'first',
@@ -356,7 +358,7 @@ def main():
 
     # Step 1: Load data
     print("\n📂 Loading capability data...")
-    df = pd.read_csv(INPUT_FILE)
+    df = read_capability_long(INPUT_FILE)
     print(f"  ✅ Loaded {len(df):,} rows")
 
     # Step 2: Validate input
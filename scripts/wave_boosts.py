@@ -0,0 +1,43 @@
+"""
+Wave Generation Primitives
+==========================
+
+Random streams and respondent ids for generated survey waves (the effects
+themselves are declared and applied in wave_simulation.py).
+
+Each phase draws from its own numpy Generator, spawned from one seed with
+SeedSequence.spawn. The streams are independent, so a phase's draws do not
+depend on how many numbers an earlier phase consumed: phases can be drawn
+in any order (or in parallel) and still reproduce exactly.
+
+Usage:
+    from wave_boosts import phase_generators, prefix_ids
+
+    rng_p2, rng_p3 = phase_generators(42, 2)
+    df['respondent_id'] = prefix_ids(df['respondent_id'], 'MAR25_')
+"""
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SEED = 42
+MAX_SCORE = 5.0
+
+
+def phase_generators(seed: int, phases: int) -> List[np.random.Generator]:
+    """Independent random streams, one per phase, derived from one seed."""
+    return [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(phases)]
+
+
+def prefix_ids(ids: pd.Series, prefix: str, replace: str = None) -> pd.Series:
+    """
+    Wave-specific respondent ids: prefix + id, or, for ids that already
+    contain `replace` (an earlier wave's prefix), that prefix swapped out.
+    """
+    ids = ids.astype(str)
+    prefixed = prefix + ids
+    if replace is None:
+        return prefixed
+    return prefixed.where(~ids.str.contains(replace, regex=False), ids.str.replace(replace, prefix, regex=False))
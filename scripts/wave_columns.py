@@ -0,0 +1,87 @@
+"""
+Survey Wave Column Layout
+=========================
+
+How generated survey waves map onto the respondents and capability_scores
+tables: target columns, source columns (both CSV naming conventions) and
+defaults, and column renderers that work with either the SQL literal or
+the COPY text functions from sql_render.py.
+
+Shared by generate_nov_2024_data.py and the wave simulation engine
+(wave_simulation.py).
+"""
+
+from sql_render import pick_column
+
+SENTIMENT_COLS = [f'sentiment_{i}' for i in range(1, 26)]
+
+# respondents text columns: (column, source columns in order of preference, default)
+RESPONDENT_TEXT_COLUMNS = [
+    ('respondent_id', ['RespondentID', 'respondent_id'], None),
+    ('region', ['Region', 'region'], 'Unknown'),
+    ('department', ['Department', 'department'], 'Unknown'),
+    ('employment_type', ['EmploymentType', 'employment_type'], 'Full-time'),
+    ('age', ['Age', 'age'], '30-39'),
+    ('user_language', ['UserLanguage', 'user_language'], 'en'),
+    ('industry', ['Industry', 'industry'], 'Financial Services'),
+    ('continent', ['Continent', 'continent'], 'North America'),
+]
+
+# capability_scores synthetic columns and their defaults
+CAPABILITY_SYNTHETIC_DEFAULTS = {
+    'industry_synthetic': 'Financial Services',
+    'country_synthetic': 'USA',
+    'continent_synthetic': 'North America',
+    'role_synthetic': 'Analyst',
+}
+
+# Column types for the COPY staging tables
+CAPABILITY_TYPES = {'dimension_id': 'INTEGER', 'construct_id': 'INTEGER', 'score': 'NUMERIC'}
+SENTIMENT_TYPES = {col: 'NUMERIC' for col in SENTIMENT_COLS}
+
+def sentiment_columns(df, text, decimal):
+    """Rendered respondents columns (handles both naming conventions)"""
+    columns = {
+        name: text(pick_column(df, sources, default))
+        for name, sources, default in RESPONDENT_TEXT_COLUMNS
+    }
+    for col in SENTIMENT_COLS:
+        columns[col] = decimal(pick_column(df, [col]).astype(float))
+    return columns
+
+def capability_columns(df, text, decimal, integer):
+    """Rendered capability_scores columns (handles both naming conventions)"""
+    columns = {
+        'respondent_id': text(pick_column(df, ['ResponseId_id', 'respondent_id'])),
+        'dimension_id': integer(df['dimension_id']),
+        'dimension': text(df['dimension']),
+        'construct_id': integer(df['construct_id']),
+        'construct': text(df['construct']),
+        'score': decimal(df['score']),
+    }
+    for col, default in CAPABILITY_SYNTHETIC_DEFAULTS.items():
+        columns[col] = text(pick_column(df, [col], default))
+    return columns
+
+def respondent_targets():
+    text_cols = [name for name, _, _ in RESPONDENT_TEXT_COLUMNS]
+    return ['company_id'] + text_cols + ['survey_wave', 'assessment_date'] + SENTIMENT_COLS
+
+def respondent_select(prefix, wave_sql, cast=True):
+    """SELECT list for respondents; wave_sql is [survey_wave literal, assessment_date literal]"""
+    text_cols = [name for name, _, _ in RESPONDENT_TEXT_COLUMNS]
+    numeric = '::NUMERIC' if cast else ''
+    return (['company.id'] + [f'{prefix}.{c}' for c in text_cols] + list(wave_sql)
+            + [f'{prefix}.{c}{numeric}' for c in SENTIMENT_COLS])
+
+def capability_targets():
+    return (['company_id', 'respondent_id', 'dimension_id', 'dimension', 'construct_id', 'construct', 'score']
+            + list(CAPABILITY_SYNTHETIC_DEFAULTS) + ['survey_wave', 'assessment_date'])
+
+def capability_select(prefix, wave_sql, cast=True):
+    """SELECT list for capability_scores; wave_sql is [survey_wave literal, assessment_date literal]"""
+    value_cols = capability_targets()[1:-2]
+    return (['company.id']
+            + [f'{prefix}.{c}' + (f'::{CAPABILITY_TYPES[c]}' if cast and c in CAPABILITY_TYPES else '')
+               for c in value_cols]
+            + list(wave_sql))
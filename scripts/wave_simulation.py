@@ -0,0 +1,629 @@
+#!/usr/bin/env python3
+"""
+Intervention Impact Simulation
+==============================
+
+One engine for generating follow-up survey waves from a baseline. A
+scenario is declarative: a list of waves, each naming the interventions
+applied before it and, per intervention, which sentiment cells or
+capability dimensions move, by what distribution, and within which bounds.
+
+    Effect('sentiment', mean=0.5, std=0.1, cells=range(21, 26))        # +N(0.5, 0.1), capped at 5.0
+    Effect('capability', mean=1.35, dimensions=(1, 8), mode='multiply', cap=7.0)
+
+Per wave and target, effects are applied in this order:
+
+    1. targeted  - the interventions' effects, then the wave's own `effects`
+    2. default   - only cells/dimensions no targeted effect touched
+    3. ambient   - every cell/dimension (culture shift)
+
+Each effect draws all of its values in one array call (rows x cells for
+sentiment, one per row for capability) and is clipped to [floor, cap]
+right away. Waves build on the previous wave; respondent ids are the
+baseline ids with the wave's prefix.
+
+Randomness comes from SeedSequence.spawn: one stream per company and, below
+it, one per wave, so every company and wave reproduces exactly no matter how
+the work is split across processes.
+
+The scenarios the scripts used to hard-code are defined here: NOV_2024
+(generate_nov_2024_data.py), JOURNEY_2025 (create_complete_journey.py) and
+PHASE3_PACKAGE (create_phase3_single_file.py). Custom scenarios can be
+loaded from JSON (see scenario_from_dict).
+
+Multi-company runs:
+    python scripts/wave_simulation.py --scenario journey --tenants 200 --workers 8 \\
+        --format copy --output-dir data/simulations/journey
+
+Each company gets a baseline resampled from the template (by respondent),
+then every wave; output is written per company as the journey CSV layout
+(--format csv) or as COPY text files plus one psql loader (--format copy):
+
+    psql "$DATABASE_URL" -f data/simulations/journey/load.sql
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from capability_schema import read_capability_long
+from copy_loader import (
+    capability_insert, copy_from, loader_header, loader_path, respondents_insert, staging_table,
+)
+from csv_cache import read_csv_cached
+from sql_render import COPY_NULL, copy_text, sql_decimal, sql_integer, write_copy_text
+from wave_boosts import DEFAULT_SEED, MAX_SCORE, prefix_ids
+from wave_columns import (
+    CAPABILITY_TYPES, RESPONDENT_TEXT_COLUMNS, SENTIMENT_COLS, SENTIMENT_TYPES, capability_columns,
+    capability_targets, sentiment_columns,
+)
+
+SENTIMENT = 'sentiment'
+CAPABILITY = 'capability'
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass(frozen=True)
+class Effect:
+    """
+    One effect distribution on sentiment cells or capability dimensions.
+
+    Args:
+        target: 'sentiment' or 'capability'
+        mean, std: Normal distribution of the change (std 0 = constant)
+        cells: Sentiment question numbers 1-25 (None = all)
+        dimensions: Capability dimension ids (None = all)
+        mode: 'add' (value + draw) or 'multiply' (value * draw)
+        cap, floor: Bounds applied after the change (None = unbounded)
+    """
+    target: str
+    mean: float
+    std: float = 0.0
+    cells: Optional[Tuple[int, ...]] = None
+    dimensions: Optional[Tuple[int, ...]] = None
+    mode: str = 'add'
+    cap: Optional[float] = MAX_SCORE
+    floor: Optional[float] = None
+
+    def __post_init__(self):
+        if self.target not in (SENTIMENT, CAPABILITY):
+            raise ValueError(f"Unknown effect target: {self.target}")
+        if self.mode not in ('add', 'multiply'):
+            raise ValueError(f"Unknown effect mode: {self.mode}")
+        # Accept ranges/lists in specs; store hashable tuples
+        if self.cells is not None:
+            object.__setattr__(self, 'cells', tuple(self.cells))
+        if self.dimensions is not None:
+            object.__setattr__(self, 'dimensions', tuple(self.dimensions))
+
+    def apply(self, values: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Changed and clipped copy of values (NaN stays NaN)."""
+        if self.std:
+            draws = rng.normal(self.mean, self.std, values.shape)
+        else:
+            draws = np.full(values.shape, self.mean)
+        out = values + draws if self.mode == 'add' else values * draws
+        if self.cap is not None:
+            np.minimum(out, self.cap, out=out)
+        if self.floor is not None:
+            np.maximum(out, self.floor, out=out)
+        return out
+
+
+@dataclass(frozen=True)
+class Wave:
+    """
+    One follow-up survey wave.
+
+    Args:
+        name: survey_wave value, e.g. 'mar-2025-phase2'
+        title: Assessment period name
+        assessment_date: ISO date
+        id_prefix: Prepended to the baseline respondent ids
+        interventions: {intervention code: effects} applied before this wave
+        effects: Targeted effects not tied to one intervention
+        default: Effects for cells/dimensions no targeted effect touched
+        ambient: Effects for every cell/dimension, applied last
+    """
+    name: str
+    title: str
+    assessment_date: str
+    id_prefix: str
+    interventions: Dict[str, Tuple[Effect, ...]] = field(default_factory=dict)
+    effects: Tuple[Effect, ...] = ()
+    default: Tuple[Effect, ...] = ()
+    ambient: Tuple[Effect, ...] = ()
+
+    def targeted(self, target: str) -> List[Effect]:
+        effects = [e for code_effects in self.interventions.values() for e in code_effects] + list(self.effects)
+        return [e for e in effects if e.target == target]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Baseline wave metadata plus the waves generated from it, in order."""
+    name: str
+    baseline_name: str
+    baseline_title: str
+    baseline_date: str
+    waves: Tuple[Wave, ...]
+
+
+def _sentiment(mean, std, cells=None, **kwargs):
+    return Effect(SENTIMENT, mean, std, cells=cells, **kwargs)
+
+
+def _capability(mean, std, dimensions=None, **kwargs):
+    return Effect(CAPABILITY, mean, std, dimensions=dimensions, **kwargs)
+
+
+def november_2024_scenario(sentiment_rate: float = 0.15, capability_rate: float = 0.12) -> Scenario:
+    """Nov 2024 progress check after A1, B2, C1 (generate_nov_2024_data.py)."""
+    return Scenario(
+        name='nov-2024',
+        baseline_name='oct-2024-baseline', baseline_title='Oct 2024 Baseline', baseline_date='2024-10-15',
+        waves=(Wave(
+            name='nov-2024', title='Nov 2024 Progress Check', assessment_date='2024-11-15', id_prefix='NOV_',
+            interventions={
+                # Q21-25 org stability, Dim 1 strategy
+                'A1': (_sentiment(sentiment_rate, 0.05, range(21, 26)), _capability(capability_rate, 0.04, (1,))),
+                # Q6-10 collaboration, Dims 4/7 talent and adoption
+                'B2': (_sentiment(sentiment_rate, 0.05, range(6, 11)), _capability(capability_rate, 0.04, (4, 7))),
+                # Q16-20 career development, Dim 6 innovation
+                'C1': (_sentiment(sentiment_rate, 0.05, range(16, 21)), _capability(capability_rate, 0.04, (6,))),
+            },
+            default=(_capability(0.06, 0.02),),
+            ambient=(_sentiment(0.05, 0.02),),
+        ),),
+    )
+
+
+NOV_2024 = november_2024_scenario()
+
+JOURNEY_2025 = Scenario(
+    name='journey',
+    baseline_name='oct-2024-baseline', baseline_title='Phase 1: Oct 2024 Baseline', baseline_date='2024-10-15',
+    waves=(
+        Wave(
+            name='mar-2025-phase2', title='Phase 2: Mar 2025 Post-Intervention', assessment_date='2025-03-15',
+            id_prefix='MAR25_',
+            interventions={
+                'A1': (_sentiment(0.5, 0.1, range(21, 26)), _capability(0.6, 0.1, (1,))),
+                'B2': (_sentiment(0.4, 0.08, range(6, 11)), _capability(0.5, 0.1, (4, 7))),
+                'C1': (_sentiment(0.4, 0.08, range(16, 21)), _capability(0.4, 0.1, (6,))),
+            },
+            default=(_capability(0.3, 0.05),),
+            ambient=(_sentiment(0.3, 0.05),),
+        ),
+        Wave(
+            name='nov-2025-phase3', title='Phase 3: Nov 2025 Advanced', assessment_date='2025-11-15',
+            id_prefix='NOV25_',
+            interventions={
+                'A3': (_sentiment(0.4, 0.08, range(11, 16)), _capability(0.7, 0.1, (8,))),
+                'B3': (_sentiment(0.4, 0.08, range(1, 6)), _capability(0.6, 0.1, (5,))),
+                'C2': (_sentiment(0.3, 0.06, range(16, 21)), _capability(0.5, 0.1, (6,))),
+            },
+            effects=(_capability(0.5, 0.1, (2, 3)),),  # Data maturity, technology
+            default=(_capability(0.4, 0.06),),
+            ambient=(_sentiment(0.4, 0.06),),
+        ),
+    ),
+)
+
+# Single Phase 3 package: resistance halved (min 1.0), capability +25-35% (max 7.0)
+PHASE3_PACKAGE = Scenario(
+    name='phase3-package',
+    baseline_name='oct-2024-baseline', baseline_title='Oct 2024 Baseline', baseline_date='2024-10-15',
+    waves=(Wave(
+        name='nov-2025-phase3', title='Nov 2025 - Phase 3', assessment_date='2025-11-15', id_prefix='P3_',
+        interventions={code: () for code in ('A1', 'A3', 'B2', 'B3', 'C1', 'C2')},
+        effects=(
+            _capability(1.35, 0, (1, 8), mode='multiply', cap=7.0),     # Strategy, Ethics - major focus
+            _capability(1.30, 0, (4, 6, 7), mode='multiply', cap=7.0),  # Talent, Innovation, Adoption
+        ),
+        default=(_capability(1.25, 0, mode='multiply', cap=7.0),),
+        ambient=(_sentiment(0.5, 0, mode='multiply', cap=None, floor=1.0),),
+    ),),
+)
+
+SCENARIOS = {'nov-2024': NOV_2024, 'journey': JOURNEY_2025, 'phase3-package': PHASE3_PACKAGE}
+
+
+def scenario_from_dict(spec: dict) -> Scenario:
+    """
+    Scenario from a JSON-style spec:
+
+        {"name": "...", "baseline": {"name": "...", "title": "...", "date": "..."},
+         "waves": [{"name": "...", "title": "...", "assessment_date": "...", "id_prefix": "...",
+                    "interventions": {"A1": [{"target": "sentiment", "mean": 0.5, "std": 0.1,
+                                              "cells": [21, 22, 23, 24, 25]}]},
+                    "effects": [...], "default": [...], "ambient": [...]}]}
+    """
+    effects = lambda items: tuple(Effect(**item) for item in items)
+    waves = tuple(
+        Wave(
+            name=w['name'], title=w.get('title', w['name']), assessment_date=w['assessment_date'],
+            id_prefix=w['id_prefix'],
+            interventions={code: effects(items) for code, items in w.get('interventions', {}).items()},
+            effects=effects(w.get('effects', [])),
+            default=effects(w.get('default', [])),
+            ambient=effects(w.get('ambient', [])),
+        )
+        for w in spec['waves']
+    )
+    baseline = spec.get('baseline', {})
+    return Scenario(
+        name=spec['name'],
+        baseline_name=baseline.get('name', 'baseline'),
+        baseline_title=baseline.get('title', 'Baseline'),
+        baseline_date=baseline.get('date', waves[0].assessment_date),
+        waves=waves,
+    )
+
+
+def load_scenario(name_or_path: str) -> Scenario:
+    """Built-in scenario by name, or a JSON spec file."""
+    if name_or_path in SCENARIOS:
+        return SCENARIOS[name_or_path]
+    with open(name_or_path) as f:
+        return scenario_from_dict(json.load(f))
+
+
+# ---------------------------------------------------------------------------
+# Applying waves
+# ---------------------------------------------------------------------------
+
+def sentiment_id_column(df: pd.DataFrame) -> str:
+    return 'respondent_id' if 'respondent_id' in df.columns else 'RespondentID'
+
+
+def capability_id_column(df: pd.DataFrame) -> str:
+    return 'ResponseId_id' if 'ResponseId_id' in df.columns else 'respondent_id'
+
+
+def _run_effects(values: np.ndarray, wave: Wave, target: str, rng: np.random.Generator, select) -> np.ndarray:
+    """
+    Apply a wave's targeted, default and ambient effects along the last axis
+    of values (sentiment cells or capability rows); select(effect) is the
+    boolean mask of positions an effect covers.
+    """
+    touched = np.zeros(values.shape[-1], dtype=bool)
+    for effect in wave.targeted(target):
+        mask = select(effect)
+        _apply_masked(values, mask, effect, rng)
+        touched |= mask
+    for effect in wave.default:
+        if effect.target == target:
+            _apply_masked(values, select(effect) & ~touched, effect, rng)
+    for effect in wave.ambient:
+        if effect.target == target:
+            _apply_masked(values, select(effect), effect, rng)
+    return values
+
+
+def _apply_masked(values: np.ndarray, mask: np.ndarray, effect: Effect, rng: np.random.Generator):
+    if mask.any():
+        index = np.flatnonzero(mask)
+        values[..., index] = effect.apply(values[..., index], rng)
+
+
+def apply_sentiment_wave(df: pd.DataFrame, wave: Wave, rng: np.random.Generator,
+                         ids: Optional[pd.Series] = None) -> pd.DataFrame:
+    """
+    Next sentiment wave from df (the previous wave or the baseline).
+
+    ids: baseline respondent ids to prefix (defaults to df's own ids)
+    """
+    out = df.copy()
+    id_col = sentiment_id_column(out)
+    out[id_col] = prefix_ids(out[id_col] if ids is None else ids, wave.id_prefix)
+
+    present = [col for col in SENTIMENT_COLS if col in out.columns]
+    questions = np.array([int(col.rsplit('_', 1)[1]) for col in present])
+    values = out[present].to_numpy(dtype=np.float64, copy=True)  # rows x cells, one draw per cell
+
+    def select(effect):
+        return np.ones(len(questions), bool) if effect.cells is None else np.isin(questions, effect.cells)
+
+    values = _run_effects(values, wave, SENTIMENT, rng, select)
+    out[present] = values
+    return out
+
+
+def apply_capability_wave(df: pd.DataFrame, wave: Wave, rng: np.random.Generator,
+                          ids: Optional[pd.Series] = None) -> pd.DataFrame:
+    """
+    Next capability wave from df (long format, one row per construct).
+
+    ids: baseline respondent ids to prefix (defaults to df's own ids)
+    """
+    out = df.copy()
+    id_col = capability_id_column(out)
+    out[id_col] = prefix_ids(out[id_col] if ids is None else ids, wave.id_prefix)
+
+    dims = out['dimension_id'].to_numpy()
+    scores = out['score'].to_numpy(dtype=np.float64, copy=True)
+
+    def select(effect):
+        return np.ones(len(dims), bool) if effect.dimensions is None else np.isin(dims, effect.dimensions)
+
+    scores = _run_effects(scores, wave, CAPABILITY, rng, select)
+    out['score'] = pd.Series(scores, index=out.index).astype(df['score'].dtype)
+    return out
+
+
+def simulate_waves(scenario: Scenario, sentiment_base: pd.DataFrame, capability_base: pd.DataFrame,
+                   seed=DEFAULT_SEED) -> Iterable[Tuple[Wave, pd.DataFrame, pd.DataFrame]]:
+    """
+    Yield (wave, sentiment, capability) for every wave, each built on the previous one.
+
+    seed: int or SeedSequence; each wave gets its own spawned stream
+    """
+    seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    wave_rngs = [np.random.default_rng(child) for child in seq.spawn(len(scenario.waves))]
+    sentiment_ids = sentiment_base[sentiment_id_column(sentiment_base)]
+    capability_ids = capability_base[capability_id_column(capability_base)]
+
+    sentiment, capability = sentiment_base, capability_base
+    for wave, rng in zip(scenario.waves, wave_rngs):
+        sentiment = apply_sentiment_wave(sentiment, wave, rng, ids=sentiment_ids)
+        capability = apply_capability_wave(capability, wave, rng, ids=capability_ids)
+        yield wave, sentiment, capability
+
+
+# ---------------------------------------------------------------------------
+# Multi-company runs
+# ---------------------------------------------------------------------------
+
+def tenant_names(count: int, prefix: str = 'sim-tenant') -> List[str]:
+    return [f'{prefix}-{i:04d}' for i in range(1, count + 1)]
+
+
+def resample_baseline(sentiment_base: pd.DataFrame, capability_base: pd.DataFrame,
+                      rng: np.random.Generator) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    A synthetic company's baseline: respondents drawn with replacement from the
+    template (capability respondents keep all their construct rows), renumbered.
+    """
+    picks = rng.integers(0, len(sentiment_base), len(sentiment_base))
+    sentiment = sentiment_base.iloc[picks].reset_index(drop=True)
+    id_col = sentiment_id_column(sentiment)
+    sentiment[id_col] = 'R' + pd.Series(np.arange(1, len(sentiment) + 1)).astype(str).str.zfill(6)
+
+    id_col = capability_id_column(capability_base)
+    codes, uniques = pd.factorize(capability_base[id_col])
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes, minlength=len(uniques))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    chosen = rng.integers(0, len(uniques), len(uniques))
+    lengths = counts[chosen]
+    # Row positions of every chosen respondent's block, concatenated
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    rows = order[np.repeat(starts[chosen], lengths) + offsets]
+    capability = capability_base.iloc[rows].reset_index(drop=True)
+    new_ids = 'C' + pd.Series(np.arange(1, len(chosen) + 1)).astype(str).str.zfill(6)
+    capability[id_col] = np.repeat(new_ids.to_numpy(dtype=object), lengths)
+    return sentiment, capability
+
+
+def write_csv_wave(company_dir: Path, wave_name: str, sentiment: pd.DataFrame, capability: pd.DataFrame):
+    sentiment.to_csv(company_dir / f'{wave_name}_sentiment.csv', index=False)
+    capability.to_csv(company_dir / f'{wave_name}_capability.csv', index=False)
+
+
+def write_copy_wave(wave_dir: Path, sentiment: pd.DataFrame, capability: pd.DataFrame):
+    """respondents.tsv and capability_scores.tsv in COPY text format."""
+    copy_decimal = lambda values: sql_decimal(values, null=COPY_NULL)
+    copy_integer = lambda values: sql_integer(values, null=COPY_NULL)
+    wave_dir.mkdir(parents=True, exist_ok=True)
+    with open(wave_dir / 'respondents.tsv', 'w', encoding='utf-8', newline='') as f:
+        write_copy_text(f, list(sentiment_columns(sentiment, copy_text, copy_decimal).values()))
+    with open(wave_dir / 'capability_scores.tsv', 'w', encoding='utf-8', newline='') as f:
+        write_copy_text(f, list(capability_columns(capability, copy_text, copy_decimal, copy_integer).values()))
+
+
+# Per-process state for pool workers (set once by _init_worker, not pickled per task)
+_worker = {}
+
+
+def _init_worker(scenario, sentiment_base, capability_base, output_dir, output_format, resample):
+    _worker.update(scenario=scenario, sentiment_base=sentiment_base, capability_base=capability_base,
+                   output_dir=Path(output_dir), output_format=output_format, resample=resample)
+
+
+def _simulate_company(task) -> dict:
+    """Generate and write every wave for one company; returns per-wave summaries."""
+    company, seed_seq = task
+    scenario = _worker['scenario']
+    baseline_seq, waves_seq = seed_seq.spawn(2)
+
+    sentiment, capability = _worker['sentiment_base'], _worker['capability_base']
+    if _worker['resample']:
+        sentiment, capability = resample_baseline(sentiment, capability, np.random.default_rng(baseline_seq))
+
+    company_dir = _worker['output_dir'] / company
+    company_dir.mkdir(parents=True, exist_ok=True)
+    write = write_copy_wave if _worker['output_format'] == 'copy' else None
+
+    def emit(wave_name, sentiment_df, capability_df):
+        if write:
+            write(company_dir / wave_name, sentiment_df, capability_df)
+        else:
+            write_csv_wave(company_dir, wave_name, sentiment_df, capability_df)
+        present = [c for c in SENTIMENT_COLS if c in sentiment_df.columns]
+        return {
+            'wave': wave_name,
+            'respondents': len(sentiment_df),
+            'capability_rows': len(capability_df),
+            'sentiment_avg': float(np.nanmean(sentiment_df[present].to_numpy(dtype=np.float64))),
+            'capability_avg': float(capability_df['score'].astype(np.float64).mean()),
+        }
+
+    summaries = [emit(scenario.baseline_name, sentiment, capability)]
+    for wave, sentiment_wave, capability_wave in simulate_waves(scenario, sentiment, capability, waves_seq):
+        summaries.append(emit(wave.name, sentiment_wave, capability_wave))
+    return {'company': company, 'waves': summaries}
+
+
+def run_scenario(scenario: Scenario, sentiment_base: pd.DataFrame, capability_base: pd.DataFrame,
+                 companies: Sequence[str], output_dir, output_format: str = 'csv', seed: int = DEFAULT_SEED,
+                 workers: int = None, resample: bool = True) -> List[dict]:
+    """
+    Simulate every wave of a scenario for each company and write the results.
+
+    Args:
+        scenario: Waves to apply
+        sentiment_base, capability_base: Template baseline
+        companies: companies.name of each tenant
+        output_dir: Root output directory (one subdirectory per company)
+        output_format: 'csv' (journey CSV layout) or 'copy' (COPY files plus load.sql)
+        seed: Root seed; company i always gets the i-th spawned stream
+        workers: Worker processes (default: CPU count; 1 = in-process)
+        resample: Give each company a resampled baseline instead of the template itself
+
+    Returns:
+        list: Per-company summaries in company order
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tasks = list(zip(companies, np.random.SeedSequence(seed).spawn(len(companies))))
+    init_args = (scenario, sentiment_base, capability_base, output_dir, output_format, resample)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(tasks) == 1:
+        _init_worker(*init_args)
+        results = [_simulate_company(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+            results = list(pool.map(_simulate_company, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+    if output_format == 'copy':
+        write_copy_loader(output_dir, scenario, companies)
+    with open(output_dir / 'summary.json', 'w') as f:
+        json.dump({'scenario': scenario.name, 'seed': seed, 'companies': results}, f, indent=2)
+    return results
+
+
+def _sql_quote(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def write_copy_loader(output_dir: Path, scenario: Scenario, companies: Sequence[str]):
+    """
+    load.sql: creates the companies and assessment periods, then loads every
+    company/wave COPY file through two staging tables in one transaction.
+    """
+    periods = [(scenario.baseline_name, scenario.baseline_title, scenario.baseline_date, [])] + \
+        [(w.name, w.title, w.assessment_date, list(w.interventions)) for w in scenario.waves]
+
+    lines = loader_header(
+        f"Simulated scenario '{scenario.name}': {len(companies)} companies x {len(periods)} waves (COPY loader)",
+        output_dir,
+    )
+    lines += [
+        "INSERT INTO companies (name, display_name) VALUES",
+        ',\n'.join(f"  ({_sql_quote(c)}, {_sql_quote(c)})" for c in companies),
+        "ON CONFLICT (name) DO NOTHING;",
+        "",
+    ]
+    for survey_wave, title, date, codes in periods:
+        code_array = f"ARRAY[{', '.join(_sql_quote(c) for c in codes)}]::TEXT[]"
+        lines += [
+            "INSERT INTO assessment_periods (company_id, survey_wave, assessment_date, name, interventions_applied, status)",
+            f"SELECT id, {_sql_quote(survey_wave)}, {_sql_quote(date)}::DATE, {_sql_quote(title)}, {code_array}, 'active'",
+            f"FROM companies WHERE name IN ({', '.join(_sql_quote(c) for c in companies)})",
+            "ON CONFLICT (company_id, survey_wave) DO NOTHING;",
+            "",
+        ]
+
+    sentiment_staging, capability_staging = _staging_columns()
+    lines += staging_table('sim_respondents', sentiment_staging, SENTIMENT_TYPES) + [""]
+    lines += staging_table('sim_capability_scores', capability_staging, CAPABILITY_TYPES) + [""]
+
+    for company in companies:
+        company_cte = f"SELECT id FROM companies WHERE name = {_sql_quote(company)}"
+        for survey_wave, _, date, _ in periods:
+            wave_sql = [_sql_quote(survey_wave), f"{_sql_quote(date)}::DATE"]
+            wave_dir = output_dir / company / survey_wave
+            lines += [
+                f"-- {company} / {survey_wave}",
+                "TRUNCATE sim_respondents, sim_capability_scores;",
+                copy_from('sim_respondents', wave_dir / 'respondents.tsv'),
+                copy_from('sim_capability_scores', wave_dir / 'capability_scores.tsv'),
+            ]
+            lines += respondents_insert('sim_respondents', wave_sql, company_cte)
+            lines += capability_insert('sim_capability_scores', wave_sql, company_cte) + [""]
+    lines += ["COMMIT;", ""]
+
+    with open(output_dir / 'load.sql', 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+def _staging_columns() -> Tuple[list, list]:
+    """Columns of the staging tables, in COPY file column order."""
+    sentiment = [name for name, _, _ in RESPONDENT_TEXT_COLUMNS] + SENTIMENT_COLS
+    capability = capability_targets()[1:-2]  # Without company_id, survey_wave, assessment_date
+    return sentiment, capability
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Simulate intervention waves for many companies")
+    parser.add_argument('--scenario', default='journey',
+                        help=f"Built-in scenario ({', '.join(SCENARIOS)}) or a JSON spec file")
+    parser.add_argument('--sentiment', default=str(REPO_ROOT / 'data' / 'csv-imports' / 'sentiment_realistic.csv'),
+                        help="Template sentiment baseline")
+    parser.add_argument('--capability',
+                        default=str(REPO_ROOT / 'data' / 'csv-imports' / 'capability_baseline_oct2024.csv'),
+                        help="Template capability baseline (long format)")
+    parser.add_argument('--tenants', type=int, default=10, help="Number of synthetic companies")
+    parser.add_argument('--tenant-prefix', default='sim-tenant', help="companies.name prefix")
+    parser.add_argument('--format', choices=['csv', 'copy'], default='csv',
+                        help="csv: journey CSV layout; copy: COPY text files plus load.sql")
+    parser.add_argument('--output-dir', default=str(REPO_ROOT / 'data' / 'simulations'),
+                        help="Output root (a subdirectory per scenario is created)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--no-resample', action='store_true',
+                        help="Use the template baseline for every company instead of resampling it")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    scenario = load_scenario(args.scenario)
+    sentiment_base = read_csv_cached(args.sentiment)
+    capability_base = read_capability_long(args.capability)
+    companies = tenant_names(args.tenants, args.tenant_prefix)
+    output_dir = Path(args.output_dir) / scenario.name
+
+    print(f"🧪 Scenario '{scenario.name}': {len(scenario.waves)} waves after {scenario.baseline_name}")
+    print(f"   {len(companies)} companies, {len(sentiment_base)} sentiment + {len(capability_base)} capability rows each")
+
+    start = time.perf_counter()
+    results = run_scenario(scenario, sentiment_base, capability_base, companies, output_dir,
+                           output_format=args.format, seed=args.seed, workers=args.workers,
+                           resample=not args.no_resample)
+    elapsed = time.perf_counter() - start
+
+    for index, summary in enumerate(results[0]['waves']):
+        sentiment_avg = np.mean([r['waves'][index]['sentiment_avg'] for r in results])
+        capability_avg = np.mean([r['waves'][index]['capability_avg'] for r in results])
+        print(f"   {summary['wave']:<22} sentiment avg {sentiment_avg:.2f}   capability avg {capability_avg:.2f}")
+
+    rows = sum(w['respondents'] + w['capability_rows'] for r in results for w in r['waves'])
+    print(f"✅ {rows:,} rows written to {output_dir} in {elapsed:.1f}s")
+    if args.format == 'copy':
+        print(f"   Load with: psql \"$DATABASE_URL\" -f {loader_path(output_dir / 'load.sql')}")
+
+
+if __name__ == '__main__':
+    main()
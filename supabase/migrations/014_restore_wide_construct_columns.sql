@@ -0,0 +1,45 @@
+-- Restore the Wide-Format Construct Columns on Respondents
+-- Migration 006 dropped construct_1..construct_32 in favour of the LONG
+-- capability_scores table, but scripts/import_capability_wide.py still loads
+-- the wide format into these columns and verifies against them, and
+-- respondent_construct_stats() (migration 015) reads them.
+-- Same definitions as migration 003; a no-op where they still exist.
+
+ALTER TABLE respondents
+  ADD COLUMN IF NOT EXISTS construct_1 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_2 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_3 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_4 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_5 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_6 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_7 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_8 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_9 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_10 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_11 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_12 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_13 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_14 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_15 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_16 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_17 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_18 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_19 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_20 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_21 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_22 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_23 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_24 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_25 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_26 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_27 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_28 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_29 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_30 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_31 DECIMAL(5,2),
+  ADD COLUMN IF NOT EXISTS construct_32 DECIMAL(5,2);
+
+-- Marks respondents with capability data (the importers filter on construct_1 IS NOT NULL)
+CREATE INDEX IF NOT EXISTS idx_respondents_construct_1 ON respondents(construct_1);
+
+COMMENT ON TABLE respondents IS 'Respondent data with sentiment scores (sentiment_1..25) and wide-format capability construct scores (construct_1..32). Long-format capability scores are stored in capability_scores.';
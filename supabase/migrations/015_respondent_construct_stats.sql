@@ -0,0 +1,74 @@
+-- Server-side Verification Stats for Wide-Format Capability Imports
+-- Used by scripts/import_capability_wide.py to verify an import in one call
+-- instead of downloading rows into Python (which was also capped by the
+-- PostgREST page size).
+--
+-- Requires the construct_1..construct_32 columns on respondents: added in
+-- migration 003, dropped in 006 and restored in 014. Postgres checks SQL
+-- function bodies on CREATE, so 014 must be applied first.
+
+-- count/min/max/mean for all 32 constructs over respondents with capability data.
+-- One pass over respondents; each row is unpivoted with a LATERAL VALUES list.
+CREATE OR REPLACE FUNCTION respondent_construct_stats()
+RETURNS TABLE (
+  construct TEXT,
+  construct_id INTEGER,
+  n BIGINT,
+  min_score NUMERIC,
+  max_score NUMERIC,
+  mean_score NUMERIC
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    c.construct,
+    c.construct_id,
+    COUNT(c.score) AS n,
+    MIN(c.score) AS min_score,
+    MAX(c.score) AS max_score,
+    ROUND(AVG(c.score), 4) AS mean_score
+  FROM respondents r
+  CROSS JOIN LATERAL (
+    VALUES
+      ('construct_1', 1, r.construct_1),
+      ('construct_2', 2, r.construct_2),
+      ('construct_3', 3, r.construct_3),
+      ('construct_4', 4, r.construct_4),
+      ('construct_5', 5, r.construct_5),
+      ('construct_6', 6, r.construct_6),
+      ('construct_7', 7, r.construct_7),
+      ('construct_8', 8, r.construct_8),
+      ('construct_9', 9, r.construct_9),
+      ('construct_10', 10, r.construct_10),
+      ('construct_11', 11, r.construct_11),
+      ('construct_12', 12, r.construct_12),
+      ('construct_13', 13, r.construct_13),
+      ('construct_14', 14, r.construct_14),
+      ('construct_15', 15, r.construct_15),
+      ('construct_16', 16, r.construct_16),
+      ('construct_17', 17, r.construct_17),
+      ('construct_18', 18, r.construct_18),
+      ('construct_19', 19, r.construct_19),
+      ('construct_20', 20, r.construct_20),
+      ('construct_21', 21, r.construct_21),
+      ('construct_22', 22, r.construct_22),
+      ('construct_23', 23, r.construct_23),
+      ('construct_24', 24, r.construct_24),
+      ('construct_25', 25, r.construct_25),
+      ('construct_26', 26, r.construct_26),
+      ('construct_27', 27, r.construct_27),
+      ('construct_28', 28, r.construct_28),
+      ('construct_29', 29, r.construct_29),
+      ('construct_30', 30, r.construct_30),
+      ('construct_31', 31, r.construct_31),
+      ('construct_32', 32, r.construct_32)
+  ) AS c(construct, construct_id, score)
+  WHERE r.construct_1 IS NOT NULL
+  GROUP BY c.construct, c.construct_id
+  ORDER BY c.construct_id;
+$$;
+
+GRANT EXECUTE ON FUNCTION respondent_construct_stats() TO anon, authenticated;
+
+COMMENT ON FUNCTION respondent_construct_stats() IS 'Per-construct count/min/max/mean over respondents with capability data. Used for import verification.';